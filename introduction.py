@@ -1,12 +1,36 @@
 import streamlit as st
 
-st.title("Saudi Tourism Review Analyzer 🇸🇦")
+from project.app.shared import is_admin, start_warm_up
 
-# Display an image
-st.image("https://qomra.co/wp-content/uploads/2023/12/Screenshot-2023-12-20-at-2.46.18%E2%80%AFPM.png", use_container_width=True)
 
-st.markdown("""
+def introduction():
+    # The landing page renders right away while the shared data and models load in the background
+    start_warm_up()
+
+    st.title("Saudi Tourism Review Analyzer 🇸🇦")
+
+    # Display an image
+    st.image("https://qomra.co/wp-content/uploads/2023/12/Screenshot-2023-12-20-at-2.46.18%E2%80%AFPM.png", use_container_width=True)
+
+    st.markdown("""
 Welcome to the Saudi Tourism Review Analyzer!
 This dashboard transforms visitor feedback into smart insights, helping uncover top destinations, service improvement areas, and tourist sentiment trends across the Kingdom.
 Our goal is to support data-driven decisions that align with Saudi Arabia’s Vision 2030 and enhance the overall tourism experience.
 """)
+
+
+# Pages are listed here instead of discovered from pages/, so that the admin
+# page is only in the sidebar of sessions opened with ?admin=<BTS_ADMIN_TOKEN>
+pages = [
+    st.Page(introduction, title="introduction", default=True),
+    st.Page("pages/1- Data.py", title="Data"),
+    st.Page("pages/2_Compare_Sentiment.py", title="Compare Sentiment"),
+    st.Page("pages/3_ Ministry Insights.py", title="Ministry Insights"),
+    st.Page("pages/4-LDA.py", title="LDA"),
+    st.Page("pages/5_more.py", title="more"),
+    st.Page("pages/6-decoumention.py", title="decoumention"),
+    st.Page("pages/8_Search.py", title="Search"),
+]
+if is_admin():
+    pages.append(st.Page("pages/7_Admin.py", title="Admin"))
+st.navigation(pages).run()
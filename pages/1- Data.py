@@ -1,14 +1,12 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import nltk
 
-
-
-
-nltk.download('vader_lexicon', quiet=True)
+from project.app.charts import filter_key, pie_chart
+from project.app.shared import data_version, load_facet_index, load_rollup_cube, start_page
+from project.ml_logic.instrumentation import finish_rerun, span
 
 st.set_page_config(page_title="Tourism Review Dashboard", layout="wide")
+start_page("1- Data")
 
 
 # Centered main title
@@ -18,30 +16,28 @@ st.markdown("""
 
 
 # Load data
-@st.cache_data
-def load_data():
-    return pd.read_csv("notebooks/review_data.csv")
-
-review = load_data()
+facets = load_facet_index()
+cube = load_rollup_cube()
 
 # ───────────────────────────────────────────────
 # GLOBAL FILTERS (Updated: Region > City > Place Type > Place Name)
 # ───────────────────────────────────────────────
 st.sidebar.header("🔎 Filter Options")
 
-# Filter by Region
-regions = st.sidebar.multiselect("Select Region(s)", options=review["Region"].unique())
-region_filtered = review[review["Region"].isin(regions)] if regions else review
+with span("filter"):
+    # Filter by Region
+    regions = st.sidebar.multiselect("Select Region(s)", options=facets.options("Region"))
 
-# Filter by City
-cities = st.sidebar.multiselect("Select City(s)", options=region_filtered["City"].unique())
-city_filtered = region_filtered[region_filtered["City"].isin(cities)] if cities else region_filtered
+    # Filter by City
+    cities = st.sidebar.multiselect("Select City(s)", options=facets.options("City", {"Region": regions}))
 
-# ✅ New: Filter by Place Type
-place_types = st.sidebar.multiselect("Select Place Type(s)", options=city_filtered["Place Type"].unique())
-type_filtered = city_filtered[city_filtered["Place Type"].isin(place_types)] if place_types else city_filtered
+    # ✅ New: Filter by Place Type
+    place_types = st.sidebar.multiselect(
+        "Select Place Type(s)",
+        options=facets.options("Place Type", {"Region": regions, "City": cities})
+    )
 
-filtered = type_filtered
+selections = {"Region": regions, "City": cities, "Place Type": place_types}
 
 
 
@@ -67,9 +63,10 @@ col1, col2 = st.columns([2, 1])  # Wider column for the table
 
 with col1:
     # Group by Place Name and calculate the average rating
-    place_avg_rating = filtered.groupby(
-        ['Region', 'City', 'Place Type', 'Place Name', 'Place Category']
-    )['Rating'].mean().reset_index()
+    with span("aggregate.place_table"):
+        place_avg_rating = cube.view(
+            ['Region', 'City', 'Place Type', 'Place Name', 'Place Category'], where=selections
+        )
 
     # Round the average rating to 2 decimal places
     place_avg_rating['Rating'] = place_avg_rating['Rating'].round(2)
@@ -82,39 +79,23 @@ with col1:
     )
 
 with col2:
-    if not filtered.empty:
+    if cube.totals(selections)["Total Reviews"] > 0:
         # Prepare data for sentiment pie chart
-        sentiment_counts = filtered["Sentiment Label"].value_counts()
-        labels = sentiment_counts.index
-        sizes = sentiment_counts.values
+        with span("aggregate.sentiment"):
+            sentiment_counts = cube.sentiment_counts(selections)
         colors = ['#66b3ff', '#ffcc99', '#ff9999']
 
-        # Create pie chart with smaller size and font for balance
-        fig, ax = plt.subplots(figsize=(2.5, 2.5), dpi=100)
-        wedges, texts, autotexts = ax.pie(
-            sizes,
-            labels=labels,
+        # Rendered once per filter state and data version, then served from cache
+        pie_chart(
+            sentiment_counts,
+            key=filter_key(selections),
+            version=data_version(),
+            title="Sentiment Distribution",
             colors=colors,
-            autopct='%1.1f%%',
-            startangle=140,
-            textprops={'fontsize': 7}
         )
-
-        # Match label colors and adjust font
-        for i, text in enumerate(texts):
-            text.set_color(colors[i])
-            text.set_fontsize(8)
-            text.set_fontweight("bold")
-
-        for atext in autotexts:
-            atext.set_fontsize(7)
-
-        ax.axis('equal')  # Keep the pie chart circular
-        ax.set_title("Sentiment Distribution", fontsize=10)
-
-        # Display the pie chart
-        st.pyplot(fig)
     else:
         st.info("No data available for selected filters.")
 
 st.markdown("<br><br>", unsafe_allow_html=True)
+
+finish_rerun()
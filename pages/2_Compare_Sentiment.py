@@ -1,77 +1,115 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-@st.cache_data
-def load_data():
-    return pd.read_csv("notebooks/review_data.csv")
+from project.app.charts import bar_chart, filter_key
+from project.app.shared import data_version, load_comparison, load_facet_index, start_page
+from project.ml_logic.comparison import COMPARE_LEVELS
+from project.ml_logic.instrumentation import finish_rerun, span
+from project.params import COMPARISON_CONFIDENCE
 
-review = load_data()
+start_page("2_Compare_Sentiment")
+
+facets = load_facet_index()
+comparison = load_comparison()
+
+SENTIMENT_ORDER = ["positive", "neutral", "negative"]
+PALETTES = ["crest", "flare", "viridis", "magma", "rocket", "mako"]
+CHARTS_PER_ROW = 3
+LEVEL_PLURALS = {"Region": "Regions", "City": "Cities", "Place Type": "Place Types"}
 
 
 # ───────────────────────────────────────────────
 
-# SECTION 2: Compare Sentiment Between Two Regions (Fixed Width)
+# SECTION 2: Compare Sentiment Between Regions, Cities or Place Types (Fixed Width)
 # ───────────────────────────────────────────────
 
+# The header names the level picked below (the widget's value from the last rerun)
+compare_by = st.session_state.get("compare_by", COMPARE_LEVELS[0])
+
 # Centered container with fixed width
-st.markdown("""
+st.markdown(f"""
     <div style='margin: 0 auto; width: 900px;'>
-        <h2 style='text-align: center;'>📊 Compare Sentiment Distribution Between Two Regions</h2>
+        <h2 style='text-align: center;'>📊 Compare Sentiment Distribution Between {LEVEL_PLURALS[compare_by]}</h2>
 """, unsafe_allow_html=True)
 
-region_1, region_2 = st.columns(2)
+compare_by = st.radio("Compare by", COMPARE_LEVELS, horizontal=True, key="compare_by")
 
-with region_1:
-    selected_region_1 = st.selectbox("📍 Select First Region", options=review["Region"].unique(), key="region_1")
-    region1_place_types = st.multiselect(
-        "Select Place Type(s) for Region 1",
-        options=review[review["Region"] == selected_region_1]["Place Type"].unique(),
-        key="region1_place_types"
+with span("filter"):
+    options = facets.options(compare_by)
+    selected = st.multiselect(
+        f"📍 Select {compare_by}(s) to compare",
+        options=options,
+        default=options[:2],
+        key=f"compare_{compare_by}",
     )
-    region1_data = review[(review["Region"] == selected_region_1) &
-                          (review["Place Type"].isin(region1_place_types))] if region1_place_types else \
-                          review[review["Region"] == selected_region_1]
-
-with region_2:
-    selected_region_2 = st.selectbox("📍 Select Second Region", options=review["Region"].unique(), key="region_2")
-    region2_place_types = st.multiselect(
-        "Select Place Type(s) for Region 2",
-        options=review[review["Region"] == selected_region_2]["Place Type"].unique(),
-        key="region2_place_types"
+
+    # One filter shared by every compared group
+    if compare_by == "Place Type":
+        shared_level = "Region"
+        shared_options = facets.options("Region")
+    else:
+        shared_level = "Place Type"
+        shared_options = facets.options("Place Type", {compare_by: selected})
+    shared_selected = st.multiselect(
+        f"Select {shared_level}(s) for all groups",
+        options=shared_options,
+        key=f"compare_{compare_by}_{shared_level}",
     )
-    region2_data = review[(review["Region"] == selected_region_2) &
-                          (review["Place Type"].isin(region2_place_types))] if region2_place_types else \
-                          review[review["Region"] == selected_region_2]
+    where = {shared_level: shared_selected}
 
+option_col1, option_col2 = st.columns(2)
+with option_col1:
+    normalize = st.checkbox("Show shares (%) instead of counts", key="compare_normalize")
+with option_col2:
+    show_ci = st.checkbox(f"Show {COMPARISON_CONFIDENCE:.0%} confidence intervals", key="compare_ci")
 
+if not selected:
+    st.info(f"Select at least one {compare_by} to compare.")
+else:
+    # Every selected group in one pass; groups already shown come from the engine's cache
+    with span("aggregate.comparison"):
+        table = comparison.compare(
+            compare_by,
+            selected,
+            where,
+            normalize=normalize,
+            confidence=COMPARISON_CONFIDENCE if show_ci else None,
+            order=SENTIMENT_ORDER,
+        )
 
-charts_col1, charts_col2 = st.columns(2)
+    for start in range(0, len(selected), CHARTS_PER_ROW):
+        columns = st.columns(CHARTS_PER_ROW)
+        for i, value in enumerate(selected[start:start + CHARTS_PER_ROW]):
+            group = table[table[compare_by] == value]
+            with columns[i]:
+                st.subheader(f"📌 Sentiment in: {value}")
+                if group["Review Count"].sum() > 0:
+                    bar_chart(
+                        group,
+                        key=f"{filter_key({**where, compare_by: [value]})}|normalize={normalize}",
+                        version=data_version(),
+                        x="Sentiment Label",
+                        y="Value",
+                        title=str(value),
+                        order=SENTIMENT_ORDER,
+                        palette=PALETTES[(start + i) % len(PALETTES)],
+                        xlabel="Sentiment",
+                        ylabel="Share (%)" if normalize else "Review Count",
+                        figsize=(4, 3),
+                        title_size=10,
+                    )
+                else:
+                    st.info(f"No data available for this {compare_by.lower()}.")
 
-with charts_col1:
-    st.subheader(f"📌 Sentiment in: {selected_region_1}")
-    if not region1_data.empty:
-        fig1, ax1 = plt.subplots(figsize=(4, 3), dpi=100)
-        sns.countplot(data=region1_data, x="Sentiment Label", order=["positive", "neutral", "negative"], palette="crest", ax=ax1)
-        ax1.set_title(selected_region_1, fontsize=10)
-        ax1.set_xlabel("Sentiment")
-        ax1.set_ylabel("Review Count")
-        st.pyplot(fig1)
-    else:
-        st.info("No data available for this region.")
-
-with charts_col2:
-    st.subheader(f"📌 Sentiment in: {selected_region_2}")
-    if not region2_data.empty:
-        fig2, ax2 = plt.subplots(figsize=(4, 3), dpi=100)
-        sns.countplot(data=region2_data, x="Sentiment Label", order=["positive", "neutral", "negative"], palette="flare", ax=ax2)
-        ax2.set_title(selected_region_2, fontsize=10)
-        ax2.set_xlabel("Sentiment")
-        ax2.set_ylabel("Review Count")
-        st.pyplot(fig2)
-    else:
-        st.info("No data available for this region.")
+    if show_ci:
+        st.markdown(f"**Share of each sentiment with its {COMPARISON_CONFIDENCE:.0%} confidence interval (Wilson)**")
+        st.dataframe(
+            table[[compare_by, "Sentiment Label", "Review Count", "Total Reviews", "Share (%)", "CI Low (%)", "CI High (%)"]],
+            use_container_width=True,
+            hide_index=True,
+        )
 
 # Close fixed-width div
 st.markdown("</div>", unsafe_allow_html=True)
+
+finish_rerun()
@@ -1,9 +1,11 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import re
-from collections import Counter
+
+from project.app.charts import bar_chart
+from project.app.shared import data_version, load_attention_index, load_complaint_index, load_rollup_cube, start_page
+from project.ml_logic.instrumentation import finish_rerun, span
+from project.ml_logic.attention import ATTENTION_LEVELS
+from project.params import ATTENTION_LEVEL, ATTENTION_TOP_K
 
 # ───────────────────────────────────────────────
 # PAGE CONFIG & STYLING
@@ -12,6 +14,7 @@ st.set_page_config(
     page_title="Tourism Experience Insights",
     layout="wide"
 )
+start_page("3_ Ministry Insights")
 
 st.markdown("""
     <style>
@@ -57,11 +60,9 @@ st.markdown("""
 # ───────────────────────────────────────────────
 # LOAD DATA
 # ───────────────────────────────────────────────
-@st.cache_data
-def load_data():
-    return pd.read_csv("notebooks/review_data.csv")
+cube = load_rollup_cube()
 
-review = load_data()
+LEVEL_PLURALS = {"place": "Places", "city": "Cities", "region": "Regions", "place_type": "Place Types"}
 
 # ───────────────────────────────────────────────
 # SECTION 1: Top & Bottom Rated Places
@@ -70,9 +71,10 @@ st.markdown("""<h1 style='text-align: center;'> Ministry Insights from Visitor R
 st.markdown("This dashboard summarizes visitor feedback across Saudi Arabia to help the Ministry identify strengths, weaknesses, and opportunities for improvement.")
 
 st.markdown("""<h2>⭐ Top vs. ⚠️ Bottom Rated Places</h2>""", unsafe_allow_html=True)
-place_ratings = review.groupby(['Region', 'City', 'Place Type', 'Place Name'])['Rating'].mean().reset_index()
-top_places = place_ratings.sort_values(by='Rating', ascending=False).head(10)
-worst_places = place_ratings.sort_values(by='Rating', ascending=True).head(10)
+with span("aggregate.place_ratings"):
+    place_ratings = cube.view(['Region', 'City', 'Place Type', 'Place Name'])[['Region', 'City', 'Place Type', 'Place Name', 'Rating']]
+    top_places = place_ratings.sort_values(by='Rating', ascending=False).head(10)
+    worst_places = place_ratings.sort_values(by='Rating', ascending=True).head(10)
 
 col1, col2 = st.columns(2)
 with col1:
@@ -83,34 +85,44 @@ with col2:
     st.dataframe(worst_places, use_container_width=True, hide_index=True)
 
 # ───────────────────────────────────────────────
-# SECTION 2: Cities That Might Need Ministry Attention
+# SECTION 2: Cities (Places, Regions or Place Types) That Might Need Ministry Attention
 # ───────────────────────────────────────────────
-st.markdown("""<h2>🚨 Cities That Might Need Ministry Attention</h2>""", unsafe_allow_html=True)
-st.markdown("""
-These are the top 10 cities with the most concerning combination of high negative review rates and low average ratings.
-The **Attention Score** is calculated as: `Negative Rate × (4.5 − Average Rating)`.
+# The header names the level picked below (the widget's value from the last rerun)
+level = st.session_state.get("attention_level", ATTENTION_LEVEL)
+groups = LEVEL_PLURALS[level]
+st.markdown(f"""<h2>🚨 {groups} That Might Need Ministry Attention</h2>""", unsafe_allow_html=True)
+level = st.radio(
+    "Rank",
+    list(ATTENTION_LEVELS),
+    index=list(ATTENTION_LEVELS).index(ATTENTION_LEVEL),
+    format_func=LEVEL_PLURALS.get,
+    horizontal=True,
+    key="attention_level",
+)
+groups = LEVEL_PLURALS[level]
+attention = load_attention_index(level)
+st.markdown(f"""
+These are the top {ATTENTION_TOP_K} {groups.lower()} with the most concerning combination of high negative review rates and low average ratings.
+The **Attention Score** is calculated as: `{attention.formula}`.
 """)
 
-total_reviews = review.groupby(['Region', 'City']).size().reset_index(name='Total Reviews')
-neg_reviews = review[review['Sentiment Label'] == 'negative'].groupby(['Region', 'City']).size().reset_index(name='Negative Reviews')
-avg_rating = review.groupby(['Region', 'City'])['Rating'].mean().reset_index()
-
-attention_df = total_reviews.merge(neg_reviews, on=['Region', 'City'], how='left').merge(avg_rating, on=['Region', 'City'])
-attention_df['Negative Reviews'] = attention_df['Negative Reviews'].fillna(0)
-attention_df['Negative Rate (%)'] = (attention_df['Negative Reviews'] / attention_df['Total Reviews']) * 100
-attention_df['Negative Rate (%)'] = attention_df['Negative Rate (%)'].round(1)
-attention_df['Rating'] = attention_df['Rating'].round(2)
-attention_df['Score'] = attention_df['Negative Rate (%)'] * (4.5 - attention_df['Rating'])
-
-top_cities = attention_df.sort_values('Score', ascending=False).head(10)
+with span("aggregate.attention"):
+    top_groups = attention.top(ATTENTION_TOP_K)
 
-fig, ax = plt.subplots(figsize=(10, 6))
 custom_palette = ["#007A3D", "#00AEEF", "#7F3F98", "#CBA135", "#A1CDA8"]
-sns.barplot(y="City", x="Score", data=top_cities, palette=custom_palette, ax=ax)
-ax.set_xlabel("Attention Score (Higher = More Concerning)")
-ax.set_ylabel("City")
-ax.set_title("Top 10 Cities by Attention Score")
-st.pyplot(fig)
+bar_chart(
+    top_groups,
+    key=f"attention:{attention.level}:{attention.scorer}:{ATTENTION_TOP_K}",
+    version=data_version(),
+    x="Score",
+    y=attention.keys[-1],
+    title=f"Top {ATTENTION_TOP_K} {groups} by Attention Score",
+    order=top_groups[attention.keys[-1]].tolist(),
+    palette=custom_palette,
+    xlabel="Attention Score (Higher = More Concerning)",
+    ylabel=attention.keys[-1],
+    figsize=(10, 6),
+)
 
 # ───────────────────────────────────────────────
 # SECTION 3: Complaint Tags by City
@@ -118,23 +130,9 @@ st.pyplot(fig)
 st.markdown("""<h2>📌 Root Causes by City (Complaint Tags)</h2>""", unsafe_allow_html=True)
 st.markdown("This table shows the top 3 complaint keywords in each city and translates them into categorized tags.")
 
-neg_reviews_text = review[review['Sentiment Label'] == 'negative'][['City', 'Review Text']].dropna()
-
-def clean_text(text):
-    text = text.lower()
-    text = re.sub(r'[^a-z\s]', '', text)
-    tokens = text.split()
-    stop_words = set(["the", "and", "was", "were", "are", "with", "very", "but", "not", "for", "this", "that", "they", "too", "had", "have", "has", "just", "you", "from", "all", "out", "about", "our", "there", "their", "been", "after", "place", "restaurant", "hotel", "visit", "service"])
-    return [word for word in tokens if word not in stop_words and len(word) > 2]
-
-neg_reviews_text['Tokens'] = neg_reviews_text['Review Text'].apply(clean_text)
-city_complaints = (
-    neg_reviews_text.groupby('City')['Tokens']
-    .sum()
-    .apply(lambda x: Counter(x).most_common(3))
-    .reset_index()
-    .rename(columns={'Tokens': 'Top Complaints'})
-)
+# Copy: the cached table is shared by every session
+with span("aggregate.complaints"):
+    city_complaints = load_complaint_index().top_k(3).copy()
 
 keyword_map = {
     "room": "🛏️ Accommodation", "rooms": "🛏️ Accommodation",
@@ -162,19 +160,29 @@ st.dataframe(final_table, use_container_width=True, hide_index=True)
 # ───────────────────────────────────────────────
 # SECTION 4: Regional Priority Summary
 # ───────────────────────────────────────────────
-st.markdown("""<h2>📍 Regional Priority Based on Problematic Cities</h2>""", unsafe_allow_html=True)
-st.markdown("""
-This chart shows how many of the top 10 most concerning cities (based on review negativity and rating) fall into each region.
-Regions with more flagged cities may require more urgent or extensive Ministry action.
+# Only meaningful for groups nested in a region
+if "Region" in attention.keys and level != "region":
+    st.markdown(f"""<h2>📍 Regional Priority Based on Problematic {groups}</h2>""", unsafe_allow_html=True)
+    st.markdown(f"""
+This chart shows how many of the top {ATTENTION_TOP_K} most concerning {groups.lower()} (based on review negativity and rating) fall into each region.
+Regions with more flagged {groups.lower()} may require more urgent or extensive Ministry action.
 """)
 
-region_city_counts = top_cities['Region'].value_counts().reset_index()
-region_city_counts.columns = ['Region', 'Cities Needing Attention']
-region_city_counts = region_city_counts.sort_values(by='Cities Needing Attention', ascending=False)
-
-fig, ax = plt.subplots(figsize=(8, 5))
-sns.barplot(x='Cities Needing Attention', y='Region', data=region_city_counts, palette=custom_palette, ax=ax)
-ax.set_title("Regions by Number of Concerning Cities")
-ax.set_xlabel("Number of Cities in Top 10 Needing Attention")
-ax.set_ylabel("Region")
-st.pyplot(fig)
+    region_counts = attention.top_counts(ATTENTION_TOP_K, by="Region").reset_index()
+    region_counts.columns = ['Region', f'{groups} Needing Attention']
+
+    bar_chart(
+        region_counts,
+        key=f"attention_regions:{attention.level}:{attention.scorer}:{ATTENTION_TOP_K}",
+        version=data_version(),
+        x=f"{groups} Needing Attention",
+        y="Region",
+        title=f"Regions by Number of Concerning {groups}",
+        order=region_counts["Region"].tolist(),
+        palette=custom_palette,
+        xlabel=f"Number of {groups} in Top {ATTENTION_TOP_K} Needing Attention",
+        ylabel="Region",
+        figsize=(8, 5),
+    )
+
+finish_rerun()
@@ -1,18 +1,20 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-@st.cache_data
-def load_data():
-    return pd.read_csv("notebooks/review_data.csv")
+from project.app.charts import bar_chart
+from project.app.shared import data_version, load_rollup_cube, start_page
+from project.ml_logic.instrumentation import finish_rerun, span
+from project.ml_logic.rollup import SENTIMENT_LABELS
 
-review = load_data()
+start_page("5_more")
+
+cube = load_rollup_cube()
 
 # ───────────────────────────────────────────────
 # Compare Average Rating by Place Type
 # ───────────────────────────────────────────────
-type_ratings = review.groupby("Place Type")["Rating"].mean().sort_values(ascending=False).reset_index()
+with span("aggregate.type_ratings"):
+    type_ratings = cube.view(["Place Type"])[["Place Type", "Rating"]].sort_values("Rating", ascending=False)
 
 st.markdown("""
 <div style='text-align: center; padding: 10px; background-color: rgba(0,0,0,0.5); border-radius: 10px; margin-top: 30px;'>
@@ -26,18 +28,24 @@ st.dataframe(type_ratings)
 # import seaborn as sns
 
 # Chart for average rating by Place Type
-fig, ax = plt.subplots(figsize=(10, 5))
-sns.barplot(data=type_ratings, x="Place Type", y="Rating", palette="viridis", ax=ax)
-ax.set_title("📊 Average Rating by Place Type", fontsize=14)
-ax.set_xlabel("Place Type")
-ax.set_ylabel("Average Rating")
-plt.xticks(rotation=45)
-plt.tight_layout()
-
-st.pyplot(fig)
+bar_chart(
+    type_ratings,
+    key="place_type_ratings",
+    version=data_version(),
+    x="Place Type",
+    y="Rating",
+    title="📊 Average Rating by Place Type",
+    order=type_ratings["Place Type"].tolist(),
+    palette="viridis",
+    xlabel="Place Type",
+    ylabel="Average Rating",
+    rotation=45,
+    title_size=14,
+)
 
 # Optional: Add sentiment breakdown per type
-type_sentiment = review.groupby(["Place Type", "Sentiment Label"]).size().unstack(fill_value=0)
+with span("aggregate.type_sentiment"):
+    type_sentiment = cube.view(["Place Type"]).set_index("Place Type")[SENTIMENT_LABELS]
 
 st.markdown("""
 <div style='text-align: center; padding: 10px; background-color: rgba(0,0,0,0.5); border-radius: 10px; margin-top: 30px;'>
@@ -46,12 +54,11 @@ st.markdown("""
 """, unsafe_allow_html=True)
 st.dataframe(type_sentiment)
 
-region_type_ratings = (
-    review.groupby(["Region", "Place Type"])["Rating"]
-    .mean()
-    .sort_values(ascending=False)
-    .reset_index()
-)
+with span("aggregate.region_type_ratings"):
+    region_type_ratings = (
+        cube.view(["Region", "Place Type"])[["Region", "Place Type", "Rating"]]
+        .sort_values("Rating", ascending=False)
+    )
 
 
 st.markdown("""
@@ -60,3 +67,5 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 st.dataframe(region_type_ratings)
+
+finish_rerun()
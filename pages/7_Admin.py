@@ -0,0 +1,94 @@
+import streamlit as st
+import pandas as pd
+
+from project.app.shared import is_admin
+from project.ml_logic.instrumentation import cache_stats, export_log, recent_reruns, recent_spans, reset
+from project.params import INSTRUMENT_ENABLED
+
+st.set_page_config(page_title="Admin", layout="wide")
+
+# Only in the navigation of admin sessions (see introduction.py); checked again if opened directly
+if not is_admin():
+    st.info("Nothing to see here.")
+    st.stop()
+
+st.title("⏱️ Recent Timings")
+if not INSTRUMENT_ENABLED:
+    st.warning("Instrumentation is disabled (BTS_INSTRUMENT=0).")
+
+reruns = pd.DataFrame(recent_reruns())
+spans = pd.DataFrame(recent_spans())
+
+pages = sorted(reruns["page"].dropna().unique()) if not reruns.empty else []
+page = st.selectbox("Page", ["All pages"] + pages)
+if page != "All pages":
+    reruns = reruns[reruns["page"] == page]
+    # Spans and reruns are evicted separately: spans can be empty while reruns are not
+    spans = spans[spans["page"] == page] if not spans.empty else spans
+
+# ───────────────────────────────────────────────
+# Reruns
+# ───────────────────────────────────────────────
+st.subheader("Reruns")
+if reruns.empty:
+    st.info("No rerun recorded yet.")
+else:
+    st.dataframe(
+        reruns.drop(columns=["profile"], errors="ignore").iloc[::-1],
+        use_container_width=True,
+        hide_index=True,
+    )
+
+# ───────────────────────────────────────────────
+# Spans: where the time goes
+# ───────────────────────────────────────────────
+st.subheader("Spans")
+if spans.empty:
+    st.info("No span recorded yet.")
+else:
+    summary = spans.groupby(["page", "span"], dropna=False)["seconds"].agg(
+        calls="count",
+        mean="mean",
+        p95=lambda s: s.quantile(0.95),
+        max="max",
+        total="sum",
+    )
+    st.dataframe(summary.sort_values("total", ascending=False).reset_index(), use_container_width=True, hide_index=True)
+
+    with st.expander("Latest spans"):
+        st.dataframe(spans.iloc[::-1].head(500), use_container_width=True, hide_index=True)
+
+# ───────────────────────────────────────────────
+# Caches
+# ───────────────────────────────────────────────
+st.subheader("Caches")
+caches = pd.DataFrame(cache_stats())
+if caches.empty:
+    st.info("No cache lookup recorded yet.")
+else:
+    caches["hit rate"] = (caches["hits"] / caches["lookups"]).round(3)
+    st.dataframe(caches, use_container_width=True, hide_index=True)
+
+# ───────────────────────────────────────────────
+# Profiles (open a page with ?profile=cprofile or ?profile=tracemalloc)
+# ───────────────────────────────────────────────
+st.subheader("Profiles")
+profiled = reruns[reruns["profile"].notna()] if "profile" in reruns.columns else reruns.iloc[0:0]
+if profiled.empty:
+    st.info("No profiled rerun yet: open a page with ?profile=cprofile or ?profile=tracemalloc.")
+else:
+    for _, rerun in profiled.iloc[::-1].head(5).iterrows():
+        with st.expander(f"{rerun['page']} · {rerun['time']} · {rerun['seconds']:.3f}s"):
+            st.code(rerun["profile"])
+
+# ───────────────────────────────────────────────
+# Export
+# ───────────────────────────────────────────────
+col1, col2 = st.columns(2)
+with col1:
+    if st.button("Export to log file"):
+        st.success(f"Written to {export_log()}")
+with col2:
+    if st.button("Clear timings"):
+        reset()
+        st.rerun()
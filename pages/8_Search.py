@@ -0,0 +1,66 @@
+import time
+
+import streamlit as st
+
+from project.app.shared import load_data, load_facet_index, load_search_index, start_page
+from project.ml_logic.data import load_review_text
+from project.ml_logic.instrumentation import finish_rerun, span
+from project.ml_logic.views import ReviewView
+from project.params import SEARCH_RESULTS
+
+st.set_page_config(page_title="Search Reviews", layout="wide")
+start_page("8_Search")
+
+st.title("🔎 Search Reviews")
+
+review = load_data()
+facets = load_facet_index()
+with st.spinner("Updating the search index..."):
+    index = load_search_index()
+
+query = st.text_input("Search the reviews", placeholder='e.g. "long queue" OR crowded -parking', key="search_query")
+
+with span("filter"):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        selected_regions = st.multiselect("Region", facets.options("Region"), key="search_region")
+    with col2:
+        selected_cities = st.multiselect("City", facets.options("City", {"Region": selected_regions}), key="search_city")
+    with col3:
+        selected_types = st.multiselect(
+            "Place Type",
+            facets.options("Place Type", {"Region": selected_regions, "City": selected_cities}),
+            key="search_place_type",
+        )
+    rows = facets.rows({"Region": selected_regions, "City": selected_cities, "Place Type": selected_types})
+
+k = st.slider("Number of results", 10, 200, SEARCH_RESULTS, step=10, key="search_k")
+
+with st.expander("Search syntax"):
+    st.markdown("""
+- `shower pressure`: reviews with both words
+- `"shower pressure"`: the exact phrase, as written in the review (`"not clean"`)
+- `parking OR traffic`: reviews with either word
+- `-dirty` (or `NOT dirty`): reviews without the word
+
+Results are ranked by relevance (BM25) over the cleaned review text.
+""")
+
+if query.strip():
+    start = time.perf_counter()
+    with span("search.query"):
+        results = index.search(query, rows=rows, k=k)
+    elapsed = time.perf_counter() - start
+
+    st.caption(f"{results.attrs['matches']:,} matching reviews · {elapsed * 1000:.1f} ms")
+    if results.empty:
+        st.info("No review matches this search.")
+    else:
+        with span("search.results"):
+            matches = ReviewView(review, results["row"].to_numpy())
+            facts = matches.to_frame(["Place Name", "Place Type", "City", "Region", "Sentiment Label"])
+            text = load_review_text(matches.rows, columns=["Review Text"])
+            table = facts.join(text).assign(Score=results["score"].round(2).to_numpy())
+        st.dataframe(table.reset_index(drop=True), use_container_width=True, hide_index=True)
+
+finish_rerun()
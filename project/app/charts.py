@@ -0,0 +1,188 @@
+import io
+import json
+import os
+
+import pandas as pd
+import streamlit as st
+
+from project.ml_logic.instrumentation import cache_miss, count_cache, span
+
+# "png": matplotlib/seaborn rendered once and cached as PNG bytes
+# "vega": Vega-Lite JSON spec drawn by the browser (no server-side rendering at all)
+CHART_MODE = os.environ.get("BTS_CHART_MODE", "png")
+
+# Seaborn palettes that also exist as Vega color schemes
+_VEGA_SCHEMES = {"viridis", "magma", "plasma", "inferno", "pastel1", "set2", "tableau10"}
+
+
+def filter_key(selections: dict | None) -> str:
+    """Stable, hashable representation of a filter state for chart cache keys"""
+    return json.dumps({k: sorted(map(str, v)) for k, v in (selections or {}).items() if v}, sort_keys=True)
+
+
+def _png(fig) -> bytes:
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight", dpi=200)
+    # Figure objects (not pyplot) are not tracked by a global manager: nothing to leak
+    fig.clear()
+    return buffer.getvalue()
+
+
+def _pie_png(data: pd.Series, title: str, colors: list | None, figsize: tuple) -> bytes:
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize, dpi=100)
+    ax = fig.subplots()
+    _, texts, autotexts = ax.pie(
+        data.to_numpy(),
+        labels=data.index,
+        colors=colors,
+        autopct="%1.1f%%",
+        startangle=140,
+        textprops={"fontsize": 7},
+    )
+    for i, text in enumerate(texts):
+        if colors:
+            text.set_color(colors[i])
+        text.set_fontsize(8)
+        text.set_fontweight("bold")
+    for atext in autotexts:
+        atext.set_fontsize(7)
+    ax.axis("equal")
+    ax.set_title(title, fontsize=10)
+    return _png(fig)
+
+
+def _bar_png(
+    data: pd.DataFrame,
+    x: str,
+    y: str,
+    order: list | None,
+    palette,
+    title: str,
+    xlabel: str | None,
+    ylabel: str | None,
+    figsize: tuple,
+    rotation: int,
+    title_size: int,
+) -> bytes:
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    category = y if pd.api.types.is_numeric_dtype(data[x]) else x
+    fig = Figure(figsize=figsize, dpi=100)
+    ax = fig.subplots()
+    sns.barplot(data=data, x=x, y=y, order=order, hue=category, hue_order=order, palette=palette, legend=False, ax=ax)
+    ax.set_title(title, fontsize=title_size)
+    ax.set_xlabel(xlabel if xlabel is not None else x)
+    ax.set_ylabel(ylabel if ylabel is not None else y)
+    if rotation:
+        ax.tick_params(axis="x", labelrotation=rotation)
+    fig.tight_layout()
+    return _png(fig)
+
+
+def _vega_color(field: str, palette) -> dict:
+    color = {"field": field, "type": "nominal", "legend": None}
+    if isinstance(palette, (list, tuple)):
+        color["scale"] = {"range": list(palette)}
+    elif isinstance(palette, str) and palette.lower() in _VEGA_SCHEMES:
+        color["scale"] = {"scheme": palette.lower()}
+    return color
+
+
+def _pie_spec(data: pd.Series, title: str, colors: list | None) -> dict:
+    values = [{"label": str(label), "count": int(count)} for label, count in data.items()]
+    return {
+        "title": title,
+        "data": {"values": values},
+        "mark": {"type": "arc", "tooltip": True},
+        "encoding": {
+            "theta": {"field": "count", "type": "quantitative"},
+            "color": {**_vega_color("label", colors), "legend": {"title": None}},
+        },
+    }
+
+
+def _bar_spec(data: pd.DataFrame, x: str, y: str, order, palette, title: str, xlabel, ylabel) -> dict:
+    def encoding(field, label):
+        if pd.api.types.is_numeric_dtype(data[field]):
+            return {"field": field, "type": "quantitative", "title": label if label is not None else field}
+        return {"field": field, "type": "nominal", "sort": list(order) if order is not None else None,
+                "title": label if label is not None else field}
+
+    category = y if pd.api.types.is_numeric_dtype(data[x]) else x
+    return {
+        "title": title,
+        "data": {"values": json.loads(data[[x, y]].to_json(orient="records"))},
+        "mark": {"type": "bar", "tooltip": True},
+        "encoding": {
+            "x": encoding(x, xlabel),
+            "y": encoding(y, ylabel),
+            "color": _vega_color(category, palette),
+        },
+    }
+
+
+@st.cache_data(max_entries=512, show_spinner=False)
+@cache_miss("chart")
+def _render(kind: str, key: str, version: str, mode: str, _data, options: dict):
+    """
+    Rendered chart (PNG bytes or Vega-Lite spec), cached by
+    (chart kind, filter state, data version, options) - not by the data itself,
+    which is derived from those.
+    """
+    if kind == "pie":
+        if mode == "vega":
+            return _pie_spec(_data, options["title"], options.get("colors"))
+        return _pie_png(_data, options["title"], options.get("colors"), options.get("figsize", (2.5, 2.5)))
+
+    if mode == "vega":
+        return _bar_spec(_data, options["x"], options["y"], options.get("order"), options.get("palette"),
+                         options["title"], options.get("xlabel"), options.get("ylabel"))
+    return _bar_png(
+        _data, options["x"], options["y"], options.get("order"), options.get("palette"), options["title"],
+        options.get("xlabel"), options.get("ylabel"), options.get("figsize", (10, 5)), options.get("rotation", 0),
+        options.get("title_size", 12),
+    )
+
+
+def _show(kind: str, data, key: str, version: str, options: dict) -> None:
+    count_cache("chart")
+    with span("render.chart", chart=kind, mode=CHART_MODE):
+        chart = _render(kind, key, version, CHART_MODE, data, options)
+    if CHART_MODE == "vega":
+        st.vega_lite_chart(chart, use_container_width=True)
+    else:
+        st.image(chart, use_container_width=True)
+
+
+def pie_chart(data: pd.Series, key: str, version: str, title: str, colors: list | None = None, figsize: tuple = (2.5, 2.5)) -> None:
+    """Pie chart of a small `label -> count` series"""
+    _show("pie", data, key, version, {"title": title, "colors": colors, "figsize": figsize})
+
+
+def bar_chart(
+    data: pd.DataFrame,
+    key: str,
+    version: str,
+    x: str,
+    y: str,
+    title: str,
+    order: list | None = None,
+    palette=None,
+    xlabel: str | None = None,
+    ylabel: str | None = None,
+    figsize: tuple = (10, 5),
+    rotation: int = 0,
+    title_size: int = 12,
+) -> None:
+    """
+    Bar chart of a small pre-aggregated frame (one bar per row). Horizontal when
+    `x` is numeric, like seaborn's barplot.
+    """
+    _show("bar", data, key, version, {
+        "x": x, "y": y, "title": title, "order": order, "palette": palette,
+        "xlabel": xlabel, "ylabel": ylabel, "figsize": figsize, "rotation": rotation,
+        "title_size": title_size,
+    })
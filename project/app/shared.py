@@ -0,0 +1,233 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from project.ml_logic.attention import ATTENTION_LEVELS, AttentionIndex
+from project.ml_logic.comparison import SentimentComparison
+from project.ml_logic.data import ensure_review_store, load_review_text, load_reviews
+from project.ml_logic.facets import FacetIndex
+from project.ml_logic.inference import assignment_model_hash, with_assignments
+from project.ml_logic.instrumentation import PROFILE_MODES, cache_miss, start_rerun, timed
+from project.ml_logic.rollup import RollupCube
+from project.ml_logic.search import SearchIndex, update_search_index
+from project.ml_logic.topics import load_topics, topic_model_hash
+from project.ml_logic.views import as_shared_frame
+from project.params import (
+    ADMIN_TOKEN,
+    ASSIGNMENTS_CSV,
+    ATTENTION_LEVEL,
+    NEGATIVE_REVIEWS_CSV,
+    PROFILE_MODE,
+    SEARCH_DIR,
+    WARM_UP_ENABLED,
+    WARM_UP_MODELS,
+)
+
+
+def start_page(page: str) -> None:
+    """
+    Start timing this rerun of `page` (ended by `finish_rerun()` at the bottom of
+    the page). Opening the page with `?profile=cprofile` or `?profile=tracemalloc`
+    also profiles the rerun.
+    """
+    profile = st.query_params.get("profile", PROFILE_MODE)
+    start_rerun(page, profile if profile in PROFILE_MODES else PROFILE_MODE)
+    start_warm_up()
+
+
+def is_admin() -> bool:
+    """Whether this session was opened with ?admin=<BTS_ADMIN_TOKEN> (remembered for the session)"""
+    if ADMIN_TOKEN and st.query_params.get("admin") == ADMIN_TOKEN:
+        st.session_state["is_admin"] = True
+    return st.session_state.get("is_admin", False)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+@cache_miss("data")
+def _load_data(version: str, with_text: bool):
+    # cache_resource (not cache_data) so every session gets the same frame, not a copy
+    return load_reviews(with_text=with_text)
+
+
+@timed("load.data_version")
+def data_version() -> str:
+    """Version of the review store; part of every cache key derived from the data"""
+    return ensure_review_store()
+
+
+@timed("load.data", cache="data")
+def load_data(with_text: bool = False):
+    """
+    Review frame shared by all sessions of this server process.
+    Reloaded automatically when the store is rebuilt from a newer CSV.
+    """
+    return _load_data(ensure_review_store(), with_text)
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+@cache_miss("facet_index")
+def _load_facet_index(version: str):
+    return FacetIndex(_load_data(version, False))
+
+
+@timed("load.facet_index", cache="facet_index")
+def load_facet_index():
+    """Region > City > Place Type index over the frame returned by `load_data()`"""
+    return _load_facet_index(ensure_review_store())
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+@cache_miss("rollup_cube")
+def _load_rollup_cube(version: str):
+    return RollupCube.from_reviews(_load_data(version, False))
+
+
+@timed("load.rollup_cube", cache="rollup_cube")
+def load_rollup_cube():
+    """Rating/sentiment roll-up cube of the frame returned by `load_data()`"""
+    return _load_rollup_cube(ensure_review_store())
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+@cache_miss("comparison")
+def _load_comparison(version: str):
+    return SentimentComparison(_load_rollup_cube(version))
+
+
+@timed("load.comparison", cache="comparison")
+def load_comparison():
+    """Sentiment comparison engine; its per-group counts are shared by every session"""
+    return _load_comparison(ensure_review_store())
+
+
+@st.cache_resource(max_entries=len(ATTENTION_LEVELS), show_spinner=False)
+@cache_miss("attention_index")
+def _load_attention_index(version: str, level: str):
+    return AttentionIndex.from_cube(_load_rollup_cube(version), level=level)
+
+
+@timed("load.attention_index", cache="attention_index")
+def load_attention_index(level: str = ATTENTION_LEVEL):
+    """Groups of `level` ranked by attention score (Ministry page), built from the roll-up cube"""
+    return _load_attention_index(ensure_review_store(), level)
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+@cache_miss("complaint_index")
+def _load_complaint_index(version: str):
+    # scipy is only imported by the page section that needs the index
+    from project.ml_logic.complaints import ComplaintIndex
+
+    review = _load_data(version, False)
+    rows = np.flatnonzero((review["Sentiment Label"] == "negative").to_numpy())
+    # Only the text of negative reviews is read from the store
+    text = load_review_text(rows, columns=["Review Text"])
+    return ComplaintIndex.from_reviews(review["City"].to_numpy()[rows], text["Review Text"])
+
+
+@timed("load.complaint_index", cache="complaint_index")
+def load_complaint_index():
+    """Per-city complaint term counts of the negative reviews"""
+    return _load_complaint_index(ensure_review_store())
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+@cache_miss("search_index")
+def _load_search_index(version: str):
+    # Only reviews not indexed yet are tokenized; existing segments are reused
+    update_search_index(index_dir=SEARCH_DIR)
+    return SearchIndex(SEARCH_DIR)
+
+
+@timed("load.search_index", cache="search_index")
+def load_search_index():
+    """Full-text index over `Cleaned Review`, brought up to date with the review store"""
+    return _load_search_index(ensure_review_store())
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+@cache_miss("negative_reviews")
+def _load_negative_reviews(model_hash: str, assignments_mtime: int | None):
+    # Shared read-only by every session: pages select rows through a ReviewView
+    return as_shared_frame(with_assignments(pd.read_csv(NEGATIVE_REVIEWS_CSV)))
+
+
+@timed("load.negative_reviews", cache="negative_reviews")
+def load_negative_reviews():
+    """
+    Negative reviews with the Topic/Cluster of the current models (LDA page),
+    including the online assignments of new reviews. Reloaded when new
+    assignments are written or another model version becomes current.
+    """
+    mtime = ASSIGNMENTS_CSV.stat().st_mtime_ns if ASSIGNMENTS_CSV.exists() else None
+    return _load_negative_reviews(assignment_model_hash(), mtime)
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+@cache_miss("topic_cache")
+def _load_topic_cache(model_hash: str):
+    return load_topics()
+
+
+@timed("load.topic_cache", cache="topic_cache")
+def load_topic_cache():
+    """Precomputed top words and chart images of every LDA topic"""
+    return _load_topic_cache(topic_model_hash())
+
+
+def warm_up(models: bool = WARM_UP_MODELS) -> dict:
+    """
+    Load everything the pages share into this process: the review store and
+    the indexes built on it, the LDA page's data and topic cache and, with
+    `models`, the model artifacts. A step that fails is reported and skipped.
+    Returns the seconds taken by each step (None for failed steps).
+    """
+    import time
+    from functools import partial
+
+    from project.ml_logic.registry import MODEL_NAMES, load_model
+
+    steps = {
+        "data": load_data,
+        "facet_index": load_facet_index,
+        "rollup_cube": load_rollup_cube,
+        "comparison": load_comparison,
+        "attention_index": load_attention_index,
+        "complaint_index": load_complaint_index,
+        "search_index": load_search_index,
+        "negative_reviews": load_negative_reviews,
+        "topic_cache": load_topic_cache,
+    }
+    if models:
+        steps.update({f"model:{name}": partial(load_model, name) for name in MODEL_NAMES})
+
+    timings = {}
+    for name, step in steps.items():
+        start = time.perf_counter()
+        try:
+            step()
+            timings[name] = time.perf_counter() - start
+        except Exception as e:
+            print(f"⚠️ Warm-up step {name} failed: {e}")
+            timings[name] = None
+    print(f"✅ Warm-up done in {sum(t for t in timings.values() if t):.1f}s")
+    return timings
+
+
+@st.cache_resource(show_spinner=False)
+def _warm_up_thread() -> threading.Thread:
+    thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def start_warm_up() -> None:
+    """
+    Start `warm_up()` in a background thread, once per server process, so the
+    pages opened after the first one find their data and models loaded.
+    Disabled with BTS_WARM_UP=0.
+    """
+    if WARM_UP_ENABLED:
+        _warm_up_thread()
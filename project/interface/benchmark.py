@@ -0,0 +1,415 @@
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from project.params import (
+    BENCHMARK_REGRESSION,
+    BENCHMARK_REPEAT,
+    BENCHMARK_RESULTS,
+    BENCHMARK_SIZES,
+    CATEGORICAL_COLUMNS,
+    FLOAT64_COLUMNS,
+    FLOAT_COLUMNS,
+    NEGATIVE_REVIEWS_CSV,
+)
+
+# Same columns, in the same order, as negative_reviews_w_clusters.csv
+REVIEW_COLUMNS = [
+    "Region", "City", "Place Type", "Place Category", "Place Name", "Rating", "Review Text",
+    "Reviewer Language", "Cleaned Review", "neg", "neu", "pos", "compound", "Sentiment Label", "Topic",
+]
+FALLBACK_WORDS = [
+    "room", "staff", "food", "clean", "dirty", "price", "expensive", "wait", "slow", "noise",
+    "parking", "view", "friendly", "location", "service", "great", "bad", "place", "breakfast", "rude",
+]
+N_TOPICS = 5
+
+
+def synthetic_reviews(n_rows: int, seed: int = 0, sample_csv: Path = NEGATIVE_REVIEWS_CSV) -> pd.DataFrame:
+    """
+    `n_rows` synthetic reviews with the schema of negative_reviews_w_clusters.csv.
+
+    Places (Region > City > Place Type/Category) and words are drawn from
+    `sample_csv` when it exists. The number of places grows with `n_rows`
+    (one per 50 reviews) and about 10% of the texts are distinct, so both the
+    group counts and the duplicate rate of a big crawl are reproduced.
+    """
+    rng = np.random.default_rng(seed)
+    if Path(sample_csv).exists():
+        sample = pd.read_csv(sample_csv)
+        places = sample[["Region", "City", "Place Type", "Place Category", "Place Name"]].drop_duplicates()
+        words = np.array(sorted(set(" ".join(sample["Cleaned Review"].dropna().astype(str)).split())))
+    else:
+        places = pd.DataFrame({
+            "Region": ["Central"], "City": ["Riyadh"], "Place Type": ["hotel"],
+            "Place Category": ["lodging"], "Place Name": ["Hotel"],
+        })
+        words = np.array(FALLBACK_WORDS)
+
+    # Scale the place catalogue: copies of the sample places get a numbered name
+    n_places = max(len(places), n_rows // 50)
+    catalogue = places.iloc[np.arange(n_places) % len(places)].reset_index(drop=True)
+    copy = np.arange(n_places) // len(places)
+    catalogue["Place Name"] = np.where(copy == 0, catalogue["Place Name"], catalogue["Place Name"] + " " + copy.astype(str))
+    catalogue["Rating"] = np.round(rng.uniform(2.5, 5.0, n_places), 1)
+
+    n_texts = max(1, min(n_rows, max(1_000, n_rows // 10)))
+    lengths = rng.integers(5, 40, n_texts)
+    text_words = words[rng.integers(0, len(words), lengths.sum())]
+    cleaned = np.array([" ".join(chunk) for chunk in np.split(text_words, np.cumsum(lengths)[:-1])], dtype=object)
+    raw = np.array([text.capitalize() + "." for text in cleaned], dtype=object)
+
+    df = catalogue.iloc[rng.integers(0, n_places, n_rows)].reset_index(drop=True)
+    text_ids = rng.integers(0, n_texts, n_rows)
+    df["Review Text"] = raw[text_ids]
+    df["Reviewer Language"] = np.where(rng.random(n_rows) < 0.95, "en", "ar").astype(object)
+    df["Cleaned Review"] = cleaned[text_ids]
+
+    scores = rng.dirichlet([1.0, 4.0, 2.0], n_rows)
+    df["neg"], df["neu"], df["pos"] = np.round(scores.T, 3)
+    df["compound"] = np.round(np.clip(scores[:, 2] - scores[:, 0] + rng.normal(0, 0.3, n_rows), -1, 1), 4)
+    df["Sentiment Label"] = np.where(
+        df["compound"] >= 0.05, "positive", np.where(df["compound"] <= -0.05, "negative", "neutral")
+    ).astype(object)
+    df["Topic"] = rng.integers(0, N_TOPICS, n_rows)
+    return df[REVIEW_COLUMNS]
+
+
+def as_store_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Same dtypes as `load_reviews()`: categorical facets, float64 Rating, float32 scores, no free text"""
+    df = df.drop(columns=["Review Text", "Cleaned Review"])
+    df = df.astype({col: "category" for col in CATEGORICAL_COLUMNS if col in df.columns})
+    df = df.astype({col: "float64" for col in FLOAT64_COLUMNS if col in df.columns})
+    return df.astype({col: "float32" for col in FLOAT_COLUMNS if col in df.columns})
+
+
+def _random_selections(df: pd.DataFrame, n: int = 20, seed: int = 0) -> list[dict]:
+    """Sidebar-like filter states: a region, then some of its cities and place types"""
+    rng = np.random.default_rng(seed)
+    selections = []
+    for _ in range(n):
+        row = df.iloc[int(rng.integers(0, len(df)))]
+        selection = {"Region": [row["Region"]]}
+        if rng.random() < 0.7:
+            selection["City"] = [row["City"]]
+        if rng.random() < 0.5:
+            selection["Place Type"] = [row["Place Type"]]
+        selections.append(selection)
+    return selections
+
+
+##################  PAGE DATA PATHS  ##################
+
+def _data_filters(state):
+    """1- Data.py: sidebar options, filtered rows and the per-place rating table"""
+    facets, cube, selections = state
+    for selection in selections:
+        facets.options("City", {"Region": selection["Region"]})
+        facets.options("Place Type", selection)
+        facets.rows(selection)
+        cube.view(["Region", "City", "Place Type", "Place Name", "Place Category"], selection)
+        cube.sentiment_counts(selection)
+
+
+def _setup_data_filters(df):
+    from project.ml_logic.facets import FacetIndex
+    from project.ml_logic.rollup import RollupCube
+
+    store = as_store_frame(df)
+    return FacetIndex(store), RollupCube.from_reviews(store), _random_selections(df)
+
+
+def _review_view(state):
+    """4-LDA.py: filtered rows as a view over the shared frame, counts and the rows shown"""
+    from project.ml_logic.views import ReviewView
+
+    store, selections = state
+    reviews = ReviewView(store)
+    for selection in selections:
+        view = reviews.where(selection)
+        view.count_by("Sentiment Label")
+        view.to_frame(["Place Name", "Rating", "Sentiment Label"], limit=1_000)
+
+
+def _setup_review_view(df):
+    return as_store_frame(df), _random_selections(df)
+
+
+def _facet_index(store):
+    from project.ml_logic.facets import FacetIndex
+
+    FacetIndex(store)
+
+
+def _rollup_cube(store):
+    from project.ml_logic.rollup import RollupCube
+
+    RollupCube.from_reviews(store)
+
+
+def _more_groupbys(cube):
+    """5_more.py: rating and sentiment by place type, rating by region and place type"""
+    cube.view(["Place Type"])
+    cube.view(["Region", "Place Type"])
+
+
+def _setup_cube(df):
+    from project.ml_logic.rollup import RollupCube
+
+    return RollupCube.from_reviews(as_store_frame(df))
+
+
+def _complaints(negative):
+    """3_ Ministry Insights.py: complaint tags of every city"""
+    from project.ml_logic.complaints import ComplaintIndex
+
+    ComplaintIndex.from_reviews(negative["City"], negative["Review Text"]).top_k(3)
+
+
+def _setup_negative(df):
+    return df[df["Sentiment Label"] == "negative"]
+
+
+def _attention(cube):
+    """3_ Ministry Insights.py: attention scores and regional priority"""
+    from project.ml_logic.attention import AttentionIndex
+
+    attention = AttentionIndex.from_cube(cube)
+    attention.top(10)
+    attention.top_counts(10)
+
+
+def _topic_lookup(state):
+    """4-LDA.py: reviews of a city / place type with their topics"""
+    negative, selections = state
+    for selection in selections:
+        mask = negative["Region"] == selection["Region"][0]
+        if "City" in selection:
+            mask &= negative["City"] == selection["City"][0]
+        if "Place Type" in selection:
+            mask &= negative["Place Type"] == selection["Place Type"][0]
+        negative.loc[mask, ["Cleaned Review", "Sentiment Label", "Topic"]]
+
+
+def _setup_topic_lookup(df):
+    negative = _setup_negative(df)
+    return negative, _random_selections(negative if len(negative) else df)
+
+
+##################  PIPELINE STAGES  ##################
+
+def _dedup(df):
+    from project.ml_logic.preprocessor import review_hashes
+
+    df[~pd.Series(review_hashes(df)).duplicated().to_numpy()]
+
+
+def _language_filter(df):
+    from project.params import ENGLISH_LANGUAGES
+
+    df[df["Reviewer Language"].str.lower().isin(ENGLISH_LANGUAGES)]
+
+
+def _clean_text(df):
+    from project.ml_logic.preprocessor import clean_text_series
+
+    clean_text_series(df["Review Text"])
+
+
+def _sentiment(df):
+    from project.ml_logic.sentiment import score_texts
+
+    score_texts(df["Cleaned Review"])
+
+
+def _setup_store(df):
+    # Removed with the state once the benchmark is done
+    directory = tempfile.TemporaryDirectory(prefix="bts_benchmark_")
+    df.to_csv(Path(directory.name) / "reviews.csv", index=False)
+    return directory
+
+
+def _review_store(directory):
+    from project.ml_logic.data import build_review_store, load_reviews
+
+    directory = Path(directory.name)
+    build_review_store(directory / "reviews.csv", directory / "store")
+    load_reviews(store_dir=directory / "store")
+
+
+# name -> (setup, run, max_rows). `setup(df)` is not timed; its result is what `run` gets.
+BENCHMARKS = {
+    "page.data_filters": (_setup_data_filters, _data_filters, None),
+    "page.review_view": (_setup_review_view, _review_view, None),
+    "page.facet_index": (as_store_frame, _facet_index, None),
+    "page.rollup_cube": (as_store_frame, _rollup_cube, None),
+    "page.more_groupbys": (_setup_cube, _more_groupbys, None),
+    "page.complaints": (_setup_negative, _complaints, None),
+    "page.attention": (_setup_cube, _attention, None),
+    "page.topic_lookup": (_setup_topic_lookup, _topic_lookup, None),
+    "stage.dedup": (None, _dedup, None),
+    "stage.language_filter": (None, _language_filter, None),
+    "stage.clean_text": (None, _clean_text, 1_000_000),
+    "stage.sentiment": (None, _sentiment, 1_000_000),
+    "stage.review_store": (_setup_store, _review_store, 1_000_000),
+}
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(run, state, repeat: int = BENCHMARK_REPEAT, memory: bool = True) -> dict:
+    """Best wall time of `repeat` runs, then the peak traced memory of one more run"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+
+    result = {"seconds": min(times), "mean_seconds": float(np.mean(times))}
+    if memory:
+        # Separate run: tracing slows the code down and must not skew the timings
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run(state)
+            result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_benchmarks(
+    sizes: list[int] = BENCHMARK_SIZES,
+    names: list[str] | None = None,
+    repeat: int = BENCHMARK_REPEAT,
+    memory: bool = True,
+    results_path: Path = BENCHMARK_RESULTS,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Time every benchmark (or the ones in `names`) on synthetic corpora of each
+    size, append the results to `results_path` (one JSON line per benchmark and
+    size, tagged with a run id and the git commit) and return them.
+    Benchmarks are skipped above their `max_rows`.
+    """
+    names = names or list(BENCHMARKS)
+    unknown = sorted(set(names) - set(BENCHMARKS))
+    if unknown:
+        raise KeyError(f"Unknown benchmarks {unknown}, expected some of {sorted(BENCHMARKS)}")
+
+    run_info = {
+        "run": uuid.uuid4().hex[:8],
+        "commit": _git_commit(),
+        "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+    }
+    results_path = Path(results_path)
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+
+    records = []
+    for n_rows in sizes:
+        df = synthetic_reviews(n_rows, seed=seed)
+        for name in names:
+            setup, run, max_rows = BENCHMARKS[name]
+            if max_rows is not None and n_rows > max_rows:
+                print(f"⏭️  {name} @ {n_rows:,} rows: skipped (max {max_rows:,})")
+                continue
+            state = setup(df) if setup else df
+            record = {**run_info, "benchmark": name, "rows": n_rows, **measure(run, state, repeat, memory)}
+            del state
+
+            with open(results_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+            records.append(record)
+            peak = f", peak {record['peak_mb']:.1f} MB" if "peak_mb" in record else ""
+            print(f"⏱️  {name} @ {n_rows:,} rows: {record['seconds']:.4f}s{peak}")
+        del df
+
+    return pd.DataFrame(records)
+
+
+def load_results(results_path: Path = BENCHMARK_RESULTS) -> pd.DataFrame:
+    return pd.read_json(results_path, lines=True, dtype={"run": str, "commit": str})
+
+
+def compare_runs(
+    baseline: str | None = None,
+    current: str | None = None,
+    results_path: Path = BENCHMARK_RESULTS,
+    threshold: float = BENCHMARK_REGRESSION,
+) -> pd.DataFrame:
+    """
+    Compare two runs (default: the last two) benchmark by benchmark and size.
+    `baseline` / `current` are run ids or git commits. Rows whose time or peak
+    memory grew by more than `threshold` are flagged as regressions.
+    """
+    results = load_results(results_path)
+    runs = results.drop_duplicates("run", keep="last")["run"].tolist()
+
+    def pick(ref, default_index):
+        if ref is None:
+            if len(runs) < abs(default_index):
+                raise ValueError(f"Need at least two benchmark runs in {results_path} to compare")
+            return runs[default_index]
+        matches = results.loc[(results["run"] == ref) | (results["commit"] == ref), "run"]
+        if matches.empty:
+            raise KeyError(f"No benchmark run or commit '{ref}' in {results_path}")
+        return matches.iloc[-1]
+
+    columns = ["benchmark", "rows", "seconds"] + (["peak_mb"] if "peak_mb" in results.columns else [])
+    before = results[results["run"] == pick(baseline, -2)][columns]
+    after = results[results["run"] == pick(current, -1)][columns]
+    comparison = before.merge(after, on=["benchmark", "rows"], suffixes=(" before", " after"))
+
+    comparison["time ratio"] = comparison["seconds after"] / comparison["seconds before"]
+    regression = comparison["time ratio"] > threshold
+    if "peak_mb" in columns:
+        comparison["memory ratio"] = comparison["peak_mb after"] / comparison["peak_mb before"]
+        regression |= comparison["memory ratio"] > threshold
+    comparison["regression"] = regression
+    return comparison.sort_values(["benchmark", "rows"]).reset_index(drop=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard data paths and pipeline stages")
+    parser.add_argument("--sizes", type=int, nargs="+", default=BENCHMARK_SIZES)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmarks to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=BENCHMARK_REPEAT)
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory run")
+    parser.add_argument("--results", type=Path, default=BENCHMARK_RESULTS)
+    parser.add_argument("--compare", nargs="*", metavar="RUN",
+                        help="compare two runs or commits (default: the last two) instead of running")
+    args = parser.parse_args()
+
+    if args.compare is not None:
+        comparison = compare_runs(*args.compare[:2], results_path=args.results)
+        print(comparison.to_string(index=False))
+        if comparison["regression"].any():
+            raise SystemExit(f"❌ {int(comparison['regression'].sum())} regression(s)")
+        return
+
+    run_benchmarks(args.sizes, args.only, args.repeat, not args.no_memory, args.results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import heapq
+import threading
+
+import numpy as np
+import pandas as pd
+
+from project.ml_logic.rollup import RollupCube, _aggregate
+from project.params import ATTENTION_LEVEL, ATTENTION_SCORER, ATTENTION_TARGET_RATING
+
+ATTENTION_LEVELS = {
+    "place": ["Region", "City", "Place Type", "Place Name"],
+    "city": ["Region", "City"],
+    "region": ["Region"],
+    "place_type": ["Place Type"],
+}
+ATTENTION_MEASURES = ["Total Reviews", "negative", "Rating Sum", "Rating Count"]
+
+
+def negative_rate_gap(total: np.ndarray, negative: np.ndarray, rating: np.ndarray) -> np.ndarray:
+    """Negative Rate × (4.5 − Average Rating)"""
+    # Rounded like the Ministry page always displayed them
+    negative_rate = np.round(negative / total * 100, 1)
+    return negative_rate * (ATTENTION_TARGET_RATING - np.round(rating, 2))
+
+
+def negative_volume_gap(total: np.ndarray, negative: np.ndarray, rating: np.ndarray) -> np.ndarray:
+    """Negative Reviews × (4.5 − Average Rating)"""
+    return negative * (ATTENTION_TARGET_RATING - np.round(rating, 2))
+
+
+def negative_rate(total: np.ndarray, negative: np.ndarray, rating: np.ndarray) -> np.ndarray:
+    """Negative Rate"""
+    return np.round(negative / total * 100, 1)
+
+
+ATTENTION_SCORERS = {
+    "negative_rate_gap": negative_rate_gap,
+    "negative_volume_gap": negative_volume_gap,
+    "negative_rate": negative_rate,
+}
+
+
+class AttentionIndex:
+    """
+    Running per-group (place, city or region) review counts, negative counts and
+    rating sums, with the groups kept in a max-heap by attention score.
+
+    A new batch only rescores the groups it touches and pushes their new score;
+    outdated heap entries are dropped lazily when the top is read. Reading the
+    top-k costs O(k log n) in the number of groups and is cached until the next
+    update, so the Ministry page does not depend on the number of reviews.
+    Both updates and reads rewrite the heap, so a lock serializes them on the
+    instance shared by every session.
+    """
+
+    def __init__(self, level: str = ATTENTION_LEVEL, scorer: str = ATTENTION_SCORER):
+        if level not in ATTENTION_LEVELS:
+            raise KeyError(f"Unknown attention level '{level}', expected one of {sorted(ATTENTION_LEVELS)}")
+        if scorer not in ATTENTION_SCORERS:
+            raise KeyError(f"Unknown attention scorer '{scorer}', expected one of {sorted(ATTENTION_SCORERS)}")
+        self.level = level
+        self.scorer = scorer
+        self.keys = ATTENTION_LEVELS[level]
+
+        self.groups = []
+        self._group_ids = {}
+        self.measures = np.zeros((0, len(ATTENTION_MEASURES)))
+        self.scores = np.zeros(0)
+        # Heap of (-score, group, id, generation); an entry is current if its generation is
+        self._heap = []
+        self._generation = np.zeros(0, dtype=np.int64)
+        self._top = {}
+        self._lock = threading.Lock()
+
+    @property
+    def formula(self) -> str:
+        return ATTENTION_SCORERS[self.scorer].__doc__
+
+    @classmethod
+    def from_reviews(cls, df: pd.DataFrame, **kwargs) -> "AttentionIndex":
+        return cls(**kwargs).update(df)
+
+    @classmethod
+    def from_cube(cls, cube: RollupCube, **kwargs) -> "AttentionIndex":
+        """Build from the roll-up cube cells instead of the raw reviews"""
+        return cls(**kwargs)._fold(cube.cells)
+
+    def update(self, batch: pd.DataFrame) -> "AttentionIndex":
+        """Fold a batch of new reviews into the running counts"""
+        if len(batch) == 0:
+            return self
+        return self._fold(_aggregate(batch))
+
+    def _fold(self, cells: pd.DataFrame) -> "AttentionIndex":
+        grouped = cells.groupby(self.keys, observed=True, sort=False)[ATTENTION_MEASURES].sum()
+        if grouped.empty:
+            return self
+
+        with self._lock:
+            for group in grouped.index:
+                group = group if isinstance(group, tuple) else (group,)
+                if group not in self._group_ids:
+                    self._group_ids[group] = len(self.groups)
+                    self.groups.append(group)
+            ids = np.array([
+                self._group_ids[group if isinstance(group, tuple) else (group,)] for group in grouped.index
+            ], dtype=np.int64)
+
+            n_groups = len(self.groups)
+            if n_groups > len(self.measures):
+                self.measures = np.vstack([self.measures, np.zeros((n_groups - len(self.measures), len(ATTENTION_MEASURES)))])
+                self.scores = np.concatenate([self.scores, np.full(n_groups - len(self.scores), np.nan)])
+                self._generation = np.concatenate([self._generation, np.zeros(n_groups - len(self._generation), dtype=np.int64)])
+            np.add.at(self.measures, ids, grouped.to_numpy(dtype="float64"))
+
+            # Rescore the touched groups only
+            ids = np.unique(ids)
+            total, negative, rating = self._columns(ids)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                self.scores[ids] = ATTENTION_SCORERS[self.scorer](total, negative, rating)
+            self._generation[ids] += 1
+            for group_id in ids.tolist():
+                score = self.scores[group_id]
+                if not np.isnan(score):
+                    heapq.heappush(self._heap, (-score, self.groups[group_id], group_id, self._generation[group_id]))
+
+            if len(self._heap) > 2 * n_groups + 64:
+                self._heap = [entry for entry in self._heap if self._current(entry)]
+                heapq.heapify(self._heap)
+            self._top = {}
+        return self
+
+    def _columns(self, ids: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        total, negative, rating_sum, rating_count = self.measures[ids].T
+        rating = rating_sum / np.where(rating_count > 0, rating_count, np.nan)
+        return total, negative, rating
+
+    def _current(self, entry: tuple) -> bool:
+        return self._generation[entry[2]] == entry[3]
+
+    def _top_ids(self, k: int) -> list[int]:
+        found, popped = [], []
+        while self._heap and len(found) < k:
+            entry = heapq.heappop(self._heap)
+            # Outdated entries are not pushed back
+            if self._current(entry):
+                found.append(entry[2])
+                popped.append(entry)
+        for entry in popped:
+            heapq.heappush(self._heap, entry)
+        return found
+
+    def top(self, k: int) -> pd.DataFrame:
+        """
+        The k highest-scoring groups, highest first (ties by group key): the group
+        keys, `Total Reviews`, `Negative Reviews`, `Rating`, `Negative Rate (%)`
+        and `Score`.
+        """
+        with self._lock:
+            if k not in self._top:
+                ids = np.array(self._top_ids(k), dtype=np.int64)
+                total, negative, rating = self._columns(ids)
+                top = pd.DataFrame([self.groups[i] for i in ids], columns=self.keys)
+                top["Total Reviews"] = total.astype("int64")
+                top["Negative Reviews"] = negative.astype("int64")
+                top["Rating"] = np.round(rating, 2)
+                top["Negative Rate (%)"] = np.round(negative / total * 100, 1)
+                top["Score"] = self.scores[ids]
+                self._top[k] = top
+            return self._top[k]
+
+    def top_counts(self, k: int, by: str = "Region") -> pd.Series:
+        """How many of the top-k groups fall in each `by` value, largest first"""
+        return self.top(k)[by].value_counts()
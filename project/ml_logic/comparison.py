@@ -0,0 +1,112 @@
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from project.ml_logic.rollup import SENTIMENT_LABELS, RollupCube
+from project.params import COMPARISON_CACHE_SIZE, COMPARISON_CONFIDENCE
+
+COMPARE_LEVELS = ["Region", "City", "Place Type"]
+
+
+def wilson_interval(successes: np.ndarray, totals: np.ndarray, confidence: float = COMPARISON_CONFIDENCE) -> tuple[np.ndarray, np.ndarray]:
+    """Wilson score interval of the proportions `successes / totals` (NaN where totals is 0)"""
+    from scipy.stats import norm
+
+    successes = np.asarray(successes, dtype="float64")
+    totals = np.asarray(totals, dtype="float64")
+    z = norm.ppf(0.5 + confidence / 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = successes / totals
+        denominator = 1 + z**2 / totals
+        center = (p + z**2 / (2 * totals)) / denominator
+        margin = z * np.sqrt(p * (1 - p) / totals + z**2 / (4 * totals**2)) / denominator
+    return center - margin, center + margin
+
+
+class SentimentComparison:
+    """
+    Sentiment distributions of any number of regions, cities or place types,
+    under one shared filter (e.g. the place types to include).
+
+    Counts come from the roll-up cube: all requested groups are rolled up in one
+    grouped pass over the cube cells, and each group's counts are kept (keyed
+    by compared level, value and shared filter) so a widget change only
+    computes the groups that were not shown before.
+    """
+
+    def __init__(self, cube: RollupCube, cache_size: int = COMPARISON_CACHE_SIZE):
+        self.cube = cube
+        self.cache_size = cache_size
+        self._counts = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _where_key(where: dict | None) -> str:
+        return json.dumps({k: sorted(map(str, v)) for k, v in (where or {}).items() if v}, sort_keys=True)
+
+    def counts(self, by: str, values: list, where: dict | None = None) -> pd.DataFrame:
+        """Per-label review counts, one row per value of `by` (in the order of `values`)"""
+        if by not in COMPARE_LEVELS:
+            raise KeyError(f"Cannot compare by '{by}', expected one of {COMPARE_LEVELS}")
+        where = {key: selected for key, selected in (where or {}).items() if key != by}
+        where_key = self._where_key(where)
+
+        with self._lock:
+            found = {value: self._counts.get((by, value, where_key)) for value in values}
+            for value, row in found.items():
+                if row is not None:
+                    self._counts.move_to_end((by, value, where_key))
+
+        missing = [value for value, row in found.items() if row is None]
+        if missing:
+            # One grouped pass for every group not computed yet
+            grouped = self.cube.view([by], {**where, by: missing}).set_index(by)[SENTIMENT_LABELS]
+            grouped = grouped.reindex(missing, fill_value=0)
+            with self._lock:
+                for value, row in zip(missing, grouped.to_numpy(dtype="int64")):
+                    found[value] = self._counts[(by, value, where_key)] = row
+                while len(self._counts) > self.cache_size:
+                    self._counts.popitem(last=False)
+
+        rows = [found[value] for value in values]
+        return pd.DataFrame(
+            np.array(rows, dtype="int64").reshape(len(values), len(SENTIMENT_LABELS)),
+            index=pd.Index(values, name=by),
+            columns=SENTIMENT_LABELS,
+        )
+
+    def compare(
+        self,
+        by: str,
+        values: list,
+        where: dict | None = None,
+        normalize: bool = False,
+        confidence: float | None = None,
+        order: list[str] = SENTIMENT_LABELS,
+    ) -> pd.DataFrame:
+        """
+        Long table with one row per (group, sentiment label): `Review Count`,
+        `Share (%)` of the group's reviews and, with `confidence`, the Wilson
+        interval of that share (`CI Low (%)`, `CI High (%)`). With `normalize`,
+        `Value` is the share instead of the count (what a chart should plot).
+        """
+        counts = self.counts(by, values, where)[list(order)]
+        totals = counts.sum(axis=1).to_numpy()[:, None]
+
+        table = pd.DataFrame({
+            by: np.repeat(counts.index.to_numpy(), len(order)),
+            "Sentiment Label": np.tile(order, len(counts)),
+            "Review Count": counts.to_numpy().ravel(),
+            "Total Reviews": np.repeat(totals.ravel(), len(order)),
+        })
+        with np.errstate(divide="ignore", invalid="ignore"):
+            table["Share (%)"] = (counts.to_numpy() / totals * 100).ravel().round(1)
+        if confidence is not None:
+            low, high = wilson_interval(counts.to_numpy(), totals, confidence)
+            table["CI Low (%)"] = (low * 100).ravel().round(1)
+            table["CI High (%)"] = (high * 100).ravel().round(1)
+        table["Value"] = table["Share (%)"] if normalize else table["Review Count"]
+        return table
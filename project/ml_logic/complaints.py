@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+COMPLAINT_STOP_WORDS = frozenset([
+    "the", "and", "was", "were", "are", "with", "very", "but", "not", "for", "this",
+    "that", "they", "too", "had", "have", "has", "just", "you", "from", "all", "out",
+    "about", "our", "there", "their", "been", "after", "place", "restaurant", "hotel",
+    "visit", "service",
+])
+
+
+def tokenize(texts: pd.Series) -> pd.Series:
+    """
+    Vectorized version of the Ministry page's `clean_text`: lowercase, keep
+    letters and whitespace only, split. Stop words and short tokens are dropped
+    by the caller once the tokens are exploded.
+    """
+    return texts.astype(str).str.lower().str.replace(r"[^a-z\s]", "", regex=True).str.split()
+
+
+class ComplaintIndex:
+    """
+    Per-city complaint term counts for negative reviews.
+
+    Reviews are tokenized once and their counts accumulated into a sparse
+    (city x term) matrix, so the top complaints of a city are a partial sort of
+    one sparse row instead of concatenating every token list of the city.
+    New negative reviews are added with `update()` without recounting the others.
+    """
+
+    def __init__(self):
+        self.cities = []
+        self.terms = []
+        self._city_ids = {}
+        self._term_ids = {}
+        self.counts = sp.csr_matrix((0, 0), dtype=np.int64)
+        # 1 + stream position of the first occurrence of each (city, term), for Counter-like tie-breaking
+        self.first_seen = sp.csr_matrix((0, 0), dtype=np.int64)
+        self._n_tokens = 0
+        self._top = {}
+
+    @classmethod
+    def from_reviews(cls, cities: pd.Series, texts: pd.Series) -> "ComplaintIndex":
+        return cls().update(cities, texts)
+
+    @staticmethod
+    def _ids(values, ids: dict, names: list) -> np.ndarray:
+        for value in values:
+            if value not in ids:
+                ids[value] = len(names)
+                names.append(value)
+        return np.array([ids[value] for value in values], dtype=np.int64)
+
+    def update(self, cities: pd.Series, texts: pd.Series) -> "ComplaintIndex":
+        """Add a batch of negative reviews (rows with a missing city or text are ignored)"""
+        batch = pd.DataFrame({"City": np.asarray(cities, dtype=object), "Text": np.asarray(texts, dtype=object)})
+        batch = batch.dropna()
+        self._ids(batch["City"].unique(), self._city_ids, self.cities)
+
+        tokens = batch.assign(Token=tokenize(batch["Text"])).explode("Token")[["City", "Token"]].dropna()
+        tokens = tokens[(tokens["Token"].str.len() > 2) & ~tokens["Token"].isin(COMPLAINT_STOP_WORDS)]
+        tokens["Position"] = np.arange(self._n_tokens + 1, self._n_tokens + 1 + len(tokens))
+        self._n_tokens += len(tokens)
+        pairs = tokens.groupby(["City", "Token"], sort=False)["Position"].agg(["size", "min"])
+
+        city_ids = np.array([self._city_ids[city] for city in pairs.index.get_level_values("City")], dtype=np.int64)
+        term_ids = self._ids(pairs.index.get_level_values("Token").tolist(), self._term_ids, self.terms)
+        shape = (len(self.cities), len(self.terms))
+
+        self.counts.resize(shape)
+        self.counts = self.counts + sp.csr_matrix((pairs["size"].to_numpy(), (city_ids, term_ids)), shape=shape)
+        self.first_seen.resize(shape)
+        first_seen = sp.csr_matrix((pairs["min"].to_numpy(), (city_ids, term_ids)), shape=shape)
+        self.first_seen = self.first_seen + first_seen - first_seen.multiply(self.first_seen > 0)
+        self._top = {}
+        return self
+
+    def top_terms(self, city: str, k: int = 3) -> list[tuple[str, int]]:
+        """Top-k (term, count) for a city, ties in first-seen order like `Counter.most_common`"""
+        city_id = self._city_ids[city]
+        row = self.counts.getrow(city_id)
+        data, indices = row.data, row.indices
+        if len(data) > k:
+            # Partial sort: keep everything tied with the k-th largest count, then order those
+            kth = np.partition(data, len(data) - k)[len(data) - k]
+            keep = data >= kth
+            data, indices = data[keep], indices[keep]
+        first_seen = self.first_seen[city_id, indices].toarray().ravel() if len(indices) else []
+        ranked = sorted(zip(data.tolist(), first_seen, indices.tolist()), key=lambda x: (-x[0], x[1]))
+        return [(self.terms[term], count) for count, _, term in ranked[:k]]
+
+    def top_k(self, k: int = 3) -> pd.DataFrame:
+        """`City` / `Top Complaints` table (cities sorted by name), cached until the next update"""
+        if k not in self._top:
+            cities = sorted(self.cities)
+            self._top[k] = pd.DataFrame({
+                "City": cities,
+                "Top Complaints": [self.top_terms(city, k) for city in cities],
+            })
+        return self._top[k]
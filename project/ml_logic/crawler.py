@@ -0,0 +1,249 @@
+import asyncio
+import csv
+import json
+import random
+import time
+from pathlib import Path
+
+import httpx
+
+from project.params import (
+    CITIES,
+    GOOGLE_API_KEY,
+    PLACE_TYPES,
+    PLACES_API_URL,
+    RAW_DATA_DIR,
+)
+
+REVIEW_FIELDS = [
+    "Region",
+    "City",
+    "Place Type",
+    "Place Category",
+    "Place Name",
+    "Rating",
+    "Review Text",
+    "Reviewer Language",
+]
+CHECKPOINT_FILE = "_checkpoint.jsonl"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Google-level statuses worth retrying (a fresh next_page_token is INVALID_REQUEST for ~2s)
+RETRY_API_STATUSES = {"OVER_QUERY_LIMIT", "UNKNOWN_ERROR", "INVALID_REQUEST"}
+
+
+class RetryableError(Exception):
+    pass
+
+
+class TokenBucket:
+    """
+    Async token bucket: allows `rate` requests per second on average,
+    with bursts of up to `capacity` requests.
+    """
+
+    def __init__(self, rate: float, capacity: int | None = None):
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class Checkpoint:
+    """
+    Append-only JSONL log of finished work, so an interrupted crawl resumes
+    without re-running searches or re-fetching place details:
+    - {"kind": "search", "city", "type", "place_ids"}: search results of a (city, type)
+    - {"kind": "place", "city", "type", "place_id"}: place whose reviews are saved
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.searches = {}
+        self.places = set()
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line after a crash
+                    if entry["kind"] == "search":
+                        self.searches[(entry["city"], entry["type"])] = entry["place_ids"]
+                    else:
+                        self.places.add((entry["city"], entry["type"], entry["place_id"]))
+
+    def _append(self, entry: dict) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def add_search(self, city: str, place_type: str, place_ids: list[str]) -> None:
+        self.searches[(city, place_type)] = place_ids
+        self._append({"kind": "search", "city": city, "type": place_type, "place_ids": place_ids})
+
+    def add_place(self, city: str, place_type: str, place_id: str) -> None:
+        self.places.add((city, place_type, place_id))
+        self._append({"kind": "place", "city": city, "type": place_type, "place_id": place_id})
+
+
+class PlacesCrawler:
+    """
+    Concurrent Places API crawler: one pooled HTTP client, a token-bucket rate
+    limit, bounded concurrency, retries with exponential backoff, and per
+    (city, type, place_id) checkpointing. Reviews are appended to
+    `<output_dir>/<city>.csv` as soon as each place is fetched.
+    """
+
+    def __init__(
+        self,
+        api_key: str = GOOGLE_API_KEY,
+        base_url: str = PLACES_API_URL,
+        output_dir: Path = RAW_DATA_DIR,
+        rate: float = 10.0,
+        max_concurrency: int = 16,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        page_token_delay: float = 2.0,
+        timeout: float = 30.0,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.output_dir = Path(output_dir)
+        self.bucket = TokenBucket(rate)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.page_token_delay = page_token_delay
+        self.timeout = timeout
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.checkpoint = Checkpoint(self.output_dir / CHECKPOINT_FILE)
+        self.stats = {"requests": 0, "retries": 0, "places": 0, "reviews": 0, "errors": 0}
+
+    async def _get(self, client: httpx.AsyncClient, endpoint: str, params: dict) -> dict:
+        params = {**params, "key": self.api_key}
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            self.stats["requests"] += 1
+            try:
+                async with self._semaphore:
+                    response = await client.get(f"{self.base_url}/{endpoint}/json", params=params)
+                if response.status_code in RETRY_STATUSES:
+                    raise RetryableError(f"HTTP {response.status_code}")
+                response.raise_for_status()
+                payload = response.json()
+                if payload.get("status") in RETRY_API_STATUSES:
+                    raise RetryableError(payload["status"])
+                return payload
+            except (httpx.TransportError, RetryableError) as e:
+                if attempt == self.max_retries:
+                    raise
+                self.stats["retries"] += 1
+                # Exponential backoff with full jitter
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    async def _search(self, client, city: str, place_type: str, max_results: int) -> list[str]:
+        params = {"query": f"{place_type}s in {city}"}
+        place_ids = []
+        while True:
+            payload = await self._get(client, "textsearch", params)
+            place_ids.extend(result["place_id"] for result in payload.get("results", []))
+
+            next_page_token = payload.get("next_page_token")
+            if not next_page_token or len(place_ids) >= max_results:
+                break
+            await asyncio.sleep(self.page_token_delay)
+            params = {"pagetoken": next_page_token}
+        return place_ids[:max_results]
+
+    def _save_reviews(self, city: str, rows: list[dict]) -> None:
+        path = self.output_dir / f"{city}.csv"
+        is_new = not path.exists()
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=REVIEW_FIELDS)
+            if is_new:
+                writer.writeheader()
+            writer.writerows(rows)
+
+    async def _fetch_place(self, client, city_info: dict, place_type: str, place_id: str) -> None:
+        city, region = city_info["city"], city_info["region"]
+        try:
+            payload = await self._get(client, "details", {
+                "place_id": place_id,
+                "fields": "name,rating,reviews,types",
+            })
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"❌ Error in {place_type} at {city} ({place_id}): {e}")
+            return
+
+        details = payload.get("result", {})
+        rows = [{
+            "Region": region,
+            "City": city,
+            "Place Type": place_type,
+            "Place Category": (details.get("types") or [None])[0],
+            "Place Name": details.get("name", ""),
+            "Rating": details.get("rating"),
+            "Review Text": review.get("text", ""),
+            "Reviewer Language": review.get("language", "unknown"),
+        } for review in details.get("reviews", [])]
+
+        # Reviews first, then the checkpoint: a crash in between re-fetches one place at worst
+        if rows:
+            self._save_reviews(city, rows)
+        self.checkpoint.add_place(city, place_type, place_id)
+        self.stats["places"] += 1
+        self.stats["reviews"] += len(rows)
+
+    async def _crawl_type(self, client, city_info: dict, place: dict) -> None:
+        city, place_type = city_info["city"], place["type"]
+        place_ids = self.checkpoint.searches.get((city, place_type))
+        if place_ids is None:
+            print(f"🔍 Searching for {place_type}s in {city}...")
+            try:
+                place_ids = await self._search(client, city, place_type, place["max_results"])
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"❌ Search failed for {place_type} at {city}: {e}")
+                return
+            self.checkpoint.add_search(city, place_type, place_ids)
+
+        await asyncio.gather(*[
+            self._fetch_place(client, city_info, place_type, place_id)
+            for place_id in place_ids
+            if (city, place_type, place_id) not in self.checkpoint.places
+        ])
+
+    async def crawl(self, cities: list[dict] = CITIES, place_types: list[dict] = PLACE_TYPES) -> dict:
+        # Bounds in-flight requests; backoff and page-token sleeps do not hold a slot
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+        start = time.perf_counter()
+
+        async with httpx.AsyncClient(limits=limits, timeout=self.timeout) as client:
+            await asyncio.gather(*[
+                self._crawl_type(client, city_info, place)
+                for city_info in cities
+                for place in place_types
+            ])
+
+        self.stats["seconds"] = round(time.perf_counter() - start, 2)
+        print(f"✅ Crawl done: {self.stats}")
+        return self.stats
+
+
+def crawl(cities: list[dict] = CITIES, place_types: list[dict] = PLACE_TYPES, **kwargs) -> dict:
+    """Run a (resumable) crawl of every city x place type. See PlacesCrawler for options."""
+    return asyncio.run(PlacesCrawler(**kwargs).crawl(cities, place_types))
@@ -0,0 +1,165 @@
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from project.params import (
+    CATEGORICAL_COLUMNS,
+    FLOAT64_COLUMNS,
+    FLOAT_COLUMNS,
+    REVIEW_CSV,
+    STORE_DIR,
+    TEXT_COLUMNS,
+)
+
+FACTS_FILE = "reviews.arrow"
+TEXT_FILE = "reviews_text.arrow"
+# Bumped when the store's schema changes, so stores built by older code are rebuilt
+STORE_FORMAT = "2"
+
+
+def _source_signature(csv_path: Path) -> str:
+    stat = os.stat(csv_path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _write_arrow(table: pa.Table, path: Path) -> None:
+    """
+    Write an uncompressed Arrow IPC file atomically, so concurrent readers
+    (other sessions, other worker processes) never see a half-written file.
+    """
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def _read_arrow(path: Path) -> pa.Table:
+    # Memory-mapped: pages are shared through the OS page cache between processes
+    return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+
+def build_review_store(csv_path: Path = REVIEW_CSV, store_dir: Path = STORE_DIR) -> str:
+    """
+    Convert the review CSV into two typed, columnar Arrow IPC files:
+    - reviews.arrow: categorical facets, float64 Rating, float32 scores and any other column
+    - reviews_text.arrow: free text, only read by pages that need it
+    Returns the store version.
+    """
+    csv_path, store_dir = Path(csv_path), Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+
+    dtypes = {col: "category" for col in CATEGORICAL_COLUMNS}
+    dtypes.update({col: "float32" for col in FLOAT_COLUMNS})
+    dtypes.update({col: "float64" for col in FLOAT64_COLUMNS})
+    df = pd.read_csv(csv_path, dtype=dtypes)
+
+    signature = _source_signature(csv_path)
+    version = hashlib.sha1(
+        (signature + "|" + STORE_FORMAT + "|" + ",".join(df.columns)).encode()
+    ).hexdigest()[:12]
+    metadata = {
+        b"source_signature": signature.encode(),
+        b"format": STORE_FORMAT.encode(),
+        b"version": version.encode(),
+    }
+
+    text_cols = [col for col in df.columns if col in TEXT_COLUMNS]
+    fact_cols = [col for col in df.columns if col not in TEXT_COLUMNS]
+
+    # Text is written first so a reader that sees the new facts file also finds matching text
+    text = pa.Table.from_pandas(df[text_cols], preserve_index=False)
+    _write_arrow(text.replace_schema_metadata(metadata), store_dir / TEXT_FILE)
+    facts = pa.Table.from_pandas(df[fact_cols], preserve_index=False)
+    _write_arrow(facts.replace_schema_metadata(metadata), store_dir / FACTS_FILE)
+
+    print(f"✅ Review store built: {len(df)} rows, version {version}")
+    return version
+
+
+def store_version(store_dir: Path = STORE_DIR) -> str | None:
+    """Version of the store on disk, or None if it has not been built yet"""
+    path = Path(store_dir) / FACTS_FILE
+    if not path.exists():
+        return None
+    schema = pa.ipc.open_file(pa.memory_map(str(path), "r")).schema
+    return (schema.metadata or {}).get(b"version", b"").decode() or None
+
+
+def ensure_review_store(csv_path: Path = REVIEW_CSV, store_dir: Path = STORE_DIR) -> str:
+    """
+    Return the current store version, (re)building the store first if it is
+    missing or older than the source CSV. Cheap enough to call on every rerun.
+    """
+    csv_path, store_dir = Path(csv_path), Path(store_dir)
+    path = store_dir / FACTS_FILE
+
+    if not csv_path.exists():
+        version = store_version(store_dir)
+        if version is None:
+            raise FileNotFoundError(f"No review store in {store_dir} and no source CSV at {csv_path}")
+        return version
+
+    if path.exists():
+        schema = pa.ipc.open_file(pa.memory_map(str(path), "r")).schema
+        metadata = schema.metadata or {}
+        up_to_date = metadata.get(b"source_signature", b"").decode() == _source_signature(csv_path)
+        if up_to_date and metadata.get(b"format", b"").decode() == STORE_FORMAT:
+            return metadata[b"version"].decode()
+
+    return build_review_store(csv_path, store_dir)
+
+
+def _arrow_strings(pa_type: pa.DataType):
+    # Keep text in Arrow memory (i.e. inside the memory map) instead of Python objects
+    if pa.types.is_string(pa_type) or pa.types.is_large_string(pa_type):
+        return pd.ArrowDtype(pa_type)
+    return None
+
+
+def load_reviews(
+    columns: list[str] | None = None,
+    with_text: bool = False,
+    store_dir: Path = STORE_DIR,
+) -> pd.DataFrame:
+    """
+    Load the review facts (without free text unless `with_text`) from the store.
+    Categoricals come back as pandas categoricals, Rating as float64, scores as float32.
+    """
+    table = _read_arrow(Path(store_dir) / FACTS_FILE)
+    if columns is not None:
+        table = table.select([col for col in columns if col in table.column_names])
+    df = table.to_pandas(split_blocks=True)
+
+    if with_text:
+        df = df.join(load_review_text(store_dir=store_dir))
+    return df
+
+
+def load_review_text(
+    rows: np.ndarray | None = None,
+    columns: list[str] | None = None,
+    store_dir: Path = STORE_DIR,
+) -> pd.DataFrame:
+    """
+    Load free-text columns, optionally only for the given row positions.
+    The returned index matches the row positions of `load_reviews`.
+    """
+    table = _read_arrow(Path(store_dir) / TEXT_FILE)
+    if columns is not None:
+        table = table.select([col for col in columns if col in table.column_names])
+
+    if rows is None:
+        index = pd.RangeIndex(table.num_rows)
+    else:
+        rows = np.asarray(rows, dtype=np.int64)
+        table = table.take(pa.array(rows))
+        index = pd.Index(rows)
+
+    df = table.to_pandas(split_blocks=True, types_mapper=_arrow_strings)
+    df.index = index
+    return df
@@ -0,0 +1,178 @@
+"""
+Local stand-in for the Google Places API (textsearch + details endpoints),
+used to exercise and benchmark the crawler offline:
+
+    with FakePlacesServer(latency=0.05, failure_rate=0.1) as server:
+        crawl(base_url=server.url, output_dir="/tmp/crawl", page_token_delay=0)
+
+Or standalone: python -m project.ml_logic.fake_places --port 8765
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PAGE_SIZE = 20
+REVIEW_SNIPPETS = [
+    "The rooms were clean and the staff was very friendly.",
+    "Food was cold and the service was slow.",
+    "Great location, amazing view of the city.",
+    "Too expensive for what you get, parking was a nightmare.",
+    "Nice place for families, kids loved it.",
+    "المكان رائع والخدمة ممتازة",
+]
+LANGUAGES = ["en", "en", "en", "en-US", "en", "ar"]
+
+
+def _seed(*parts) -> int:
+    return int(hashlib.md5("|".join(map(str, parts)).encode()).hexdigest()[:8], 16)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FakePlacesServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        fake = self.server.fake
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        fake._count(url.path)
+
+        if fake.latency:
+            time.sleep(fake.latency)
+        if fake.failure_rate and fake._rng() < fake.failure_rate:
+            return self._send(fake._rng_choice([429, 500, 503]), {"status": "UNKNOWN_ERROR"})
+
+        if url.path.endswith("/textsearch/json"):
+            return self._send(200, fake.textsearch(params))
+        if url.path.endswith("/details/json"):
+            return self._send(200, fake.details(params))
+        return self._send(404, {"status": "NOT_FOUND"})
+
+
+class FakePlacesServer:
+    """
+    Deterministic fake Places API served from a background thread.
+    Every query returns `places_per_query` places (paged by 20 with next_page_token),
+    every place `reviews_per_place` reviews. `latency` (seconds) and
+    `failure_rate` (share of 429/5xx responses) simulate a real upstream.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        places_per_query: int = 45,
+        reviews_per_place: int = 5,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 42,
+    ):
+        self.places_per_query = places_per_query
+        self.reviews_per_place = reviews_per_place
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.requests = {"textsearch": 0, "details": 0}
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/maps/api/place"
+
+    def _count(self, path: str) -> None:
+        with self._lock:
+            for endpoint in self.requests:
+                if f"/{endpoint}/" in path:
+                    self.requests[endpoint] += 1
+
+    def _rng(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def _rng_choice(self, options: list):
+        with self._lock:
+            return self._random.choice(options)
+
+    def textsearch(self, params: dict) -> dict:
+        if "pagetoken" in params:
+            query, offset = params["pagetoken"].rsplit("|", 1)
+            offset = int(offset)
+        else:
+            query, offset = params.get("query", ""), 0
+
+        end = min(offset + PAGE_SIZE, self.places_per_query)
+        payload = {
+            "status": "OK",
+            "results": [{"place_id": f"{_seed(query):08x}-{i}"} for i in range(offset, end)],
+        }
+        if end < self.places_per_query:
+            payload["next_page_token"] = f"{query}|{end}"
+        return payload
+
+    def details(self, params: dict) -> dict:
+        place_id = params.get("place_id", "")
+        rng = random.Random(_seed(place_id))
+        reviews = []
+        for _ in range(self.reviews_per_place):
+            i = rng.randrange(len(REVIEW_SNIPPETS))
+            reviews.append({"text": REVIEW_SNIPPETS[i], "language": LANGUAGES[i]})
+        return {
+            "status": "OK",
+            "result": {
+                "name": f"Place {place_id}",
+                "rating": round(rng.uniform(2.5, 5.0), 1),
+                "types": ["lodging", "point_of_interest"],
+                "reviews": reviews,
+            },
+        }
+
+    def start(self) -> "FakePlacesServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakePlacesServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake Places API server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakePlacesServer(port=args.port, latency=args.latency, failure_rate=args.failure_rate)
+    print(f"Fake Places API on {server.url} (Ctrl+C to stop)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,119 @@
+import csv
+import hashlib
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from project.ml_logic.preprocessor import review_hashes
+from project.ml_logic.registry import artifact_hash, artifact_path, current_version, lda_input, load_model
+from project.params import ASSIGN_BATCH_SIZE, ASSIGNMENTS_CSV, NEGATIVE_REVIEWS_CSV
+
+ASSIGNMENT_FIELDS = ["review_hash", "model", "Topic", "Cluster"]
+
+
+def assignment_model_hash() -> str:
+    """Identifies the (vectorizer, LDA, KMeans) triple assignments were made with"""
+    digest = hashlib.sha256()
+    for name in ("vectorizer", "lda", "kmeans"):
+        digest.update(artifact_hash(artifact_path(name)).encode())
+    return digest.hexdigest()[:16]
+
+
+def load_assignments(path: Path = ASSIGNMENTS_CSV, model: str | None = None) -> pd.DataFrame:
+    """Assignments made with `model` (default: the current models), one row per review hash"""
+    model = model or assignment_model_hash()
+    if not Path(path).exists():
+        return pd.DataFrame(columns=["Topic", "Cluster"], index=pd.Index([], dtype=np.uint64, name="review_hash"))
+    assignments = pd.read_csv(path, dtype={"review_hash": np.uint64, "model": str})
+    assignments = assignments[assignments["model"] == model]
+    return assignments.drop_duplicates("review_hash", keep="last").set_index("review_hash")[["Topic", "Cluster"]]
+
+
+def _predict_batch(texts: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    vectorizer, lda, kmeans = load_model("vectorizer"), load_model("lda"), load_model("kmeans")
+    texts = texts.fillna("").astype(str)
+    # Sparse end to end: the TF-IDF matrix is never densified
+    if lda_input() == "counts":
+        from project.ml_logic.training import term_counts, tfidf_from_counts
+
+        counts = term_counts(vectorizer, texts)
+        X = tfidf_from_counts(vectorizer, counts)
+    else:
+        X = counts = vectorizer.transform(texts)
+
+    clusters = kmeans.predict(X)
+    topics = np.full(X.shape[0], np.nan)
+    if getattr(lda, "n_features_in_", X.shape[1]) == X.shape[1]:
+        topics = lda.transform(counts).argmax(axis=1).astype(float)
+    return topics, clusters
+
+
+def assign_new_reviews(
+    reviews: pd.DataFrame,
+    text_column: str = "Cleaned Review",
+    path: Path = ASSIGNMENTS_CSV,
+    batch_size: int = ASSIGN_BATCH_SIZE,
+) -> int:
+    """
+    Run reviews that have no assignment for the current models through
+    vectorizer -> LDA / KMeans in micro-batches, appending each batch's
+    Topic/Cluster to `path` as soon as it is computed. Returns the number of
+    reviews assigned; reviews assigned by an earlier run are skipped.
+    """
+    model = assignment_model_hash()
+    lda, vectorizer = load_model("lda"), load_model("vectorizer")
+    if getattr(lda, "n_features_in_", None) not in (None, len(vectorizer.vocabulary_)):
+        warnings.warn(
+            f"LDA expects {lda.n_features_in_} features but the vectorizer has "
+            f"{len(vectorizer.vocabulary_)}: only clusters are assigned, topics are left empty"
+        )
+
+    hashes = review_hashes(reviews)
+    assigned = load_assignments(path, model).index
+    todo = np.flatnonzero(~pd.Index(hashes).isin(assigned) & ~pd.Series(hashes).duplicated().to_numpy())
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for start in range(0, len(todo), batch_size):
+        rows = todo[start:start + batch_size]
+        topics, clusters = _predict_batch(reviews[text_column].iloc[rows])
+
+        is_new = not path.exists()
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if is_new:
+                writer.writerow(ASSIGNMENT_FIELDS)
+            writer.writerows(
+                (int(h), model, "" if np.isnan(t) else int(t), int(c))
+                for h, t, c in zip(hashes[rows], topics, clusters)
+            )
+        print(f"Assigned {min(start + batch_size, len(todo))}/{len(todo)} new reviews")
+
+    return len(todo)
+
+
+def with_assignments(reviews: pd.DataFrame, path: Path = ASSIGNMENTS_CSV) -> pd.DataFrame:
+    """
+    `reviews` with the `Topic` and `Cluster` the current models assign them.
+
+    Offline topics already in the data come from the pinned LDA: they are kept
+    (and only missing ones filled in from the online assignments) while the
+    pinned models are current. Once a trained version is current, every topic
+    comes from its own assignments (`make run_assign`), so topic ids of two
+    different LDA models are never mixed in one frame.
+    """
+    assignments = load_assignments(path).reindex(review_hashes(reviews))
+    topics = assignments["Topic"].to_numpy(dtype=float)
+    if "Topic" in reviews.columns and current_version() is None:
+        topics = np.where(reviews["Topic"].isna().to_numpy(), topics, reviews["Topic"].to_numpy(dtype=float))
+    return reviews.assign(
+        Topic=pd.array(topics, dtype="Int64"),
+        Cluster=pd.array(assignments["Cluster"].to_numpy(dtype=float), dtype="Int64"),
+    )
+
+
+def assign_topics(reviews_csv: Path = NEGATIVE_REVIEWS_CSV, batch_size: int = ASSIGN_BATCH_SIZE) -> int:
+    """Assign every not-yet-assigned review of `reviews_csv`"""
+    return assign_new_reviews(pd.read_csv(reviews_csv), batch_size=batch_size)
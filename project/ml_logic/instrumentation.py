@@ -0,0 +1,249 @@
+import functools
+import io
+import json
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from project.params import (
+    INSTRUMENT_BUFFER,
+    INSTRUMENT_ENABLED,
+    INSTRUMENT_EXPORT,
+    INSTRUMENT_LOG,
+    PROFILE_MODE,
+)
+
+PROFILE_MODES = ("", "cprofile", "tracemalloc")
+
+_lock = threading.Lock()
+_spans = deque(maxlen=INSTRUMENT_BUFFER)
+_reruns = deque(maxlen=INSTRUMENT_BUFFER // 10)
+_cache_calls = Counter()
+_cache_misses = Counter()
+# Current rerun and open spans of the calling thread (Streamlit runs each script run in its own thread)
+_local = threading.local()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def _stack() -> list:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+@contextmanager
+def span(name: str, **tags):
+    """
+    Time the enclosed block as `name` ("load.data", "filter", "render.chart"...).
+    Spans opened inside another span record it as their parent, and every span
+    is attributed to the rerun of the calling thread, if any.
+    """
+    if not INSTRUMENT_ENABLED:
+        yield
+        return
+
+    stack = _stack()
+    parent = stack[-1] if stack else None
+    stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        stack.pop()
+        rerun = getattr(_local, "rerun", None)
+        record = {
+            "time": _now(),
+            "rerun": rerun["id"] if rerun else None,
+            "page": rerun["page"] if rerun else None,
+            "span": name,
+            "parent": parent,
+            "seconds": seconds,
+            **tags,
+        }
+        with _lock:
+            _spans.append(record)
+        if rerun is not None:
+            rerun["spans"].append(record)
+
+
+def timed(name: str, cache: str | None = None):
+    """
+    Decorator form of `span`. With `cache`, every call is also counted as a
+    lookup of that cache (see `cache_miss`).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if cache is not None:
+                count_cache(cache)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count_cache(cache: str, miss: bool = False) -> None:
+    if not INSTRUMENT_ENABLED:
+        return
+    with _lock:
+        (_cache_misses if miss else _cache_calls)[cache] += 1
+
+
+def cache_miss(cache: str):
+    """
+    Decorator for the body of a cached function: it only runs on a miss, so
+    hits are the lookups counted by `timed(..., cache=...)` minus these.
+    Goes *under* the caching decorator.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            count_cache(cache, miss=True)
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def cache_stats() -> list[dict]:
+    """Lookups, hits and misses of every instrumented cache"""
+    with _lock:
+        names = sorted(set(_cache_calls) | set(_cache_misses))
+        return [
+            {
+                "cache": name,
+                "lookups": max(_cache_calls[name], _cache_misses[name]),
+                "hits": max(_cache_calls[name] - _cache_misses[name], 0),
+                "misses": _cache_misses[name],
+            }
+            for name in names
+        ]
+
+
+def _start_profile(mode: str):
+    if mode == "cprofile":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Only one profiler can be active at a time: another session's rerun is being profiled
+            return None
+        return profiler
+    if mode == "tracemalloc":
+        import tracemalloc
+
+        if tracemalloc.is_tracing():
+            return None
+        tracemalloc.start()
+        return tracemalloc
+    return None
+
+
+def _stop_profile(mode: str, profiler) -> dict:
+    if profiler is None:
+        return {}
+    if mode == "cprofile":
+        import pstats
+
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(30)
+        return {"profile": out.getvalue()}
+
+    import tracemalloc
+
+    snapshot = tracemalloc.take_snapshot()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    top = snapshot.statistics("lineno")[:30]
+    return {"peak_mb": peak / 2**20, "profile": "\n".join(str(stat) for stat in top)}
+
+
+def start_rerun(page: str, profile: str = PROFILE_MODE) -> None:
+    """
+    Mark the start of a page rerun: following spans of this thread belong to it.
+    A rerun still open (e.g. the previous one ended with `st.stop()`) is finished
+    first. `profile` turns on cProfile or tracemalloc until `finish_rerun()`.
+    """
+    if not INSTRUMENT_ENABLED:
+        return
+    if profile not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{profile}', expected one of {PROFILE_MODES}")
+    if getattr(_local, "rerun", None) is not None:
+        finish_rerun()
+    _local.rerun = {
+        "id": uuid.uuid4().hex[:8],
+        "page": page,
+        "started": _now(),
+        "start": time.perf_counter(),
+        "spans": [],
+        "profile_mode": profile,
+        "profiler": _start_profile(profile),
+    }
+
+
+def finish_rerun() -> dict | None:
+    """End the current rerun of this thread, keep its summary and return it"""
+    rerun = getattr(_local, "rerun", None)
+    if rerun is None:
+        return None
+    _local.rerun = None
+
+    summary = {
+        "rerun": rerun["id"],
+        "page": rerun["page"],
+        "time": rerun["started"],
+        "seconds": time.perf_counter() - rerun["start"],
+        "spans": len(rerun["spans"]),
+        **_stop_profile(rerun["profile_mode"], rerun["profiler"]),
+    }
+    with _lock:
+        _reruns.append(summary)
+    if INSTRUMENT_LOG:
+        _append(Path(INSTRUMENT_LOG), [{"type": "rerun", **summary}] + [{"type": "span", **s} for s in rerun["spans"]])
+    return summary
+
+
+def recent_spans(page: str | None = None) -> list[dict]:
+    with _lock:
+        return [s for s in _spans if page is None or s["page"] == page]
+
+
+def recent_reruns(page: str | None = None) -> list[dict]:
+    with _lock:
+        return [r for r in _reruns if page is None or r["page"] == page]
+
+
+def _append(path: Path, records: list[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _lock, open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, default=str) + "\n")
+
+
+def export_log(path: Path = INSTRUMENT_EXPORT) -> Path:
+    """Append the buffered reruns, spans and cache counters to a JSON lines file"""
+    records = (
+        [{"type": "rerun", **r} for r in recent_reruns()]
+        + [{"type": "span", **s} for s in recent_spans()]
+        + [{"type": "cache", "time": _now(), **c} for c in cache_stats()]
+    )
+    _append(Path(path), records)
+    return Path(path)
+
+
+def reset() -> None:
+    with _lock:
+        _spans.clear()
+        _reruns.clear()
+        _cache_calls.clear()
+        _cache_misses.clear()
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import math
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from project.params import REVIEW_LANGUAGES
+
+DEFAULT_ROUTE = "en"
+
+_ARABIC_SCRIPT = re.compile("[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]")
+# Short vowels and other diacritics, superscript alef and tatweel
+_ARABIC_MARKS = re.compile("[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]")
+_ARABIC_LETTERS = str.maketrans({"أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ى": "ي", "ة": "ه"})
+_ELONGATION = re.compile(r"(.)\1{2,}")
+_NON_WORDS = re.compile(r"[^\w\s]|[\d_]")
+_SPACES = re.compile(r"\s+")
+_CLITICS = ["وال", "بال", "فال", "كال", "لل", "ال", "و", "ف", "ب", "ل"]
+# Feminine and plural endings (after normalization, ة is ه)
+_SUFFIXES = ["ين", "ون", "ات", "ه"]
+
+# Valences on VADER's -4..4 scale, for words common in place reviews
+ARABIC_LEXICON = {
+    "ممتاز": 3.0, "رائع": 3.1, "روعة": 3.1, "مذهل": 3.0, "جميل": 2.5, "جميلة": 2.5, "حلو": 2.2,
+    "نظيف": 1.9, "نظيفة": 1.9, "نظافة": 1.5, "مرتب": 1.6, "مريح": 1.8, "هادئ": 1.5, "هادي": 1.5,
+    "رايق": 2.0, "ممتع": 2.4, "استمتعت": 2.5, "سعيد": 2.3, "شكرا": 1.9, "لطيف": 1.9, "ودود": 1.9,
+    "متعاون": 1.8, "محترم": 1.9, "فخم": 2.0, "راقي": 2.2, "مميز": 2.3, "أنصح": 1.8, "يستاهل": 1.8,
+    "أحب": 2.5, "حبيت": 2.3, "عجبني": 2.2, "أفضل": 2.3, "أحسن": 2.3, "لذيذ": 2.5, "طيب": 1.8,
+    "مناسب": 1.2, "سريع": 1.0, "رخيص": 0.8,
+    "سيء": -2.5, "سيئ": -2.5, "سيئة": -2.5, "سئ": -2.5, "أسوأ": -3.0, "زفت": -3.0, "رديء": -2.6,
+    "وسخ": -2.5, "وسخة": -2.5, "متسخ": -2.3, "قذر": -2.8, "مقرف": -3.0, "خايس": -2.8, "فاشل": -2.8,
+    "مزعج": -2.1, "إزعاج": -2.0, "وقح": -2.6, "مهمل": -2.0, "إهمال": -2.2, "مخيب": -2.3, "ندمت": -2.2,
+    "أسف": -1.3, "للأسف": -1.5, "خراب": -2.5, "مكسور": -1.8, "معطل": -1.8, "ضعيف": -1.8, "ممل": -1.9,
+    "تعبان": -1.6, "غالي": -1.5, "مزدحم": -1.2, "زحمة": -1.2, "زحام": -1.2, "بطيء": -1.5,
+    "تأخير": -1.5, "متأخر": -1.3, "انتظار": -0.8, "طابور": -0.8, "صعب": -1.0, "خطير": -1.5,
+}
+ARABIC_NEGATORS = ["لا", "ليس", "ما", "لم", "لن", "مو", "مش", "مب", "غير", "بدون"]
+ARABIC_INTENSIFIERS = ["جدا", "جداً", "مرة", "كثير", "للغاية", "بزاف"]
+
+# VADER's constants, so both scorers produce comparable compound scores
+_NEGATION_SCALAR = -0.74
+_BOOST = 0.293
+_ALPHA = 15
+# Bump when the scoring code changes (lexicon edits are picked up by `arabic_scorer_version`)
+_SCORER_REVISION = 1
+
+
+def normalize_arabic(texts: pd.Series) -> pd.Series:
+    """Unify letter variants and drop diacritics, tatweel and letter elongation"""
+    texts = texts.astype(str).str.replace(_ARABIC_MARKS, "", regex=True)
+    texts = texts.str.translate(_ARABIC_LETTERS)
+    return texts.str.replace(_ELONGATION, r"\1", regex=True)
+
+
+def normalize_arabic_text(text: str) -> str:
+    """`normalize_arabic` of a single text"""
+    return _ELONGATION.sub(r"\1", _ARABIC_MARKS.sub("", str(text)).translate(_ARABIC_LETTERS))
+
+
+def _normalize_words(words) -> list[str]:
+    return [normalize_arabic_text(word) for word in words]
+
+
+@lru_cache(maxsize=1)
+def _arabic_stopwords_pattern() -> re.Pattern:
+    """Arabic stop words, minus the negators and intensifiers the scorer needs"""
+    from nltk.corpus import stopwords
+
+    from project.ml_logic.nltk_resources import ensure_nltk_resource
+
+    ensure_nltk_resource("corpora/stopwords", "stopwords")
+    keep = set(_normalize_words(ARABIC_NEGATORS + ARABIC_INTENSIFIERS)) | set(_arabic_lexicon())
+    words = set(_normalize_words(stopwords.words("arabic"))) - keep
+    alternatives = "|".join(sorted(map(re.escape, words), key=len, reverse=True))
+    return re.compile(rf"(?<!\S)(?:{alternatives})(?!\S)")
+
+
+def clean_arabic_series(texts: pd.Series) -> pd.Series:
+    """
+    Arabic counterpart of `clean_text_series`: normalize letters, drop digits
+    (Arabic-Indic too), punctuation and emoji, remove Arabic stop words,
+    collapse whitespace. Latin words in the text are lowercased.
+    """
+    texts = normalize_arabic(texts).str.lower()
+    texts = texts.str.replace(_NON_WORDS, " ", regex=True)
+    texts = texts.str.replace(_arabic_stopwords_pattern(), " ", regex=True)
+    return texts.str.replace(_SPACES, " ", regex=True).str.strip()
+
+
+def review_languages(reviews: pd.DataFrame, text_column: str = "Review Text") -> np.ndarray:
+    """
+    Primary language subtag of every review ("en-US" -> "en"). Reviews without
+    a usable `Reviewer Language` are "ar" when mostly written in Arabic script,
+    "unknown" otherwise.
+    """
+    if "Reviewer Language" in reviews.columns:
+        languages = reviews["Reviewer Language"].astype("string").str.lower().str.split("-").str[0]
+    else:
+        languages = pd.Series(pd.NA, index=reviews.index, dtype="string")
+    missing = languages.isna() | languages.isin(["", "unknown", "und"])
+    if missing.any():
+        texts = reviews.loc[missing.to_numpy(), text_column].fillna("").astype(str)
+        arabic = texts.str.count(_ARABIC_SCRIPT) > texts.str.len() / 2
+        languages[missing.to_numpy()] = np.where(arabic.to_numpy(), "ar", "unknown")
+    return languages.fillna("unknown").to_numpy(dtype=object)
+
+
+def language_routes(languages: np.ndarray) -> np.ndarray:
+    """Processing route of every language: itself if it has one, English otherwise"""
+    languages = np.asarray(languages, dtype=object)
+    return np.where(np.isin(languages, REVIEW_LANGUAGES), languages, DEFAULT_ROUTE).astype(object)
+
+
+def clean_by_language(texts: pd.Series, languages: np.ndarray) -> pd.Series:
+    """Clean each language partition of `texts` with its own normalizer; same index as `texts`"""
+    from project.ml_logic.preprocessor import clean_text_series
+
+    cleaners = {"en": clean_text_series, "ar": clean_arabic_series}
+    routes = language_routes(languages)
+    cleaned = pd.Series("", index=texts.index, dtype=object)
+    for route in pd.unique(routes):
+        mask = routes == route
+        cleaned[mask] = cleaners[route](texts[mask]).to_numpy(dtype=object)
+    return cleaned
+
+
+@lru_cache(maxsize=1)
+def _arabic_lexicon() -> dict:
+    words = _normalize_words(ARABIC_LEXICON)
+    return dict(zip(words, ARABIC_LEXICON.values()))
+
+
+@lru_cache(maxsize=1)
+def arabic_scorer_version() -> str:
+    """Fingerprint of everything the Arabic scores depend on: lexicon, negators, intensifiers, constants"""
+    state = [
+        _SCORER_REVISION, sorted(ARABIC_LEXICON.items()), ARABIC_NEGATORS, ARABIC_INTENSIFIERS,
+        _CLITICS, _SUFFIXES, _NEGATION_SCALAR, _BOOST, _ALPHA,
+    ]
+    return hashlib.sha1(json.dumps(state, ensure_ascii=False).encode()).hexdigest()[:12]
+
+
+class ArabicSentimentAnalyzer:
+    """
+    Lexicon-based Arabic scorer with VADER's interface and arithmetic: word
+    valences (looked up without attached clitics such as "وال" and without
+    feminine/plural endings), flipped after
+    a negator within three words and boosted by an intensifier next to them
+    ("جميل جدا"), then summed into `compound` and split into `neg`/`neu`/`pos`
+    proportions.
+    """
+
+    def __init__(self):
+        self.lexicon = _arabic_lexicon()
+        self.negators = set(_normalize_words(ARABIC_NEGATORS))
+        self.intensifiers = set(_normalize_words(ARABIC_INTENSIFIERS))
+
+    def _valence(self, word: str) -> float:
+        stems = [word] + [word[len(c):] for c in _CLITICS if word.startswith(c) and len(word) - len(c) >= 2]
+        for stem in stems:
+            if stem in self.lexicon:
+                return self.lexicon[stem]
+            for suffix in _SUFFIXES:
+                if stem.endswith(suffix) and len(stem) - len(suffix) >= 2 and stem[:-len(suffix)] in self.lexicon:
+                    return self.lexicon[stem[:-len(suffix)]]
+        return 0.0
+
+    def polarity_scores(self, text: str) -> dict:
+        words = normalize_arabic_text(text).split()
+        sentiments = []
+        for i, word in enumerate(words):
+            valence = self._valence(word)
+            if valence:
+                if self.intensifiers.intersection(words[max(0, i - 1):i + 2]):
+                    valence += math.copysign(_BOOST, valence)
+                if any(previous in self.negators for previous in words[max(0, i - 3):i]):
+                    valence *= _NEGATION_SCALAR
+            sentiments.append(valence)
+
+        total = sum(sentiments)
+        compound = total / math.sqrt(total * total + _ALPHA) if sentiments else 0.0
+        pos_sum = sum(s + 1 for s in sentiments if s > 0)
+        neg_sum = sum(s - 1 for s in sentiments if s < 0)
+        neu_count = sum(1 for s in sentiments if s == 0)
+        weight = pos_sum + abs(neg_sum) + neu_count
+        if not weight:
+            return {"neg": 0.0, "neu": 0.0, "pos": 0.0, "compound": 0.0}
+        return {
+            "neg": round(abs(neg_sum / weight), 3),
+            "neu": round(neu_count / weight, 3),
+            "pos": round(pos_sum / weight, 3),
+            "compound": round(compound, 4),
+        }
@@ -0,0 +1,430 @@
+import os
+import re
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from project.params import (
+    NEAR_DUP_BANDS,
+    NEAR_DUP_BATCH,
+    NEAR_DUP_DIR,
+    NEAR_DUP_PERMUTATIONS,
+    NEAR_DUP_REPORT,
+    NEAR_DUP_SHINGLE,
+    NEAR_DUP_THRESHOLD,
+    PROCESSED_DIR,
+)
+
+INDEX_FILE = "index.npz"
+# Reviews added since `INDEX_FILE` was written, one file per save, named by first row
+DELTA_FILES = "delta_*.npz"
+SIGNATURES_FILE = "signatures.bin"
+SEED = 20_240_501
+# Shingles hashed at once: bounds the (block, permutations) matrix of `signatures`
+_SHINGLE_BLOCK = 8_192
+
+# Emoji, punctuation and other symbols: re-crawls differ in exactly these
+_NON_WORD = re.compile(r"[^\w\s]+")
+_PAD = "\0"
+
+
+def shingle_tokens(texts: pd.Series) -> pd.Series:
+    """Lowercased words with emoji/punctuation removed and whitespace collapsed"""
+    return texts.fillna("").astype(str).str.lower().str.replace(_NON_WORD, " ", regex=True).str.split()
+
+
+def _grown(array: np.ndarray, size: int) -> np.ndarray:
+    """`array` if it has room for `size` rows, else a copy with at least twice its capacity"""
+    if size <= len(array):
+        return array
+    grown = np.empty((max(size, 2 * len(array)),) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def _hash_tokens(tokens: np.ndarray) -> np.ndarray:
+    # crc32 (not `hash()`, which is salted per process): signatures must be stable across runs
+    codes, uniques = pd.factorize(tokens)
+    return np.array([zlib.crc32(token.encode()) for token in uniques], dtype=np.uint64)[codes]
+
+
+class NearDuplicateIndex:
+    """
+    Persistent MinHash/LSH index of reviews, for near-duplicate detection.
+
+    Every review gets a MinHash signature of its word `shingle`-grams. The
+    signature is cut into `bands` bands; two reviews of the same place that
+    share a band are candidates, confirmed when their signatures agree on at
+    least `threshold` of the positions (estimated Jaccard similarity). Adding
+    n reviews costs O(n) hashing plus sorting their band keys, never a pairwise
+    comparison: each batch's sorted keys form a new run, and the newest run is
+    merged into the previous one once it is at least half its size, so there
+    are O(log n) runs to search and a key is merged O(log n) times. Per-review
+    arrays grow by doubling instead of being copied for every batch.
+
+    A review is compared to the earliest review of each bucket it falls in, and
+    confirmed duplicates join that review's cluster, so the earliest review of a
+    cluster is the one kept. On disk: `index.npz` (review hashes, places,
+    clusters, sorted band keys), one delta per later save with the reviews it
+    added and the cluster links it changed (folded back into `index.npz` once
+    the deltas outgrow it, so saving after every shard stays linear), and
+    `signatures.bin`, appended to and read memory-mapped.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = NEAR_DUP_DIR,
+        shingle: int = NEAR_DUP_SHINGLE,
+        permutations: int = NEAR_DUP_PERMUTATIONS,
+        bands: int = NEAR_DUP_BANDS,
+        threshold: float = NEAR_DUP_THRESHOLD,
+    ):
+        if permutations % bands:
+            raise ValueError(f"{permutations} permutations cannot be split into {bands} bands")
+        self.path = Path(path) if path is not None else None
+        self.shingle = shingle
+        self.permutations = permutations
+        self.bands = bands
+        self.threshold = threshold
+
+        rng = np.random.default_rng(SEED)
+        # Multiply-shift hash family: h(x) = (a*x + b) >> 32, a odd
+        self._a = rng.integers(1, 2**63, permutations, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, permutations, dtype=np.uint64)
+        self._mix = rng.integers(1, 2**63, max(shingle, permutations // bands), dtype=np.uint64) | np.uint64(1)
+
+        # Per-review arrays with spare capacity: the first `_size` rows are used
+        self._size = 0
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._places = np.empty(0, dtype=np.uint64)
+        self._parent = np.empty(0, dtype=np.int64)
+        # Signatures of the last `_n_pending` reviews, not saved yet
+        self._pending = np.empty((0, permutations), dtype=np.uint32)
+        self._n_pending = 0
+        # Sorted (band keys, rows) runs, each (bands, m), oldest (earliest rows) first
+        self._runs = []
+        self._row_of = {}
+        # Reviews in `INDEX_FILE`, and earlier reviews whose cluster link changed since the last save
+        self._n_base = 0
+        self._relinked = set()
+
+        if self.path is not None and (self.path / INDEX_FILE).exists():
+            self._load()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def hashes(self) -> np.ndarray:
+        return self._hashes[:self._size]
+
+    @property
+    def places(self) -> np.ndarray:
+        return self._places[:self._size]
+
+    @property
+    def parent(self) -> np.ndarray:
+        return self._parent[:self._size]
+
+    def _settings(self) -> np.ndarray:
+        return np.array([self.shingle, self.permutations, self.bands, SEED], dtype=np.int64)
+
+    def _load(self) -> None:
+        with np.load(self.path / INDEX_FILE) as index:
+            if not np.array_equal(index["settings"], self._settings()):
+                raise ValueError(
+                    f"Near-duplicate index in {self.path} was built with other settings "
+                    f"{index['settings'].tolist()}; delete it to rebuild"
+                )
+            self._hashes, self._places, self._parent = index["hashes"], index["places"], index["parent"]
+            if index["band_keys"].shape[1]:
+                self._runs = [(index["band_keys"], index["band_rows"])]
+        self._size = self._n_base = len(self._hashes)
+
+        for path in sorted(self.path.glob(DELTA_FILES)):
+            with np.load(path) as delta:
+                start = int(delta["start"])
+                if start < self._size:
+                    # Already folded into the index by a save interrupted before removing it
+                    continue
+                if start > self._size:
+                    break
+                size = start + len(delta["hashes"])
+                self._hashes, self._places, self._parent = (
+                    _grown(self._hashes, size), _grown(self._places, size), _grown(self._parent, size)
+                )
+                self._hashes[start:size], self._places[start:size] = delta["hashes"], delta["places"]
+                self._parent[start:size] = np.arange(start, size)
+                self._parent[delta["relinked_rows"]] = delta["relinked_parents"]
+                self._size = size
+                self._runs.append((delta["band_keys"], delta["band_rows"]))
+                self._merge_runs()
+        self._row_of = dict(zip(self.hashes.tolist(), range(self._size)))
+
+    def _stored_signatures(self) -> np.ndarray:
+        n_stored = len(self) - self._n_pending
+        if self.path is None or n_stored == 0:
+            return np.empty((0, self.permutations), dtype=np.uint32)
+        # Rows beyond the index (left by an interrupted save) are ignored
+        return np.memmap(self.path / SIGNATURES_FILE, dtype=np.uint32, mode="r", shape=(n_stored, self.permutations))
+
+    def _signature_rows(self, rows: np.ndarray) -> np.ndarray:
+        stored = self._stored_signatures()
+        pending = self._pending[:self._n_pending]
+        signatures = np.empty((len(rows), self.permutations), dtype=np.uint32)
+        old = rows < len(stored)
+        signatures[old] = stored[rows[old]]
+        signatures[~old] = pending[rows[~old] - len(stored)]
+        return signatures
+
+    def signatures(self, texts: pd.Series) -> np.ndarray:
+        """(n, permutations) uint32 MinHash signatures of `texts`"""
+        tokens = shingle_tokens(texts).reset_index(drop=True)
+        # Padding gives reviews shorter than a shingle one shingle too
+        tokens = tokens.map(lambda words: (words or [_PAD]) + [_PAD] * (self.shingle - 1))
+        exploded = tokens.explode()
+        owner = exploded.index.to_numpy()
+        token_hashes = _hash_tokens(exploded.to_numpy(dtype=object))
+
+        n_shingles = len(token_hashes) - self.shingle + 1
+        shingles = np.zeros(n_shingles, dtype=np.uint64)
+        for i in range(self.shingle):
+            shingles += token_hashes[i:i + n_shingles] * self._mix[i]
+        # Keep shingles that do not straddle two reviews
+        valid = owner[:n_shingles] == owner[self.shingle - 1:]
+        shingles, owner = shingles[valid] >> np.uint64(32), owner[:n_shingles][valid]
+
+        # Every review has a shingle (padding), so `owner` is the signature row; a
+        # running minimum over blocks keeps memory bounded by the block, not the batch
+        signatures = np.full((len(tokens), self.permutations), np.iinfo(np.uint32).max, dtype=np.uint32)
+        for start in range(0, len(shingles), _SHINGLE_BLOCK):
+            block = slice(start, start + _SHINGLE_BLOCK)
+            hashed = ((shingles[block, None] * self._a[None, :] + self._b[None, :]) >> np.uint64(32)).astype(np.uint32)
+            block_owner = owner[block]
+            starts = np.flatnonzero(np.r_[True, block_owner[1:] != block_owner[:-1]])
+            rows = block_owner[starts]
+            signatures[rows] = np.minimum(signatures[rows], np.minimum.reduceat(hashed, starts, axis=0))
+        return signatures
+
+    def _band_keys(self, signatures: np.ndarray, places: np.ndarray) -> np.ndarray:
+        """(bands, n) uint64 bucket keys; the place is part of the key so only same-place reviews collide"""
+        rows = self.permutations // self.bands
+        banded = signatures.reshape(len(signatures), self.bands, rows).astype(np.uint64)
+        keys = (banded * self._mix[None, None, :rows]).sum(axis=2, dtype=np.uint64)
+        return (keys ^ places[:, None]).T
+
+    def _find(self, row: int) -> int:
+        parent = self._parent
+        root = row
+        while parent[root] != root:
+            root = parent[root]
+        while parent[row] != root:
+            parent[row], row = root, parent[row]
+        return root
+
+    def _merge_runs(self, everything: bool = False) -> None:
+        """
+        Merge the newest run into the previous one while it is at least half its
+        size (or until one run is left). On equal keys the older run's rows come
+        first, so a bucket's first row stays its earliest review.
+        """
+        while len(self._runs) > 1 and (everything or 2 * self._runs[-1][0].shape[1] >= self._runs[-2][0].shape[1]):
+            (old_keys, old_rows), (keys, rows) = self._runs[-2:]
+            merged_keys, merged_rows = [], []
+            for band in range(self.bands):
+                insert_at = np.searchsorted(old_keys[band], keys[band], side="right")
+                merged_keys.append(np.insert(old_keys[band], insert_at, keys[band]))
+                merged_rows.append(np.insert(old_rows[band], insert_at, rows[band]))
+            self._runs[-2:] = [(np.array(merged_keys), np.array(merged_rows))]
+
+    def add(self, hashes: np.ndarray, places: np.ndarray, texts: pd.Series) -> np.ndarray:
+        """
+        Index a batch of reviews: `hashes` identify them (see `review_hashes`),
+        `places` are 64-bit place ids. Returns a mask of the reviews that are
+        near-duplicates of an earlier review. Reviews already indexed are not
+        re-added and keep their previous verdict.
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        places = np.asarray(places, dtype=np.uint64)
+        texts = pd.Series(texts).reset_index(drop=True)
+        duplicate = np.zeros(len(hashes), dtype=bool)
+
+        for start in range(0, len(hashes), NEAR_DUP_BATCH):
+            batch = slice(start, start + NEAR_DUP_BATCH)
+            duplicate[batch] = self._add_batch(hashes[batch], places[batch], texts.iloc[batch])
+        return duplicate
+
+    def _add_batch(self, hashes: np.ndarray, places: np.ndarray, texts: pd.Series) -> np.ndarray:
+        known = np.array([h in self._row_of for h in hashes.tolist()], dtype=bool)
+        # Duplicates of the same review inside the batch are only indexed once
+        first = ~pd.Series(hashes).duplicated().to_numpy() & ~known
+        new = np.flatnonzero(first)
+
+        base = len(self)
+        if len(new):
+            signatures = self.signatures(texts.iloc[new])
+            keys = self._band_keys(signatures, places[new])
+            rows = np.arange(base, base + len(new), dtype=np.int64)
+
+            size = base + len(new)
+            self._hashes, self._places, self._parent = (
+                _grown(self._hashes, size), _grown(self._places, size), _grown(self._parent, size)
+            )
+            self._hashes[base:size], self._places[base:size], self._parent[base:size] = hashes[new], places[new], rows
+            self._pending = _grown(self._pending, self._n_pending + len(new))
+            self._pending[self._n_pending:self._n_pending + len(new)] = signatures
+            self._size, self._n_pending = size, self._n_pending + len(new)
+            self._row_of.update(zip(hashes[new].tolist(), rows.tolist()))
+
+            # Candidate pairs: each new review and the earliest review of each of its buckets
+            candidates = []
+            anchors = np.full((self.bands, len(new)), -1, dtype=np.int64)
+            for run_keys, run_rows in self._runs:
+                # Older runs hold earlier rows: a bucket's anchor is its first row in the oldest run it is in
+                for band in range(self.bands):
+                    positions = np.searchsorted(run_keys[band], keys[band])
+                    hit = positions < run_keys.shape[1]
+                    hit[hit] = run_keys[band][positions[hit]] == keys[band][hit]
+                    hit &= anchors[band] < 0
+                    anchors[band][hit] = run_rows[band][positions[hit]]
+
+            run_keys, run_rows = np.empty_like(keys), np.empty(keys.shape, dtype=np.uint32)
+            for band in range(self.bands):
+                hit = anchors[band] >= 0
+                candidates.append(np.column_stack([rows[hit], anchors[band][hit]]))
+
+                order = np.argsort(keys[band], kind="stable")
+                sorted_keys, sorted_rows = keys[band][order], rows[order]
+                group_start = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+                first_rows = sorted_rows[np.flatnonzero(group_start)[np.cumsum(group_start) - 1]]
+                inside = ~group_start
+                candidates.append(np.column_stack([sorted_rows[inside], first_rows[inside]]))
+                run_keys[band], run_rows[band] = sorted_keys, sorted_rows
+            self._runs.append((run_keys, run_rows))
+            self._merge_runs()
+
+            pairs = np.unique(np.concatenate(candidates), axis=0)
+            if len(pairs):
+                similarity = (self._signature_rows(pairs[:, 0]) == self._signature_rows(pairs[:, 1])).mean(axis=1)
+                confirmed = pairs[similarity >= self.threshold]
+                for row, anchor in confirmed[np.argsort(confirmed[:, 0], kind="stable")].tolist():
+                    root_row, root_anchor = self._find(row), self._find(anchor)
+                    if root_row != root_anchor:
+                        # The earliest review stays the cluster's representative
+                        later = max(root_row, root_anchor)
+                        self.parent[later] = min(root_row, root_anchor)
+                        if later < base:
+                            self._relinked.add(later)
+
+        rows = np.array([self._row_of[h] for h in hashes.tolist()], dtype=np.int64)
+        duplicate = np.array([self._find(row) != row for row in rows.tolist()], dtype=bool)
+        # Repeats of one review inside the batch: only its first occurrence can be the original
+        return duplicate | (pd.Series(hashes).duplicated().to_numpy() & ~known)
+
+    def clusters(self) -> pd.DataFrame:
+        """One row per near-duplicate cluster (2+ reviews): representative hash, size and member hashes"""
+        roots = np.array([self._find(row) for row in range(len(self))], dtype=np.int64)
+        frame = pd.DataFrame({"Representative": self.hashes[roots], "Review Hash": self.hashes})
+        frame = frame[roots != np.arange(len(self))]
+        clusters = frame.groupby("Representative", sort=False)["Review Hash"].agg(list)
+        return pd.DataFrame({
+            "Representative": clusters.index.to_numpy(),
+            "Size": clusters.map(len).to_numpy() + 1,
+            "Duplicates": clusters.to_numpy(),
+        }).sort_values("Size", ascending=False, kind="stable").reset_index(drop=True)
+
+    def save(self) -> None:
+        """
+        Persist the reviews added since the last save: their signatures are
+        appended, the rest goes to a new delta, or everything is rewritten into
+        `index.npz` once the deltas hold as many reviews as it does.
+        """
+        if self.path is None:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        n_stored = len(self) - self._n_pending
+        signatures_path = self.path / SIGNATURES_FILE
+        with open(signatures_path, "ab") as f:
+            # Drop rows an interrupted save appended without updating the index
+            f.truncate(n_stored * self.permutations * 4)
+            f.write(np.ascontiguousarray(self._pending[:self._n_pending]).tobytes())
+        new_signatures = self._pending[:self._n_pending]
+        self._pending, self._n_pending = np.empty((0, self.permutations), dtype=np.uint32), 0
+
+        # Rewriting the index only when the deltas have doubled it keeps saving linear overall
+        if len(self) - self._n_base >= self._n_base:
+            self._save_index()
+        elif len(self) > n_stored:
+            self._save_delta(n_stored, new_signatures)
+        self._relinked = set()
+
+    def _save_index(self) -> None:
+        # On disk, every band is one sorted array
+        self._merge_runs(everything=True)
+        band_keys, band_rows = self._runs[0] if self._runs else (
+            np.empty((self.bands, 0), dtype=np.uint64), np.empty((self.bands, 0), dtype=np.uint32)
+        )
+
+        tmp_path = self.path / f"{INDEX_FILE}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp_path,
+            settings=self._settings(),
+            hashes=self.hashes,
+            places=self.places,
+            parent=self.parent,
+            band_keys=band_keys,
+            band_rows=band_rows,
+        )
+        os.replace(tmp_path, self.path / INDEX_FILE)
+        self._n_base = len(self)
+        for path in self.path.glob(DELTA_FILES):
+            path.unlink()
+
+    def _save_delta(self, start: int, signatures: np.ndarray) -> None:
+        keys = self._band_keys(signatures, self.places[start:])
+        order = np.argsort(keys, axis=1, kind="stable")
+        relinked = np.array(sorted(self._relinked), dtype=np.int64)
+
+        tmp_path = self.path / f"delta.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp_path,
+            start=np.int64(start),
+            hashes=self.hashes[start:],
+            places=self.places[start:],
+            band_keys=np.take_along_axis(keys, order, axis=1),
+            band_rows=(order + start).astype(np.uint32),
+            # Cluster links of the earlier reviews and of the new ones
+            relinked_rows=np.concatenate([relinked, np.arange(start, len(self))]),
+            relinked_parents=np.concatenate([self.parent[relinked], self.parent[start:]]),
+        )
+        os.replace(tmp_path, self.path / f"delta_{start:012d}.npz")
+
+
+def place_ids(df: pd.DataFrame) -> np.ndarray:
+    """64-bit id of each review's place"""
+    return pd.util.hash_pandas_object(df[["Place Name"]].astype(str), index=False).to_numpy()
+
+
+def find_near_duplicates(
+    processed_dir: Path = PROCESSED_DIR,
+    index_dir: Path = NEAR_DUP_DIR,
+    report_path: Path = NEAR_DUP_REPORT,
+) -> pd.DataFrame:
+    """
+    Index every processed review not indexed yet and write the near-duplicate
+    clusters report (one row per cluster, largest first) to `report_path`.
+    """
+    from project.ml_logic.preprocessor import iter_processed, review_hashes
+
+    index = NearDuplicateIndex(index_dir)
+    for chunk in iter_processed(processed_dir):
+        index.add(review_hashes(chunk), place_ids(chunk), chunk["Review Text"])
+    index.save()
+
+    clusters = index.clusters()
+    Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+    clusters.to_csv(report_path, index=False)
+    print(f"✅ {len(clusters)} near-duplicate clusters ({int((clusters['Size'] - 1).sum())} duplicates) in {len(index)} reviews")
+    return clusters
@@ -0,0 +1,53 @@
+import threading
+from pathlib import Path
+
+from project.params import NLTK_DATA_DIR, NLTK_DOWNLOAD, NLTK_PACKAGES
+
+_found = set()
+_lock = threading.Lock()
+
+
+def _use_data_dir(data_dir: Path) -> None:
+    import nltk
+
+    if str(data_dir) not in nltk.data.path:
+        nltk.data.path.insert(0, str(data_dir))
+
+
+def ensure_nltk_resource(resource: str, package: str, download: bool = NLTK_DOWNLOAD) -> None:
+    """
+    Make sure an NLTK resource (e.g. "corpora/stopwords") can be loaded,
+    looking in the bundled data directory first. Resolved once per process;
+    a missing resource is only downloaded (into the bundled directory) with
+    `download`, so the app never reaches the network on its own.
+    """
+    if resource in _found:
+        return
+    import nltk
+
+    with _lock:
+        _use_data_dir(NLTK_DATA_DIR)
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            if not download:
+                raise LookupError(
+                    f"NLTK resource '{resource}' not found in {NLTK_DATA_DIR} or NLTK's data path: "
+                    "run `make nltk_data` (or set BTS_NLTK_DOWNLOAD=1)"
+                ) from None
+            NLTK_DATA_DIR.mkdir(parents=True, exist_ok=True)
+            nltk.download(package, download_dir=str(NLTK_DATA_DIR), quiet=True)
+            nltk.data.find(resource)
+        _found.add(resource)
+
+
+def download_nltk_data(data_dir: Path = NLTK_DATA_DIR, packages: dict = NLTK_PACKAGES) -> Path:
+    """Download every NLTK package the project uses into `data_dir`, to ship with the app"""
+    import nltk
+
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    for package in packages:
+        nltk.download(package, download_dir=str(data_dir), quiet=True)
+    print(f"✅ NLTK data for {sorted(packages)} in {data_dir}")
+    return data_dir
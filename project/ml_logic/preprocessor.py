@@ -0,0 +1,204 @@
+import json
+import os
+import re
+import string
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from project.ml_logic.instrumentation import timed
+from project.ml_logic.languages import clean_by_language, review_languages
+from project.ml_logic.near_duplicates import NearDuplicateIndex, place_ids
+from project.params import (
+    CHUNK_SIZE,
+    NEAR_DUP_DIR,
+    NEAR_DUP_ENABLED,
+    PROCESSED_DIR,
+    RAW_DATA_DIR,
+    REVIEW_LANGUAGES,
+)
+
+DEDUP_COLUMNS = ["Review Text", "Place Name"]
+MANIFEST_FILE = "_manifest.json"
+
+_DIGITS = re.compile(r"\d+")
+_PUNCTUATION = str.maketrans("", "", string.punctuation)
+_SPACES = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1)
+def _stopwords_pattern() -> re.Pattern:
+    """Stop-word regex, compiled once per process instead of once per review"""
+    from nltk.corpus import stopwords
+
+    from project.ml_logic.nltk_resources import ensure_nltk_resource
+
+    ensure_nltk_resource("corpora/stopwords", "stopwords")
+    words = stopwords.words("english")
+    alternatives = "|".join(sorted(map(re.escape, words), key=len, reverse=True))
+    return re.compile(rf"(?<!\S)(?:{alternatives})(?!\S)")
+
+
+@timed("clean_text")
+def clean_text_series(texts: pd.Series) -> pd.Series:
+    """
+    Vectorized version of the notebook's `clean_text`: lowercase, drop digits
+    and punctuation, remove English stop words, collapse whitespace.
+    """
+    texts = texts.astype(str).str.lower()
+    texts = texts.str.replace(_DIGITS, "", regex=True)
+    texts = texts.str.translate(_PUNCTUATION)
+    texts = texts.str.replace(_stopwords_pattern(), " ", regex=True)
+    return texts.str.replace(_SPACES, " ", regex=True).str.strip()
+
+
+def clean_text(text: str) -> str:
+    return clean_text_series(pd.Series([text])).iloc[0]
+
+
+def review_hashes(df: pd.DataFrame) -> np.ndarray:
+    """64-bit hash of (Review Text, Place Name) per row, used as the dedup key"""
+    return pd.util.hash_pandas_object(df[DEDUP_COLUMNS], index=False).to_numpy()
+
+
+def _signature(path: Path) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _read_manifest(output_dir: Path) -> dict:
+    path = output_dir / MANIFEST_FILE
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def _write_manifest(output_dir: Path, manifest: dict) -> None:
+    tmp_path = output_dir / f"{MANIFEST_FILE}.tmp"
+    tmp_path.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp_path, output_dir / MANIFEST_FILE)
+
+
+def _process_shard(
+    raw_path: Path,
+    out_path: Path,
+    seen: set,
+    chunksize: int,
+    languages: list[str] | None,
+    near_duplicates: NearDuplicateIndex | None = None,
+) -> tuple[int, set, int]:
+    """
+    Stream one raw CSV through the cleaning steps into `out_path`.
+    Returns (rows written, hashes of the rows written, near-duplicates dropped).
+    """
+    shard_seen = set()
+    written = 0
+    n_near = 0
+    tmp_path = out_path.with_suffix(".csv.tmp")
+
+    try:
+        for chunk in pd.read_csv(raw_path, chunksize=chunksize):
+            # Cheap filters first, so text cleaning only runs on rows we keep
+            chunk = chunk.dropna(subset=["Review Text"])
+            if languages is not None:
+                chunk = chunk[np.isin(review_languages(chunk), languages)]
+
+            hashes = review_hashes(chunk)
+            keep = ~pd.Series(hashes).duplicated().to_numpy()
+            keep &= np.fromiter((h not in seen and h not in shard_seen for h in hashes.tolist()), bool, len(hashes))
+            chunk = chunk[keep]
+            shard_seen.update(hashes[keep].tolist())
+
+            if near_duplicates is not None and len(chunk):
+                near = near_duplicates.add(hashes[keep], place_ids(chunk), chunk["Review Text"])
+                n_near += int(near.sum())
+                chunk = chunk[~near]
+
+            # Each language partition goes through its own normalizer
+            chunk = chunk.assign(**{"Cleaned Review": clean_by_language(chunk["Review Text"], review_languages(chunk))})
+            chunk.to_csv(tmp_path, mode="a" if written else "w", header=not written, index=False)
+            written += len(chunk)
+
+        if not written:
+            pd.read_csv(raw_path, nrows=0).assign(**{"Cleaned Review": []}).to_csv(tmp_path, index=False)
+        os.replace(tmp_path, out_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    return written, shard_seen, n_near
+
+
+def preprocess(
+    raw_dir: Path = RAW_DATA_DIR,
+    output_dir: Path = PROCESSED_DIR,
+    chunksize: int = CHUNK_SIZE,
+    languages: list[str] | None = REVIEW_LANGUAGES,
+    near_dup_dir: Path | None = NEAR_DUP_DIR if NEAR_DUP_ENABLED else None,
+) -> dict:
+    """
+    Clean every raw review CSV in `raw_dir` into `output_dir`, one output file
+    per raw file ("shard"), chunk by chunk so memory stays bounded:
+    dropna -> language filter -> dedup on (Review Text, Place Name) ->
+    near-duplicate removal -> clean_text (English) / clean_arabic_series (Arabic).
+
+    Near-duplicates (same place, text differing in whitespace, emoji or
+    truncation) are found with the persistent MinHash/LSH index in
+    `near_dup_dir`; pass `near_dup_dir=None` to skip that stage.
+
+    Shards already processed from an unchanged raw file are skipped, and a
+    failing shard is reported without stopping the others, so a rerun only
+    redoes what changed or failed. `languages` are primary subtags ("en" also
+    keeps "en-US"); pass `languages=None` to keep every language, those without
+    a route of their own being cleaned as English.
+    """
+    raw_dir, output_dir = Path(raw_dir), Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = _read_manifest(output_dir)
+    raw_paths = sorted(p for p in raw_dir.glob("*.csv") if not p.name.startswith("_"))
+
+    done = {
+        p.name for p in raw_paths
+        if manifest.get(p.name) == _signature(p) and (output_dir / p.name).exists()
+    }
+
+    # Dedup is global: seed the seen-set from the shards we are not redoing
+    seen = set()
+    for name in done:
+        for chunk in pd.read_csv(output_dir / name, usecols=DEDUP_COLUMNS, chunksize=chunksize):
+            seen.update(review_hashes(chunk).tolist())
+
+    near_duplicates = NearDuplicateIndex(near_dup_dir) if near_dup_dir is not None else None
+    report = {"skipped": sorted(done), "processed": {}, "failed": {}, "near_duplicates": {}}
+    for raw_path in raw_paths:
+        if raw_path.name in done:
+            continue
+        signature = _signature(raw_path)
+        try:
+            written, shard_seen, n_near = _process_shard(
+                raw_path, output_dir / raw_path.name, seen, chunksize, languages, near_duplicates
+            )
+        except Exception as e:
+            print(f"❌ Failed to preprocess {raw_path.name}: {e}")
+            report["failed"][raw_path.name] = str(e)
+            continue
+        finally:
+            # Reviews indexed before a failure keep their verdict on the next run;
+            # a save only appends this shard's reviews (see NearDuplicateIndex.save)
+            if near_duplicates is not None:
+                near_duplicates.save()
+
+        seen |= shard_seen
+        manifest[raw_path.name] = signature
+        _write_manifest(output_dir, manifest)
+        report["processed"][raw_path.name] = written
+        report["near_duplicates"][raw_path.name] = n_near
+        print(f"✅ {raw_path.name}: {written} clean reviews ({n_near} near-duplicates dropped)")
+
+    return report
+
+
+def iter_processed(output_dir: Path = PROCESSED_DIR, chunksize: int = CHUNK_SIZE, **read_csv_kwargs) -> Iterator[pd.DataFrame]:
+    """Stream the cleaned reviews of every processed shard, chunk by chunk"""
+    for path in sorted(Path(output_dir).glob("*.csv")):
+        yield from pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs)
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import joblib
+
+from project.ml_logic.instrumentation import count_cache, span
+from project.params import MODEL_ARTIFACTS, MODELS_DIR
+
+MODEL_NAMES = ["vectorizer", "lda", "kmeans"]
+VERSION_MANIFEST = "manifest.json"
+CURRENT_FILE = "current.json"
+
+_models = {}
+_hashes = {}
+_lock = threading.Lock()
+
+
+def current_version(models_dir: Path = MODELS_DIR) -> str | None:
+    """Current trained model version (see `training.py`), or None to use the pinned artifacts"""
+    path = Path(models_dir) / CURRENT_FILE
+    return json.loads(path.read_text())["version"] if path.exists() else None
+
+
+def _version_manifest(version: str) -> dict:
+    return json.loads((MODELS_DIR / version / VERSION_MANIFEST).read_text())
+
+
+def artifact_path(name: str) -> Path:
+    if name not in MODEL_ARTIFACTS:
+        raise KeyError(f"Unknown model artifact '{name}', expected one of {sorted(MODEL_ARTIFACTS)}")
+    version = current_version()
+    if version is not None:
+        return MODELS_DIR / version / f"{name}.joblib"
+    return Path(MODEL_ARTIFACTS[name]["path"])
+
+
+def lda_input() -> str:
+    """What the LDA artifact is fed: "counts" for trained versions, "tfidf" for the pinned one"""
+    version = current_version()
+    if version is not None:
+        return _version_manifest(version)["params"].get("lda_input", "tfidf")
+    return "tfidf"
+
+
+def expected_hash(name: str) -> str | None:
+    """sha256 the artifact must have: from the version manifest, or the pinned one"""
+    version = current_version()
+    if version is not None:
+        return _version_manifest(version)["sha256"][name]
+    return MODEL_ARTIFACTS[name].get("sha256")
+
+
+def artifact_hash(path: Path) -> str:
+    """sha256 of a file, computed once per (path, size, mtime)"""
+    stat = os.stat(path)
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        _hashes[key] = digest.hexdigest()
+    return _hashes[key]
+
+
+def load_model(name: str, verify: bool = True):
+    """
+    Load a registered model artifact ("lda", "kmeans", "vectorizer") once per
+    process; every later call (from any session or thread) returns the same object.
+    Artifacts come from the current trained version when there is one.
+
+    Large NumPy arrays (e.g. LDA `components_`) are memory-mapped read-only
+    straight from the joblib file, so worker processes share them through the
+    page cache. With `verify`, the file must match its registered sha256.
+    """
+    path = artifact_path(name)
+    sha256 = artifact_hash(path)
+    expected = expected_hash(name) if verify else None
+    if expected not in (None, sha256):
+        raise ValueError(f"Model artifact '{name}' at {path} has sha256 {sha256}, expected {expected}")
+
+    key = (name, sha256)
+    count_cache("model")
+    if key not in _models:
+        with _lock:
+            if key not in _models:
+                print(f"Load model '{name}' from {path}")
+                count_cache("model", miss=True)
+                with span("model.load", model=name):
+                    _models[key] = joblib.load(path, mmap_mode="r")
+    return _models[key]
+
+
+def load_feature_names():
+    """Vocabulary of the registered vectorizer, computed once per process"""
+    vectorizer = load_model("vectorizer")
+    key = ("vectorizer:feature_names", artifact_hash(artifact_path("vectorizer")))
+    if key not in _models:
+        _models[key] = vectorizer.get_feature_names_out()
+    return _models[key]
@@ -0,0 +1,96 @@
+from pathlib import Path
+
+import pandas as pd
+
+CUBE_KEYS = ["Region", "City", "Place Type", "Place Name", "Place Category"]
+SENTIMENT_LABELS = ["negative", "neutral", "positive"]
+MEASURES = ["Rating Sum", "Rating Count", "Total Reviews"] + SENTIMENT_LABELS
+
+
+def _aggregate(df: pd.DataFrame) -> pd.DataFrame:
+    """Collapse raw review rows into cube cells (one row per distinct key tuple)"""
+    keys = [key for key in CUBE_KEYS if key in df.columns]
+    rating = df["Rating"].astype("float64")
+
+    measures = pd.DataFrame({
+        "Rating Sum": rating.fillna(0),
+        "Rating Count": rating.notna().astype("int64"),
+        "Total Reviews": 1,
+    }, index=df.index)
+    for label in SENTIMENT_LABELS:
+        measures[label] = (df["Sentiment Label"] == label).astype("int64")
+    for key in keys:
+        measures[key] = df[key]
+
+    # dropna=False: a missing Place Category must not hide the review from coarser views
+    cells = measures.groupby(keys, observed=True, dropna=False, sort=False)[MEASURES].sum().reset_index()
+    cells[keys] = cells[keys].astype(object)
+    return cells
+
+
+class RollupCube:
+    """
+    Pre-aggregated rating sums/counts and sentiment counts keyed by
+    (Region, City, Place Type, Place Name, Place Category).
+
+    Every dashboard view (average rating per place, per type, per city, sentiment
+    breakdowns...) is a roll-up of these cells, so answering one costs the number
+    of groups, not the number of reviews. New review batches are merged into the
+    existing cells without touching the reviews already counted.
+    """
+
+    def __init__(self, cells: pd.DataFrame | None = None):
+        if cells is None:
+            cells = pd.DataFrame(columns=CUBE_KEYS + MEASURES)
+        self.cells = cells
+
+    @classmethod
+    def from_reviews(cls, df: pd.DataFrame) -> "RollupCube":
+        return cls(_aggregate(df))
+
+    @classmethod
+    def load(cls, path: Path) -> "RollupCube":
+        return cls(pd.read_parquet(path))
+
+    def save(self, path: Path) -> None:
+        self.cells.to_parquet(path, index=False)
+
+    @property
+    def keys(self) -> list[str]:
+        return [key for key in CUBE_KEYS if key in self.cells.columns]
+
+    def update(self, batch: pd.DataFrame) -> "RollupCube":
+        """Fold a batch of new reviews into the cube"""
+        if len(batch) == 0:
+            return self
+        cells = pd.concat([self.cells, _aggregate(batch)], ignore_index=True)
+        cells = cells.groupby(self.keys, dropna=False, sort=False)[MEASURES].sum().reset_index()
+        self.cells = cells.astype({measure: "int64" for measure in MEASURES if measure != "Rating Sum"})
+        return self
+
+    def _filtered(self, where: dict | None) -> pd.DataFrame:
+        cells = self.cells
+        for key, values in (where or {}).items():
+            if values:
+                cells = cells[cells[key].isin(values)]
+        return cells
+
+    def view(self, by: list[str], where: dict | None = None) -> pd.DataFrame:
+        """
+        Roll the cube up to `by`, optionally restricted to cells whose key values
+        are in `where[key]` (empty selections are ignored, like the sidebar filters).
+        Returns one row per group with `Rating` (mean), `Total Reviews` and the
+        per-label sentiment counts, sorted by the group keys like `groupby` does.
+        """
+        grouped = self._filtered(where).groupby(by, sort=True)[MEASURES].sum()
+        grouped.insert(0, "Rating", grouped["Rating Sum"] / grouped["Rating Count"].where(grouped["Rating Count"] > 0))
+        return grouped.drop(columns=["Rating Sum", "Rating Count"]).reset_index()
+
+    def totals(self, where: dict | None = None) -> pd.Series:
+        """Measures summed over every cell matching `where`"""
+        return self._filtered(where)[MEASURES].sum()
+
+    def sentiment_counts(self, where: dict | None = None) -> pd.Series:
+        """Non-zero sentiment label counts, largest first (like `value_counts()`)"""
+        counts = self.totals(where)[SENTIMENT_LABELS].astype("int64")
+        return counts[counts > 0].sort_values(ascending=False)
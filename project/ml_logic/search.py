@@ -0,0 +1,471 @@
+import fcntl
+import json
+import os
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from project.params import BM25_B, BM25_K1, SEARCH_DIR, SEARCH_RESULTS, SEARCH_SEGMENT_SIZE, STORE_DIR
+
+MANIFEST_FILE = "manifest.json"
+ROWS_FILE = "rows.npy"
+LOCK_FILE = ".lock"
+SEARCH_COLUMN = "Cleaned Review"
+# Phrases are matched on word positions in the review as written, stop words included
+PHRASE_COLUMN = "Review Text"
+# Bump when the segment layout changes: older indexes are then rebuilt
+INDEX_FORMAT = 2
+
+_WORDS = re.compile(r"\w+")
+# "quoted phrase", -negated, OR, or a plain term
+_QUERY_TOKENS = re.compile(r'(-?)"([^"]*)"|(\S+)')
+
+
+def tokenize(texts: pd.Series) -> pd.Series:
+    """Lowercased words, the same way for indexed texts and queries"""
+    return texts.fillna("").astype(str).str.lower().str.findall(_WORDS)
+
+
+def term_hashes(terms) -> np.ndarray:
+    """Stable 64-bit hash of each term: segments look terms up by hash"""
+    return pd.util.hash_array(np.asarray(terms, dtype=object))
+
+
+##################  POSTINGS COMPRESSION  ##################
+
+def vbyte_lengths(values: np.ndarray) -> np.ndarray:
+    """Number of bytes `vbyte_encode` uses for each value"""
+    values = np.asarray(values, dtype=np.uint64)
+    return 1 + sum((values >= (1 << (7 * k))).astype(np.int64) for k in range(1, 5))
+
+
+def vbyte_encode(values: np.ndarray) -> np.ndarray:
+    """Variable-byte encoding of uint32 values (7 bits per byte, high bit = more bytes follow)"""
+    values = np.asarray(values, dtype=np.uint64)
+    n_bytes = vbyte_lengths(values)
+    starts = np.concatenate([[0], np.cumsum(n_bytes)[:-1]])
+    out = np.empty(int(n_bytes.sum()), dtype=np.uint8)
+    for k in range(5):
+        has = n_bytes > k
+        byte = (values[has] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (n_bytes[has] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[has] + k] = (byte | more).astype(np.uint8)
+    return out
+
+
+def vbyte_decode(data: np.ndarray) -> np.ndarray:
+    data = np.asarray(data, dtype=np.uint8)
+    if not len(data):
+        return np.empty(0, dtype=np.uint32)
+    last = (data & 0x80) == 0
+    starts = np.flatnonzero(np.concatenate([[True], last[:-1]]))
+    shift = (np.arange(len(data)) - np.repeat(starts, np.diff(np.append(starts, len(data))))) * 7
+    return np.add.reduceat((data & 0x7F).astype(np.uint64) << shift.astype(np.uint64), starts).astype(np.uint32)
+
+
+##################  SORTED SETS  ##################
+# Postings are sorted and without repeats: set operations search into them
+# instead of sorting their concatenation again (np.unique, np.intersect1d...)
+
+def _contains(sorted_values: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Mask of the `values` found in `sorted_values`"""
+    if not len(sorted_values):
+        return np.zeros(len(values), dtype=bool)
+    positions = np.minimum(np.searchsorted(sorted_values, values), len(sorted_values) - 1)
+    return sorted_values[positions] == values
+
+
+def _intersect(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    small, large = (a, b) if len(a) <= len(b) else (b, a)
+    return small[_contains(large, small)]
+
+
+def _union(arrays: list[np.ndarray]) -> np.ndarray:
+    # A stable sort merges the already sorted runs
+    values = np.sort(np.concatenate(arrays), kind="stable")
+    return values[np.diff(values, prepend=values[:1] - 1) != 0] if len(values) else values
+
+
+##################  SEGMENTS  ##################
+
+@contextmanager
+def _index_lock(index_dir: Path, shared: bool = False):
+    """
+    File lock on the index directory, across processes: exclusive while the
+    index is updated, shared while it is opened (manifest and rows read together)
+    """
+    index_dir.mkdir(parents=True, exist_ok=True)
+    with open(index_dir / LOCK_FILE, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _position_postings(texts: pd.Series) -> dict[str, np.ndarray]:
+    """
+    Positional postings of every word of `texts`, stop words included: sorted
+    term hashes, and per term its (doc, position) occurrences as vbyte doc-id
+    gaps (0: same doc) and position gaps (from 0 again in each doc), with the
+    byte offsets of each term in both streams.
+    """
+    tokens = tokenize(texts.reset_index(drop=True)).explode().dropna()
+    docs = tokens.index.to_numpy(dtype=np.int64)
+    positions = tokens.groupby(level=0, sort=False).cumcount().to_numpy(dtype=np.int64)
+    terms = term_hashes(tokens.to_numpy())
+    order = np.lexsort((positions, docs, terms))
+    terms, docs, positions = terms[order], docs[order], positions[order]
+
+    unique_terms, first = np.unique(terms, return_index=True)
+    starts = np.zeros(len(terms), dtype=bool)
+    starts[first] = True
+    new_doc = starts | np.diff(docs, prepend=-1).astype(bool)
+    doc_gaps = np.where(starts, docs, np.diff(docs, prepend=0))
+    position_gaps = np.where(new_doc, positions, np.diff(positions, prepend=0))
+
+    def offsets(values: np.ndarray) -> np.ndarray:
+        ends = np.cumsum(vbyte_lengths(values))
+        return np.concatenate([[0], ends[np.append(first[1:], len(values)) - 1] if len(values) else []]).astype(np.uint64)
+
+    return {
+        "terms": unique_terms,
+        "doc_offsets": offsets(doc_gaps),
+        "position_offsets": offsets(position_gaps),
+        "docs": vbyte_encode(doc_gaps),
+        "positions": vbyte_encode(position_gaps),
+    }
+
+
+def _write_segment(path: Path, texts: pd.Series, phrase_texts: pd.Series, doc_hashes: np.ndarray) -> int:
+    """
+    Write one immutable segment for `texts` (segment-local doc ids 0..n-1):
+    sorted term hashes, doc frequencies, vbyte doc-id gaps and term frequencies,
+    plus the word positions of `phrase_texts` for phrase queries.
+    """
+    tokens = tokenize(texts.reset_index(drop=True))
+    lengths = tokens.str.len().to_numpy(dtype=np.uint32)
+    exploded = tokens.explode().dropna()
+
+    pairs = pd.DataFrame({
+        "term": term_hashes(exploded.to_numpy()),
+        "doc": exploded.index.to_numpy(dtype=np.int64),
+    })
+    counts = pairs.groupby(["term", "doc"], sort=True).size()
+    terms = counts.index.get_level_values("term").to_numpy(dtype=np.uint64)
+    docs = counts.index.get_level_values("doc").to_numpy(dtype=np.int64)
+
+    unique_terms, first, doc_freq = np.unique(terms, return_index=True, return_counts=True)
+    # Gaps between consecutive doc ids of a term; the first gap of a term is its first doc id
+    gaps = np.diff(docs, prepend=0)
+    gaps[first] = docs[first]
+    encoded = [vbyte_encode(gaps[start:start + n]) for start, n in zip(first, doc_freq)]
+    byte_offsets = np.concatenate([[0], np.cumsum([len(e) for e in encoded])]).astype(np.uint64)
+
+    # Private to this process; moved into place once complete
+    tmp_path = Path(tempfile.mkdtemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent))
+    np.save(tmp_path / "terms.npy", unique_terms)
+    np.save(tmp_path / "doc_freq.npy", doc_freq.astype(np.uint32))
+    np.save(tmp_path / "byte_offsets.npy", byte_offsets)
+    np.save(tmp_path / "posting_starts.npy", np.concatenate([[0], np.cumsum(doc_freq)]).astype(np.uint64))
+    np.save(tmp_path / "tfs.npy", np.minimum(counts.to_numpy(), np.iinfo(np.uint16).max).astype(np.uint16))
+    np.save(tmp_path / "doc_len.npy", lengths)
+    np.save(tmp_path / "doc_hash.npy", np.asarray(doc_hashes, dtype=np.uint64))
+    (np.concatenate(encoded) if encoded else np.empty(0, np.uint8)).tofile(tmp_path / "postings.bin")
+    positional = _position_postings(phrase_texts)
+    np.save(tmp_path / "position_terms.npy", positional["terms"])
+    np.save(tmp_path / "position_doc_offsets.npy", positional["doc_offsets"])
+    np.save(tmp_path / "position_offsets.npy", positional["position_offsets"])
+    positional["docs"].tofile(tmp_path / "position_docs.bin")
+    positional["positions"].tofile(tmp_path / "positions.bin")
+    if path.exists():
+        # Left by an update that died before writing the manifest: no reader uses it
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+    return len(lengths)
+
+
+class _Segment:
+    def __init__(self, path: Path, offset: int):
+        self.offset = offset
+        self.terms = np.load(path / "terms.npy", mmap_mode="r")
+        self.doc_freq = np.load(path / "doc_freq.npy", mmap_mode="r")
+        self.byte_offsets = np.load(path / "byte_offsets.npy", mmap_mode="r")
+        self.posting_starts = np.load(path / "posting_starts.npy", mmap_mode="r")
+        self.tfs = np.load(path / "tfs.npy", mmap_mode="r")
+        self.doc_len = np.load(path / "doc_len.npy", mmap_mode="r")
+        self.doc_hash = np.load(path / "doc_hash.npy", mmap_mode="r")
+        self.postings = self._bytes(path / "postings.bin")
+        self.position_terms = np.load(path / "position_terms.npy", mmap_mode="r")
+        self.position_doc_offsets = np.load(path / "position_doc_offsets.npy", mmap_mode="r")
+        self.position_offsets = np.load(path / "position_offsets.npy", mmap_mode="r")
+        self.position_docs = self._bytes(path / "position_docs.bin")
+        self.positions = self._bytes(path / "positions.bin")
+
+    @staticmethod
+    def _bytes(path: Path) -> np.ndarray:
+        return np.memmap(path, dtype=np.uint8, mode="r") if path.stat().st_size else np.empty(0, np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def postings_of(self, term_hash: np.uint64) -> tuple[np.ndarray, np.ndarray]:
+        """Global doc ids and term frequencies of a term (empty if absent)"""
+        i = np.searchsorted(self.terms, term_hash)
+        if i >= len(self.terms) or self.terms[i] != term_hash:
+            return np.empty(0, np.int64), np.empty(0, np.uint16)
+        data = self.postings[int(self.byte_offsets[i]):int(self.byte_offsets[i + 1])]
+        docs = np.cumsum(vbyte_decode(data), dtype=np.int64) + self.offset
+        return docs, np.asarray(self.tfs[int(self.posting_starts[i]):int(self.posting_starts[i + 1])])
+
+    def positions_of(self, term_hash: np.uint64) -> tuple[np.ndarray, np.ndarray]:
+        """Global doc id and word position of every occurrence of a term in the review text"""
+        i = np.searchsorted(self.position_terms, term_hash)
+        if i >= len(self.position_terms) or self.position_terms[i] != term_hash:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        doc_gaps = vbyte_decode(self.position_docs[int(self.position_doc_offsets[i]):int(self.position_doc_offsets[i + 1])])
+        gaps = vbyte_decode(self.positions[int(self.position_offsets[i]):int(self.position_offsets[i + 1])]).astype(np.int64)
+        docs = np.cumsum(doc_gaps, dtype=np.int64)
+        new_doc = np.flatnonzero(np.diff(docs, prepend=-1) != 0)
+        total = np.cumsum(gaps)
+        # Position gaps restart at each doc: subtract the running total before it
+        positions = total - np.repeat(total[new_doc] - gaps[new_doc], np.diff(np.append(new_doc, len(docs))))
+        return docs + self.offset, positions
+
+
+##################  QUERIES  ##################
+
+def parse_query(query: str) -> list[list[dict]]:
+    """
+    `shower pressure` -> both terms; `"shower pressure"` -> the phrase;
+    `parking OR traffic` -> either; `-dirty` or `NOT dirty` -> not. Returns AND-ed
+    groups of OR-ed clauses, each clause {"terms": [...], "phrase": bool, "negated": bool}.
+    """
+    groups, join_next, negate_next = [], False, False
+    for minus, phrase, word in _QUERY_TOKENS.findall(query):
+        if word in ("OR", "NOT"):
+            join_next = word == "OR" and bool(groups)
+            negate_next = word == "NOT"
+            continue
+        if word and word.startswith("-") and len(word) > 1:
+            minus, word = "-", word[1:]
+        terms = _WORDS.findall((phrase if not word else word).lower())
+        if not terms:
+            continue
+        negated = bool(minus) or negate_next
+        clause = {"terms": terms, "phrase": not word and len(terms) > 1, "negated": negated}
+        if join_next and not negated:
+            groups[-1].append(clause)
+        else:
+            groups.append([clause])
+        join_next = negate_next = False
+    return groups
+
+
+class SearchIndex:
+    """
+    On-disk inverted index over the reviews' `Cleaned Review`, in immutable
+    segments whose postings (vbyte-compressed doc-id gaps and term frequencies)
+    are memory-mapped, so opening the index reads nothing up front and a query
+    only touches the postings of its terms.
+
+    Queries are boolean (AND by default, OR, -NOT) with "quoted phrases",
+    ranked by BM25 and optionally restricted to a set of review store rows
+    (e.g. the Region/City/Place Type facets). Phrases are matched on the word
+    positions of `Review Text`, stop words included, so "not clean" matches
+    what was typed although the cleaned text has no "not". New reviews are
+    added as a new segment by `update_search_index`.
+    """
+
+    def __init__(self, path: Path = SEARCH_DIR):
+        self.path = Path(path)
+        with _index_lock(self.path, shared=True):
+            manifest = json.loads((self.path / MANIFEST_FILE).read_text())
+            if manifest.get("format") != INDEX_FORMAT:
+                raise ValueError(f"Search index in {self.path} has an older format: run update_search_index")
+            self.store_version = manifest["store_version"]
+            self.segments, offset = [], 0
+            for name in manifest["segments"]:
+                segment = _Segment(self.path / name, offset)
+                self.segments.append(segment)
+                offset += len(segment)
+            self.n_docs = offset
+            # Review store row of every doc (-1: no longer in the store)
+            self.rows = np.load(self.path / ROWS_FILE, mmap_mode="r")
+        live = self.rows >= 0
+        self.n_live = int(live.sum())
+        doc_len = np.concatenate([s.doc_len for s in self.segments]) if self.segments else np.empty(0, np.uint32)
+        self.avg_len = float(doc_len[live].mean()) if self.n_live else 0.0
+        self._doc_len = doc_len
+
+    def _postings(self, term: str) -> tuple[np.ndarray, np.ndarray]:
+        term_hash = term_hashes([term])[0]
+        docs, tfs = zip(*(segment.postings_of(term_hash) for segment in self.segments)) if self.segments else ((), ())
+        docs = np.concatenate(docs) if docs else np.empty(0, np.int64)
+        tfs = np.concatenate(tfs) if tfs else np.empty(0, np.uint16)
+        live = self.rows[docs] >= 0
+        return docs[live], tfs[live]
+
+    def _phrase_docs(self, terms: list[str]) -> np.ndarray:
+        """Live docs where `terms` follow each other in the review text"""
+        hits = None
+        for i, term_hash in enumerate(term_hashes(terms)):
+            found = [segment.positions_of(term_hash) for segment in self.segments]
+            docs = np.concatenate([d for d, _ in found]) if found else np.empty(0, np.int64)
+            positions = np.concatenate([p for _, p in found]) if found else np.empty(0, np.int64)
+            # (doc, position the phrase would start at) of every occurrence
+            after = positions >= i
+            keys = (docs[after] << 32) | (positions[after] - i)
+            hits = keys if hits is None else _intersect(hits, keys)
+            if not len(hits):
+                break
+        docs = hits >> 32
+        docs = docs[np.diff(docs, prepend=-1) != 0]
+        return docs[self.rows[docs] >= 0]
+
+    def _clause_docs(self, clause: dict, postings: dict) -> np.ndarray:
+        if clause["phrase"]:
+            return self._phrase_docs(clause["terms"])
+        docs = None
+        for term in clause["terms"]:
+            term_docs = postings[term][0]
+            docs = term_docs if docs is None else _intersect(docs, term_docs)
+        return docs
+
+    def search(self, query: str, rows: np.ndarray | None = None, k: int = SEARCH_RESULTS) -> pd.DataFrame:
+        """
+        Top-k matches of `query` as a frame with the review store `row` and its
+        BM25 `score`, best first. `rows` restricts matches to those store rows.
+        `attrs["matches"]` holds the total number of matching reviews.
+        """
+        groups = parse_query(query)
+        positive = [clause for group in groups for clause in group if not clause["negated"]]
+        if not positive:
+            return self._result(np.empty(0, np.int64), np.empty(0), 0)
+
+        terms = {term for group in groups for clause in group for term in clause["terms"]}
+        postings = {term: self._postings(term) for term in terms}
+
+        # Boolean match: AND of the groups, OR inside a group, minus the negated clauses
+        matches = None
+        for group in groups:
+            if all(clause["negated"] for clause in group):
+                continue
+            group_docs = _union([self._clause_docs(clause, postings) for clause in group if not clause["negated"]])
+            matches = group_docs if matches is None else _intersect(matches, group_docs)
+        for clause in (clause for group in groups for clause in group if clause["negated"]):
+            matches = matches[~_contains(self._clause_docs(clause, postings), matches)]
+
+        if rows is not None:
+            matches = matches[np.isin(self.rows[matches], rows)]
+
+        # BM25 over the positive terms
+        scores = np.zeros(len(matches))
+        lengths = self._doc_len[matches]
+        for term in {term for clause in positive for term in clause["terms"]}:
+            docs, tfs = postings[term]
+            if not len(docs):
+                continue
+            idf = np.log(1 + (self.n_live - len(docs) + 0.5) / (len(docs) + 0.5))
+            positions = np.searchsorted(docs, matches)
+            positions = np.minimum(positions, len(docs) - 1)
+            tf = np.where(docs[positions] == matches, tfs[positions], 0).astype(np.float64)
+            scores += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths / self.avg_len))
+
+        top = np.argsort(-scores, kind="stable")[:k]
+        return self._result(np.asarray(self.rows[matches[top]]), scores[top], len(matches))
+
+    @staticmethod
+    def _result(rows: np.ndarray, scores: np.ndarray, matches: int) -> pd.DataFrame:
+        result = pd.DataFrame({"row": rows.astype(np.int64), "score": scores})
+        result.attrs["matches"] = matches
+        return result
+
+
+##################  BUILD / UPDATE  ##################
+
+def _store_documents(store_dir: Path) -> tuple[pd.Series, pd.Series, np.ndarray]:
+    """
+    Searched text, phrase text and hash of every store row: Review Text + Place
+    Name, plus the occurrence number so that repeated reviews stay separate documents
+    """
+    from project.ml_logic.data import load_review_text, load_reviews
+
+    text = load_review_text(columns=["Review Text", SEARCH_COLUMN], store_dir=store_dir)
+    places = load_reviews(columns=["Place Name"], store_dir=store_dir)["Place Name"]
+    keys = pd.DataFrame({"Review Text": text["Review Text"].astype(object), "Place Name": places.astype(object)})
+    keys["Occurrence"] = keys.groupby(["Review Text", "Place Name"], dropna=False, sort=False).cumcount()
+    return text[SEARCH_COLUMN], text[PHRASE_COLUMN], pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def update_search_index(
+    store_dir: Path = STORE_DIR,
+    index_dir: Path = SEARCH_DIR,
+    segment_size: int = SEARCH_SEGMENT_SIZE,
+) -> str:
+    """
+    Bring the search index up to date with the review store: reviews not
+    indexed yet (by review hash) are written as new segments, and every doc is
+    re-pointed to its current store row. Existing segments are never rewritten,
+    unless the index has an older format (`INDEX_FORMAT`). Returns the store version the index now matches.
+    """
+    from project.ml_logic.data import store_version
+
+    store_dir, index_dir = Path(store_dir), Path(index_dir)
+    version = store_version(store_dir)
+    if version is None:
+        raise FileNotFoundError(f"No review store in {store_dir}: build it first")
+
+    manifest_path = index_dir / MANIFEST_FILE
+    def up_to_date(manifest: dict) -> bool:
+        return manifest.get("store_version") == version and manifest.get("format") == INDEX_FORMAT
+
+    if manifest_path.exists() and up_to_date(json.loads(manifest_path.read_text())):
+        return version
+
+    # One updater at a time (app server processes, `make build_search`...): the
+    # others wait, then find the index up to date
+    with _index_lock(index_dir):
+        manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {"segments": []}
+        if up_to_date(manifest):
+            return version
+        if manifest.get("format") != INDEX_FORMAT:
+            for name in manifest["segments"]:
+                shutil.rmtree(index_dir / name, ignore_errors=True)
+            manifest = {"segments": []}
+
+        texts, phrase_texts, hashes = _store_documents(store_dir)
+        indexed = np.concatenate(
+            [np.load(index_dir / name / "doc_hash.npy") for name in manifest["segments"]]
+        ) if manifest["segments"] else np.empty(0, np.uint64)
+
+        new = np.flatnonzero(~np.isin(hashes, indexed))
+        segments = list(manifest["segments"])
+        for start in range(0, len(new), segment_size):
+            batch = new[start:start + segment_size]
+            name = f"segment_{len(segments):05d}"
+            _write_segment(index_dir / name, texts.iloc[batch], phrase_texts.iloc[batch], hashes[batch])
+            segments.append(name)
+        print(f"✅ Indexed {len(new)} new reviews into {len(segments)} segment(s)")
+
+        # Current store row of every doc, by review hash
+        order = np.argsort(hashes, kind="stable")
+        all_hashes = np.concatenate([indexed, hashes[new]])
+        positions = np.minimum(np.searchsorted(hashes[order], all_hashes), max(len(hashes) - 1, 0))
+        found = hashes[order][positions] == all_hashes if len(hashes) else np.zeros(len(all_hashes), bool)
+        rows = np.where(found, order[positions], -1).astype(np.int64)
+
+        tmp_rows = index_dir / f"{ROWS_FILE}.{os.getpid()}.tmp.npy"
+        np.save(tmp_rows, rows)
+        os.replace(tmp_rows, index_dir / ROWS_FILE)
+        tmp_manifest = index_dir / f"{MANIFEST_FILE}.{os.getpid()}.tmp"
+        tmp_manifest.write_text(json.dumps(
+            {"format": INDEX_FORMAT, "store_version": version, "segments": segments}, indent=2
+        ))
+        os.replace(tmp_manifest, manifest_path)
+    return version
@@ -0,0 +1,247 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from importlib import metadata
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from project.ml_logic.languages import DEFAULT_ROUTE, language_routes, review_languages
+from project.ml_logic.preprocessor import iter_processed
+from project.params import (
+    CHUNK_SIZE,
+    NEGATIVE_THRESHOLD,
+    POSITIVE_THRESHOLD,
+    PROCESSED_DIR,
+    REVIEW_CSV,
+    REVIEW_LANGUAGES,
+    SENTIMENT_CACHE,
+)
+
+SCORE_COLUMNS = ["neg", "neu", "pos", "compound"]
+BATCH_SIZE = 2_000
+
+_analyzers = {}
+
+
+def _analyzer(route: str):
+    """Sentiment scorer of a language route, created once per process"""
+    if route not in _analyzers:
+        if route == "ar":
+            from project.ml_logic.languages import ArabicSentimentAnalyzer
+
+            _analyzers[route] = ArabicSentimentAnalyzer()
+        else:
+            from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+            from project.ml_logic.nltk_resources import ensure_nltk_resource
+
+            ensure_nltk_resource("sentiment/vader_lexicon.zip", "vader_lexicon")
+            _analyzers[route] = SentimentIntensityAnalyzer()
+    return _analyzers[route]
+
+
+def _load_analyzers(routes: list[str]) -> None:
+    """Pool worker initializer: load every scorer (VADER lexicon...) once per worker"""
+    for route in routes:
+        _analyzer(route)
+
+
+def scoring_pool(n_jobs: int | None = None) -> ProcessPoolExecutor:
+    """
+    Process pool for `score_texts` (`n_jobs` workers, default: all cores) whose
+    workers load the scorers once: create it once per run and pass it to every
+    `score_texts` call instead of starting workers for each chunk
+    """
+    routes = list(dict.fromkeys([DEFAULT_ROUTE, *REVIEW_LANGUAGES]))
+    return ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count() or 1, initializer=_load_analyzers, initargs=(routes,))
+
+
+def _score_batch(texts: list[str], route: str = DEFAULT_ROUTE) -> np.ndarray:
+    """Scores of a batch as an (n, 4) float32 array: neg, neu, pos, compound"""
+    analyzer = _analyzer(route)
+    scores = np.empty((len(texts), len(SCORE_COLUMNS)), dtype=np.float32)
+    for i, text in enumerate(texts):
+        polarity = analyzer.polarity_scores(text)
+        scores[i] = [polarity[col] for col in SCORE_COLUMNS]
+    return scores
+
+
+def label_sentiment(compound: np.ndarray) -> np.ndarray:
+    """Vectorized label: positive >= 0.05, negative <= -0.05, neutral otherwise"""
+    compound = np.asarray(compound)
+    return np.where(
+        compound >= POSITIVE_THRESHOLD, "positive",
+        np.where(compound <= NEGATIVE_THRESHOLD, "negative", "neutral"),
+    ).astype(object)
+
+
+def scorer_version(route: str) -> str:
+    """Identifies the scorer of a language route and the lexicon it scores with"""
+    if route == "ar":
+        from project.ml_logic.languages import arabic_scorer_version
+
+        return f"ar:lexicon-{arabic_scorer_version()}"
+    # VADER ships with NLTK
+    return f"{route}:vader-nltk-{metadata.version('nltk')}"
+
+
+def score_hashes(texts: pd.Series, routes: np.ndarray) -> np.ndarray:
+    """64-bit key of every (text, route, scorer version): a score is only reused by the same scorer"""
+    versions = {route: scorer_version(route) for route in pd.unique(routes)}
+    keys = pd.DataFrame({"text": texts.astype(str).to_numpy(), "scorer": [versions[route] for route in routes]})
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+class SentimentCache:
+    """
+    Persistent sentiment scores keyed by a 64-bit hash of the scored text, its
+    language route and the version of the scorer that produced them, so a
+    score is never served after the routing or a lexicon changes.
+    Kept as two sorted NumPy arrays (hashes, scores) so lookups are a vectorized
+    `searchsorted`; stored as a single .npz file.
+    """
+
+    def __init__(self, path: Path | None = SENTIMENT_CACHE):
+        self.path = Path(path) if path is not None else None
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.scores = np.empty((0, len(SCORE_COLUMNS)), dtype=np.float32)
+        if self.path is not None and self.path.exists():
+            with np.load(self.path) as cached:
+                self.hashes, self.scores = cached["hashes"], cached["scores"]
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def lookup(self, hashes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return (found mask, scores); rows not found have undefined scores"""
+        positions = np.searchsorted(self.hashes, hashes)
+        positions = np.minimum(positions, max(len(self.hashes) - 1, 0))
+        found = self.hashes[positions] == hashes if len(self.hashes) else np.zeros(len(hashes), bool)
+        scores = self.scores[positions] if len(self.hashes) else np.zeros((len(hashes), len(SCORE_COLUMNS)), np.float32)
+        return found, scores
+
+    def add(self, hashes: np.ndarray, scores: np.ndarray) -> None:
+        hashes, first = np.unique(hashes, return_index=True)
+        all_hashes = np.concatenate([self.hashes, hashes])
+        all_scores = np.concatenate([self.scores, scores[first]])
+        all_hashes, keep = np.unique(all_hashes, return_index=True)
+        self.hashes, self.scores = all_hashes, all_scores[keep]
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp.npz")
+        np.savez(tmp_path, hashes=self.hashes, scores=self.scores)
+        os.replace(tmp_path, self.path)
+
+
+def score_texts(
+    texts: pd.Series,
+    cache: SentimentCache | None = None,
+    n_jobs: int | None = None,
+    batch_size: int = BATCH_SIZE,
+    languages: np.ndarray | None = None,
+    pool: ProcessPoolExecutor | None = None,
+) -> np.ndarray:
+    """
+    Sentiment scores for `texts` as an (n, 4) float32 array (neg, neu, pos, compound).
+    Each text is scored by the scorer of its language (VADER unless another
+    route exists, e.g. Arabic). Texts already in `cache` are not rescored; the
+    rest are split into single-language batches, and the batches of every
+    language are scored together across `pool` (see `scoring_pool`), or across
+    a pool of `n_jobs` workers (default: all cores) started for this call.
+    """
+    texts = texts.fillna("").astype(str)
+    routes = language_routes(languages) if languages is not None else np.full(len(texts), DEFAULT_ROUTE, dtype=object)
+    hashes = score_hashes(texts, routes)
+    scores = np.zeros((len(texts), len(SCORE_COLUMNS)), dtype=np.float32)
+
+    found = np.zeros(len(texts), dtype=bool)
+    if cache is not None:
+        found, cached_scores = cache.lookup(hashes)
+        scores[found] = cached_scores[found]
+
+    # Score each distinct missing text once, grouped by route
+    missing_hashes, first, inverse = np.unique(hashes[~found], return_index=True, return_inverse=True)
+    missing_texts = texts.to_numpy()[~found][first]
+    missing_routes = routes[~found][first]
+    order = np.argsort(missing_routes, kind="stable")
+    batches, batch_routes = [], []
+    for route in pd.unique(missing_routes[order]):
+        route_texts = missing_texts[order][missing_routes[order] == route].tolist()
+        for i in range(0, len(route_texts), batch_size):
+            batches.append(route_texts[i:i + batch_size])
+            batch_routes.append(route)
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if len(batches) <= 1 or (pool is None and n_jobs == 1):
+        results = [_score_batch(batch, route) for batch, route in zip(batches, batch_routes)]
+    elif pool is not None:
+        results = list(pool.map(_score_batch, batches, batch_routes))
+    else:
+        with scoring_pool(min(n_jobs, len(batches))) as pool:
+            results = list(pool.map(_score_batch, batches, batch_routes))
+
+    if results:
+        new_scores = np.empty((len(missing_texts), len(SCORE_COLUMNS)), dtype=np.float32)
+        new_scores[order] = np.concatenate(results)
+        scores[~found] = new_scores[inverse]
+        if cache is not None:
+            cache.add(missing_hashes, new_scores)
+    return scores
+
+
+def add_sentiment(
+    df: pd.DataFrame,
+    text_column: str = "Cleaned Review",
+    cache: SentimentCache | None = None,
+    n_jobs: int | None = None,
+    pool: ProcessPoolExecutor | None = None,
+) -> pd.DataFrame:
+    """
+    Return `df` with neg/neu/pos/compound and `Sentiment Label` columns, each
+    review scored in its language (from `Reviewer Language`, or its script)
+    """
+    languages = review_languages(df, "Review Text" if "Review Text" in df.columns else text_column)
+    scores = score_texts(df[text_column], cache=cache, n_jobs=n_jobs, languages=languages, pool=pool)
+    columns = {col: scores[:, i] for i, col in enumerate(SCORE_COLUMNS)}
+    columns["Sentiment Label"] = label_sentiment(scores[:, SCORE_COLUMNS.index("compound")])
+    return df.assign(**columns)
+
+
+def score_processed(
+    processed_dir: Path = PROCESSED_DIR,
+    output_csv: Path = REVIEW_CSV,
+    cache_path: Path | None = SENTIMENT_CACHE,
+    chunksize: int = CHUNK_SIZE,
+    n_jobs: int | None = None,
+) -> int:
+    """
+    Score every cleaned review from `preprocess()` and write the dashboard's
+    review CSV, chunk by chunk. Unchanged reviews are served from the cache.
+    One process pool scores every chunk, so workers start and load their
+    scorers once per run.
+    """
+    cache = SentimentCache(cache_path)
+    output_csv = Path(output_csv)
+    tmp_path = output_csv.with_suffix(".csv.tmp")
+    written = 0
+    pool = scoring_pool(n_jobs) if (n_jobs or os.cpu_count() or 1) > 1 else None
+
+    try:
+        for chunk in iter_processed(processed_dir, chunksize=chunksize):
+            chunk = add_sentiment(chunk, cache=cache, n_jobs=n_jobs, pool=pool)
+            chunk.to_csv(tmp_path, mode="a" if written else "w", header=not written, index=False)
+            written += len(chunk)
+        if written:
+            os.replace(tmp_path, output_csv)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        tmp_path.unlink(missing_ok=True)
+        cache.save()
+
+    print(f"✅ Scored {written} reviews into {output_csv} ({len(cache)} cached scores)")
+    return written
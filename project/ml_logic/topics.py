@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from project.ml_logic.registry import artifact_hash, artifact_path, load_feature_names, load_model
+from project.params import TOPIC_CACHE_DIR, TOPIC_WORDS
+
+TOPICS_FILE = "topics.json"
+
+
+def topic_model_hash() -> str:
+    """Identifies the (LDA, vectorizer) pair the cached topics were computed from"""
+    digest = hashlib.sha256()
+    for name in ("lda", "vectorizer"):
+        digest.update(artifact_hash(artifact_path(name)).encode())
+    return digest.hexdigest()[:16]
+
+
+def top_topic_words(components: np.ndarray, feature_names: np.ndarray, n_words: int = TOPIC_WORDS) -> list[list[tuple[str, float]]]:
+    """
+    Top `n_words` (word, weight) of every topic, from one `argpartition` over the
+    whole components matrix. Like the page used to, indices beyond the
+    vectorizer vocabulary are skipped.
+    """
+    components = np.asarray(components)
+    n_words = min(n_words, components.shape[1])
+    top = np.argpartition(-components, n_words - 1, axis=1)[:, :n_words]
+    # Order the selected words only (n_words per topic, not the whole vocabulary)
+    weights = np.take_along_axis(components, top, axis=1)
+    top = np.take_along_axis(top, np.argsort(-weights, axis=1, kind="stable"), axis=1)
+
+    return [
+        [(str(feature_names[i]), float(components[topic, i])) for i in row if i < len(feature_names)]
+        for topic, row in enumerate(top)
+    ]
+
+
+def _render_bar(words: list[tuple[str, float]], topic: int, path: Path) -> None:
+    import pandas as pd
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    topic_df = pd.DataFrame(words, columns=["Word", "Weight"])
+    fig = Figure()
+    ax = fig.subplots()
+    sns.barplot(data=topic_df, x="Weight", y="Word", hue="Word", palette="pastel", legend=False, ax=ax)
+    ax.set_title(f"Top Keywords for Topic {topic}", fontsize=14)
+    ax.set_xlabel("Weight")
+    ax.set_ylabel("Word")
+    fig.savefig(path, bbox_inches="tight")
+
+
+def _render_wordcloud(words: list[tuple[str, float]], path: Path) -> None:
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(width=800, height=400, background_color="white", colormap="Pastel1")
+    wordcloud.generate_from_frequencies(dict(words)).to_file(str(path))
+
+
+def precompute_topics(cache_dir: Path = TOPIC_CACHE_DIR, n_words: int = TOPIC_WORDS) -> Path:
+    """
+    Compute the top words of every LDA topic and pre-render their bar chart and
+    word cloud into `<cache_dir>/<model hash>/`. Only needed once per trained model.
+    """
+    model_dir = Path(cache_dir) / topic_model_hash()
+    model_dir.mkdir(parents=True, exist_ok=True)
+
+    topics = top_topic_words(load_model("lda").components_, load_feature_names(), n_words)
+    entries = []
+    for topic, words in enumerate(topics):
+        bar_path = model_dir / f"topic_{topic}_bar.png"
+        wordcloud_path = model_dir / f"topic_{topic}_wordcloud.png"
+        _render_bar(words, topic, bar_path)
+        _render_wordcloud(words, wordcloud_path)
+        entries.append({
+            "topic": topic,
+            "words": words,
+            "bar_chart": bar_path.name,
+            "wordcloud": wordcloud_path.name,
+        })
+
+    # Written last: its presence means the whole cache for this model is complete
+    tmp_path = model_dir / f"{TOPICS_FILE}.{os.getpid()}.tmp"
+    tmp_path.write_text(json.dumps({"n_words": n_words, "topics": entries}, indent=2))
+    os.replace(tmp_path, model_dir / TOPICS_FILE)
+    print(f"✅ Topic cache written to {model_dir}")
+    return model_dir
+
+
+def load_topics(cache_dir: Path = TOPIC_CACHE_DIR, n_words: int = TOPIC_WORDS) -> list[dict]:
+    """
+    Cached topics of the current model: one dict per topic with `words`
+    [(word, weight)] and absolute `bar_chart` / `wordcloud` image paths.
+    Precomputes the cache first if this model has none yet.
+    """
+    model_dir = Path(cache_dir) / topic_model_hash()
+    path = model_dir / TOPICS_FILE
+    if not path.exists() or json.loads(path.read_text())["n_words"] != n_words:
+        precompute_topics(cache_dir, n_words)
+
+    topics = json.loads(path.read_text())["topics"]
+    for entry in topics:
+        entry["words"] = [tuple(word) for word in entry["words"]]
+        entry["bar_chart"] = str(model_dir / entry["bar_chart"])
+        entry["wordcloud"] = str(model_dir / entry["wordcloud"])
+    return topics
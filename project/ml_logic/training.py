@@ -0,0 +1,325 @@
+import json
+import os
+import resource
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from project.ml_logic.data import load_review_text, load_reviews
+from project.ml_logic.preprocessor import review_hashes
+from project.ml_logic.registry import CURRENT_FILE, MODEL_NAMES, VERSION_MANIFEST, artifact_hash, current_version
+from project.params import (
+    MODELS_DIR,
+    STORE_DIR,
+    TRAIN_BATCH_SIZE,
+    TRAIN_CLUSTERS,
+    TRAIN_HOLDOUT,
+    TRAIN_LDA_PASSES,
+    TRAIN_MAX_FEATURES,
+    TRAIN_N_JOBS,
+    TRAIN_SEED,
+    TRAIN_TOPICS,
+)
+
+# Review hashes a version has seen (trained on or held out), so updates skip them
+SEEN_HASHES_FILE = "seen_hashes.npy"
+TEXT_COLUMN = "Cleaned Review"
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def _measure(step: str, metrics: dict, fn, *args, **kwargs):
+    """
+    Run `fn`, recording under `metrics[step]` its wall time and the peak
+    resident memory (RSS, numpy buffers included) of this process. RSS is a
+    high-water mark of the whole run so far, so a step that does not raise it
+    reports an earlier step's peak. LDA's worker processes are not counted.
+    """
+    start = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        seconds = time.perf_counter() - start
+        rss = _max_rss_mb()
+    metrics.setdefault(step, {}).update({"fit_seconds": round(seconds, 3), "max_rss_mb": round(rss, 1)})
+    print(f"{step}: {seconds:.1f}s, max RSS {rss:.0f} MB")
+    return result
+
+
+def negative_reviews(store_dir: Path = STORE_DIR) -> tuple[np.ndarray, np.ndarray]:
+    """Store rows and review hashes of the negative reviews (the models' training set)"""
+    review = load_reviews(columns=["Sentiment Label", "Place Name"], store_dir=store_dir)
+    rows = np.flatnonzero((review["Sentiment Label"] == "negative").to_numpy())
+    keys = load_review_text(rows, columns=["Review Text"], store_dir=store_dir).astype(object)
+    keys["Place Name"] = review["Place Name"].to_numpy()[rows].astype(object)
+    return rows, review_hashes(keys)
+
+
+def iter_text_batches(rows: np.ndarray, store_dir: Path = STORE_DIR, batch_size: int = TRAIN_BATCH_SIZE * 8):
+    """Cleaned text of `rows`, read from the store one batch at a time"""
+    for start in range(0, len(rows), batch_size):
+        texts = load_review_text(rows[start:start + batch_size], columns=[TEXT_COLUMN], store_dir=store_dir)
+        yield texts[TEXT_COLUMN].fillna("").astype(str)
+
+
+def iter_texts(rows: np.ndarray, store_dir: Path = STORE_DIR):
+    for texts in iter_text_batches(rows, store_dir):
+        yield from texts
+
+
+def term_counts(vectorizer, texts):
+    """Raw term counts in the vocabulary of a fitted TfidfVectorizer (what LDA is fitted on)"""
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    return CountVectorizer.transform(vectorizer, texts)
+
+
+def fit_term_counts(vectorizer, texts):
+    """
+    Fit a TfidfVectorizer (vocabulary and IDF weights) and return the raw term
+    counts of `texts`, tokenizing them once instead of in `fit` then `transform`
+    """
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+
+    counts = CountVectorizer.fit_transform(vectorizer, texts)
+    idf = TfidfTransformer(
+        norm=vectorizer.norm,
+        use_idf=vectorizer.use_idf,
+        smooth_idf=vectorizer.smooth_idf,
+        sublinear_tf=vectorizer.sublinear_tf,
+    ).fit(counts)
+    vectorizer.idf_ = idf.idf_
+    return counts
+
+
+def tfidf_from_counts(vectorizer, counts):
+    """`vectorizer.transform` of the texts behind `counts`, without tokenizing them again"""
+    from sklearn.preprocessing import normalize
+
+    return normalize(counts.multiply(vectorizer.idf_).tocsr())
+
+
+def vectorize(vectorizer, rows: np.ndarray, store_dir: Path = STORE_DIR):
+    """Sparse term-count matrix of `rows`, built batch by batch (never densified)"""
+    import scipy.sparse as sp
+
+    blocks = [term_counts(vectorizer, texts) for texts in iter_text_batches(rows, store_dir)]
+    return sp.vstack(blocks, format="csr") if blocks else sp.csr_matrix((0, len(vectorizer.vocabulary_)), dtype=np.int64)
+
+
+def _holdout(n: int, share: float = TRAIN_HOLDOUT, seed: int = TRAIN_SEED) -> np.ndarray:
+    """Mask of the rows held out for evaluation (at least one row when there are two or more)"""
+    held = np.random.default_rng(seed).random(n) < share
+    if n > 1 and not held.any():
+        held[np.random.default_rng(seed).integers(n)] = True
+    return held
+
+
+def held_out_perplexity(lda, counts) -> float:
+    """
+    exp(-log-likelihood per word) of `counts` under the topic mix LDA infers for
+    each review. Unlike `lda.perplexity`, whose bound includes a prior term over
+    the whole model, it does not depend on how many reviews are evaluated.
+    """
+    counts = counts.tocoo()
+    theta = lda.transform(counts.tocsr())
+    beta = lda.components_ / lda.components_.sum(axis=1, keepdims=True)
+    word_prob = np.einsum("ij,ji->i", theta[counts.row], beta[:, counts.col])
+    return float(np.exp(-(counts.data * np.log(word_prob)).sum() / counts.data.sum()))
+
+
+def _evaluate(metrics: dict, vectorizer, lda, kmeans, counts) -> None:
+    if counts.shape[0] == 0 or counts.sum() == 0:
+        return
+    metrics["lda"]["perplexity"] = round(held_out_perplexity(lda, counts), 3)
+    # `score` is minus the summed squared distances; per review so runs of any size compare
+    X = tfidf_from_counts(vectorizer, counts)
+    metrics["kmeans"]["inertia"] = round(float(-kmeans.score(X) / X.shape[0]), 6)
+    metrics["evaluated_on"] = int(counts.shape[0])
+
+
+def _save_version(
+    models: dict,
+    metrics: dict,
+    seen_hashes: np.ndarray,
+    params: dict,
+    parent: str | None,
+    models_dir: Path,
+) -> str:
+    """Write a new model version and make it the current one"""
+    version = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S-%f")
+    version_dir = Path(models_dir) / version
+    tmp_dir = version_dir.with_name(version + ".tmp")
+    tmp_dir.mkdir(parents=True)
+
+    sha256 = {}
+    for name, model in models.items():
+        path = tmp_dir / f"{name}.joblib"
+        joblib.dump(model, path)
+        sha256[name] = artifact_hash(path)
+    np.save(tmp_dir / SEEN_HASHES_FILE, np.unique(seen_hashes))
+    manifest = {
+        "version": version,
+        "parent": parent,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "n_reviews": int(len(np.unique(seen_hashes))),
+        "params": params,
+        "metrics": metrics,
+        "sha256": sha256,
+    }
+    (tmp_dir / VERSION_MANIFEST).write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp_dir, version_dir)
+
+    tmp_current = Path(models_dir) / f"{CURRENT_FILE}.{os.getpid()}.tmp"
+    tmp_current.write_text(json.dumps({"version": version}))
+    os.replace(tmp_current, Path(models_dir) / CURRENT_FILE)
+    print(f"✅ Model version {version} is now current")
+    return version
+
+
+def train_models(
+    store_dir: Path = STORE_DIR,
+    models_dir: Path = MODELS_DIR,
+    max_features: int = TRAIN_MAX_FEATURES,
+    n_topics: int = TRAIN_TOPICS,
+    n_clusters: int = TRAIN_CLUSTERS,
+    batch_size: int = TRAIN_BATCH_SIZE,
+    passes: int = TRAIN_LDA_PASSES,
+    n_jobs: int = TRAIN_N_JOBS,
+    seed: int = TRAIN_SEED,
+) -> str:
+    """
+    Train the vectorizer, LDA and KMeans from scratch on the negative reviews
+    of the store and save them as a new current model version.
+
+    The term-count matrix is built in sparse form from the streamed cleaned
+    text, in the same pass that fits the vectorizer: LDA is fitted on the
+    counts and KMeans on their TF-IDF, so both always share the vectorizer's
+    vocabulary. LDA uses online variational
+    Bayes with `n_jobs` processes, KMeans mini-batches; both can later be
+    updated in place by `update_models`. Returns the new version.
+    """
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.decomposition import LatentDirichletAllocation
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    rows, hashes = negative_reviews(store_dir)
+    if not len(rows):
+        raise ValueError(f"No negative review to train on in {store_dir}")
+    held = _holdout(len(rows), seed=seed)
+    print(f"Training on {int((~held).sum())} negative reviews ({int(held.sum())} held out)")
+
+    metrics = {}
+    vectorizer = TfidfVectorizer(max_features=max_features, stop_words="english")
+    counts_train = _measure("vectorizer", metrics, fit_term_counts, vectorizer, iter_texts(rows[~held], store_dir))
+    counts_held = _measure("matrix", metrics, vectorize, vectorizer, rows[held], store_dir)
+
+    lda = LatentDirichletAllocation(
+        n_components=n_topics,
+        learning_method="online",
+        batch_size=batch_size,
+        max_iter=passes,
+        total_samples=counts_train.shape[0],
+        n_jobs=n_jobs,
+        random_state=seed,
+    )
+    _measure("lda", metrics, lda.fit, counts_train)
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size, n_init=3, random_state=seed)
+    _measure("kmeans", metrics, kmeans.fit, tfidf_from_counts(vectorizer, counts_train))
+    _evaluate(metrics, vectorizer, lda, kmeans, counts_held)
+
+    params = {
+        "max_features": max_features,
+        "n_topics": n_topics,
+        "n_clusters": n_clusters,
+        "batch_size": batch_size,
+        "passes": passes,
+        "n_jobs": n_jobs,
+        "seed": seed,
+        "lda_input": "counts",
+    }
+    models = {"vectorizer": vectorizer, "lda": lda, "kmeans": kmeans}
+    return _save_version(models, metrics, hashes, params, None, models_dir)
+
+
+def update_models(
+    store_dir: Path = STORE_DIR,
+    models_dir: Path = MODELS_DIR,
+    batch_size: int | None = None,
+    n_jobs: int = TRAIN_N_JOBS,
+) -> str | None:
+    """
+    Fold the negative reviews the current models were not trained on (e.g. a
+    new month of data) into a copy of them with `partial_fit`, without
+    refitting from scratch, and save the result as a new current version.
+    The vocabulary and IDF weights are kept, so every version of a lineage
+    shares one feature space. Returns the new version, or None if there is
+    nothing new.
+    """
+    models_dir = Path(models_dir)
+    version = current_version(models_dir)
+    if version is None:
+        raise FileNotFoundError(f"No trained model version in {models_dir}: run train_models() first")
+    version_dir = models_dir / version
+    manifest = json.loads((version_dir / VERSION_MANIFEST).read_text())
+    models = {name: joblib.load(version_dir / f"{name}.joblib") for name in MODEL_NAMES}
+    seen = np.load(version_dir / SEEN_HASHES_FILE)
+
+    rows, hashes = negative_reviews(store_dir)
+    new = ~np.isin(hashes, seen) & ~pd.Series(hashes).duplicated().to_numpy()
+    if not new.any():
+        print(f"No new negative review since model version {version}")
+        return None
+    rows, hashes = rows[new], hashes[new]
+    held = _holdout(len(rows), seed=manifest["params"]["seed"])
+    print(f"Folding {int((~held).sum())} new negative reviews into model version {version}")
+
+    metrics = {}
+    batch_size = batch_size or manifest["params"]["batch_size"]
+    vectorizer, lda, kmeans = models["vectorizer"], models["lda"], models["kmeans"]
+    counts = _measure("matrix", metrics, vectorize, vectorizer, rows, store_dir)
+    counts_train, counts_held = counts[~held], counts[held]
+    lda.set_params(n_jobs=n_jobs, total_samples=len(seen) + counts_train.shape[0])
+
+    def partial_fit(model, X):
+        for start in range(0, X.shape[0], batch_size):
+            model.partial_fit(X[start:start + batch_size])
+        return model
+
+    _measure("lda", metrics, partial_fit, lda, counts_train)
+    _measure("kmeans", metrics, partial_fit, kmeans, tfidf_from_counts(vectorizer, counts_train))
+    _evaluate(metrics, vectorizer, lda, kmeans, counts_held)
+    metrics["new_reviews"] = int(counts_train.shape[0])
+
+    params = {**manifest["params"], "batch_size": batch_size, "n_jobs": n_jobs}
+    return _save_version(models, metrics, np.concatenate([seen, hashes]), params, version, models_dir)
+
+
+def model_versions(models_dir: Path = MODELS_DIR) -> pd.DataFrame:
+    """Every saved model version with its parent, size and metrics, oldest first"""
+    rows = []
+    for path in sorted(Path(models_dir).glob(f"*/{VERSION_MANIFEST}")):
+        manifest = json.loads(path.read_text())
+        metrics = manifest["metrics"]
+        rows.append({
+            "version": manifest["version"],
+            "parent": manifest["parent"],
+            "created": manifest["created"],
+            "n_reviews": manifest["n_reviews"],
+            "lda_seconds": metrics.get("lda", {}).get("fit_seconds"),
+            "kmeans_seconds": metrics.get("kmeans", {}).get("fit_seconds"),
+            "perplexity": metrics.get("lda", {}).get("perplexity"),
+            "inertia": metrics.get("kmeans", {}).get("inertia"),
+        })
+    versions = pd.DataFrame(rows)
+    if not versions.empty:
+        versions["current"] = versions["version"] == current_version(models_dir)
+    return versions
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from project.params import CATEGORICAL_COLUMNS
+
+
+def as_shared_frame(df: pd.DataFrame, columns: list[str] = CATEGORICAL_COLUMNS) -> pd.DataFrame:
+    """`df` with its repeated key columns stored as categoricals, before it is shared by sessions"""
+    return df.astype({col: "category" for col in columns if col in df.columns and df[col].dtype != "category"})
+
+
+class ReviewView:
+    """
+    Read-only selection of a review frame shared by every session: the frame
+    itself plus the positions of the selected rows (None: every row).
+
+    Narrowing a view and aggregating over it only read column slices (the
+    integer codes of categorical columns), so a session holds a row-position
+    array instead of a filtered copy of the frame. Rows are only materialized
+    by `to_frame`, for the few a page actually displays.
+    """
+
+    def __init__(self, frame: pd.DataFrame, rows: np.ndarray | None = None):
+        self.frame = frame
+        self.rows = None if rows is None else np.asarray(rows, dtype=np.intp)
+
+    def __len__(self) -> int:
+        return len(self.frame) if self.rows is None else len(self.rows)
+
+    def _take(self, values: np.ndarray) -> np.ndarray:
+        return values if self.rows is None else values[self.rows]
+
+    def codes(self, column: str) -> tuple[np.ndarray, pd.Index]:
+        """Integer codes (-1: missing) of `column` for the view's rows, and the values they stand for"""
+        values = self.frame[column].array
+        if isinstance(values, pd.Categorical):
+            return self._take(values.codes), values.categories
+        codes, uniques = pd.factorize(self._take(np.asarray(values)))
+        return codes, pd.Index(uniques)
+
+    def values(self, column: str) -> np.ndarray:
+        return self._take(self.frame[column].to_numpy())
+
+    def where(self, selections: dict | None = None) -> "ReviewView":
+        """Narrowed view: rows whose value is one of the selected ones, for every non-empty selection"""
+        keep = None
+        for column, selected in (selections or {}).items():
+            if selected is None or (not isinstance(selected, str) and len(selected) == 0):
+                continue
+            selected = [selected] if isinstance(selected, str) else list(selected)
+            codes, uniques = self.codes(column)
+            wanted = uniques.get_indexer(selected)
+            mask = np.isin(codes, wanted[wanted >= 0])
+            keep = mask if keep is None else keep & mask
+        if keep is None:
+            return self
+        positions = np.flatnonzero(keep)
+        return ReviewView(self.frame, positions if self.rows is None else self.rows[positions])
+
+    def unique(self, column: str) -> list:
+        """Distinct values of `column` in order of first appearance, like `df[column].unique()`"""
+        codes, uniques = self.codes(column)
+        codes = pd.unique(codes)
+        return uniques[codes[codes >= 0]].tolist()
+
+    def count_by(self, column: str) -> pd.Series:
+        """Number of rows per value of `column` (values absent from the view are dropped)"""
+        codes, uniques = self.codes(column)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        return pd.Series(counts, index=uniques, name="count")[counts > 0]
+
+    def to_frame(self, columns: list[str] | None = None, limit: int | None = None, start: int = 0) -> pd.DataFrame:
+        """Copy of (`limit` of the) selected rows from the `start`-th one, for display only"""
+        rows = np.arange(len(self.frame)) if self.rows is None else self.rows
+        positions = slice(None) if columns is None else self.frame.columns.get_indexer(columns)
+        if columns is not None and (positions < 0).any():
+            raise KeyError(f"Columns not in the reviews: {[col for col, i in zip(columns, positions) if i < 0]}")
+        stop = None if limit is None else start + limit
+        return self.frame.iloc[rows[start:stop], positions]
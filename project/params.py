@@ -0,0 +1,193 @@
+import os
+from pathlib import Path
+
+##################  PATHS  ##################
+# Everything is resolved relative to the repo so the app works wherever it is cloned
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+NOTEBOOKS_DIR = ROOT_DIR / "notebooks"
+PAGES_DIR = ROOT_DIR / "pages"
+DATA_DIR = Path(os.environ.get("BTS_DATA_DIR", ROOT_DIR / "data"))
+
+# Source CSV produced by notebooks/project.ipynb
+REVIEW_CSV = Path(os.environ.get("BTS_REVIEW_CSV", NOTEBOOKS_DIR / "review_data.csv"))
+
+# Columnar review store (Arrow IPC files, memory-mapped by every process)
+STORE_DIR = DATA_DIR / "store"
+
+##################  STARTUP  ##################
+# Preload the shared data, indexes and models in the background as soon as the
+# server process handles its first script run (see `shared.start_warm_up`)
+WARM_UP_ENABLED = os.environ.get("BTS_WARM_UP", "1") != "0"
+WARM_UP_MODELS = os.environ.get("BTS_WARM_UP_MODELS", "1") != "0"
+
+##################  SCHEMA  ##################
+CATEGORICAL_COLUMNS = [
+    "Region",
+    "City",
+    "Place Type",
+    "Place Category",
+    "Place Name",
+    "Reviewer Language",
+    "Sentiment Label",
+]
+# float32 is precise enough for the VADER scores; Rating stays float64 so its
+# sums and averages (and everything rounded from them) match the CSV's
+FLOAT_COLUMNS = ["neg", "neu", "pos", "compound"]
+FLOAT64_COLUMNS = ["Rating"]
+# Free text is kept in its own file and only read by pages that need it
+TEXT_COLUMNS = ["Review Text", "Cleaned Review"]
+
+##################  CRAWLER  ##################
+GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY", "")
+# Point this at a local fake server (project.ml_logic.fake_places) to crawl offline
+PLACES_API_URL = os.environ.get("PLACES_API_URL", "https://maps.googleapis.com/maps/api/place")
+RAW_DATA_DIR = Path(os.environ.get("BTS_RAW_DATA_DIR", ROOT_DIR / "raw_data"))
+
+CITIES = [
+    {"city": "Mecca", "region": "West"},
+    {"city": "Jeddah", "region": "West"},
+    {"city": "Taif", "region": "West"},
+    {"city": "Khobar", "region": "East"},
+    {"city": "Umluj", "region": "North"},
+    {"city": "AlUla", "region": "West"},
+    {"city": "Tabuk", "region": "North"},
+    {"city": "Medina", "region": "West"},
+    {"city": "Riyadh", "region": "Central"},
+    {"city": "Abha", "region": "South"},
+    {"city": "Al Ahsa", "region": "East"},
+    {"city": "Najran", "region": "South"},
+    {"city": "Qatif", "region": "East"},
+    {"city": "Buraidah", "region": "Central"},
+    {"city": "Unaizah", "region": "Central"},
+    {"city": "Rijal Alma", "region": "South"},
+    {"city": "Hail", "region": "North"},
+    {"city": "Yanbu", "region": "West"},
+    {"city": "Al Baha", "region": "South"},
+    {"city": "Jazan", "region": "South"},
+]
+
+PLACE_TYPES = [
+    {"type": "hotel", "max_results": 100},
+    {"type": "restaurant", "max_results": 100},
+    {"type": "tourist_attraction", "max_results": 20},
+    {"type": "shopping_mall", "max_results": 20},
+    {"type": "museum", "max_results": 10},
+    {"type": "cafe", "max_results": 30},
+    {"type": "park", "max_results": 10},
+    {"type": "amusement_park", "max_results": 20},
+]
+
+##################  NLTK  ##################
+# NLTK data shipped with the app (filled once by `make nltk_data`); searched before NLTK's own
+# locations, and nothing is downloaded at runtime unless BTS_NLTK_DOWNLOAD=1
+NLTK_DATA_DIR = Path(os.environ.get("BTS_NLTK_DATA", ROOT_DIR / "nltk_data"))
+NLTK_PACKAGES = {"stopwords": "corpora/stopwords", "vader_lexicon": "sentiment/vader_lexicon.zip"}
+NLTK_DOWNLOAD = os.environ.get("BTS_NLTK_DOWNLOAD", "0") == "1"
+
+##################  PREPROCESSING  ##################
+PROCESSED_DIR = Path(os.environ.get("BTS_PROCESSED_DIR", DATA_DIR / "processed"))
+CHUNK_SIZE = int(os.environ.get("BTS_CHUNK_SIZE", 50_000))
+ENGLISH_LANGUAGES = ["en", "en-us"]
+# Languages with their own normalizer and sentiment scorer (see languages.py);
+# `preprocess` keeps reviews in these languages only
+REVIEW_LANGUAGES = ["en", "ar"]
+
+##################  NEAR DUPLICATES  ##################
+# MinHash/LSH index of every cleaned review, updated by each preprocessing run
+NEAR_DUP_DIR = Path(os.environ.get("BTS_NEAR_DUP_DIR", DATA_DIR / "near_duplicates"))
+NEAR_DUP_REPORT = DATA_DIR / "near_duplicate_clusters.csv"
+NEAR_DUP_ENABLED = os.environ.get("BTS_NEAR_DUP", "1") != "0"
+NEAR_DUP_SHINGLE = 3
+NEAR_DUP_PERMUTATIONS = 128
+# 16 bands x 8 rows: pairs above ~0.7 Jaccard become candidates
+NEAR_DUP_BANDS = 16
+NEAR_DUP_THRESHOLD = 0.8
+NEAR_DUP_BATCH = 2_000
+
+##################  SEARCH  ##################
+# Inverted index over `Cleaned Review` of the review store (segments of memory-mapped postings)
+SEARCH_DIR = Path(os.environ.get("BTS_SEARCH_DIR", DATA_DIR / "search"))
+SEARCH_SEGMENT_SIZE = 200_000
+SEARCH_RESULTS = 50
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+##################  SENTIMENT  ##################
+SENTIMENT_CACHE = Path(os.environ.get("BTS_SENTIMENT_CACHE", DATA_DIR / "sentiment_cache.npz"))
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+##################  MODELS  ##################
+# Artifacts used by the dashboard, pinned by content hash.
+# notebooks/ and pages/ hold other (older or duplicate) pickles that nothing loads.
+MODEL_ARTIFACTS = {
+    "lda": {
+        "path": PAGES_DIR / "lda_neg_tot.pkl",
+        "sha256": "db6b9caf39daf1976d437c18b6d231ab013eb4831f0d5fc3e958591f5b226df5",
+    },
+    "kmeans": {
+        "path": PAGES_DIR / "kmeans_model.pkl",
+        "sha256": "c5aaddfdcf46629f8948d9ac605ce5d4d166bd952b1d411202d878a835e37f1e",
+    },
+    "vectorizer": {
+        "path": NOTEBOOKS_DIR / "vectorizer.pkl",
+        "sha256": "f2cf6c79f1a02c0298de4e08f531e873249a23cec4b1f56777ba7011dbe84ae4",
+    },
+}
+NEGATIVE_REVIEWS_CSV = Path(os.environ.get("BTS_NEGATIVE_REVIEWS_CSV", NOTEBOOKS_DIR / "negative_reviews_w_clusters.csv"))
+
+##################  TRAINING  ##################
+# Versioned models trained by `project.ml_logic.training`; once a version is
+# current it replaces the pinned artifacts above.
+MODELS_DIR = Path(os.environ.get("BTS_MODELS_DIR", DATA_DIR / "models"))
+TRAIN_MAX_FEATURES = 3_000
+TRAIN_TOPICS = 5
+TRAIN_CLUSTERS = 5
+TRAIN_BATCH_SIZE = 2_048
+TRAIN_LDA_PASSES = 10
+# Processes used by the LDA E-step (-1: all cores)
+TRAIN_N_JOBS = int(os.environ.get("BTS_TRAIN_N_JOBS", "-1"))
+# Share of the reviews held out to measure perplexity and inertia
+TRAIN_HOLDOUT = 0.05
+TRAIN_SEED = 42
+
+##################  TOPICS  ##################
+TOPIC_CACHE_DIR = DATA_DIR / "topic_cache"
+TOPIC_WORDS = 10
+# Online Topic/Cluster assignments of reviews, appended batch by batch
+ASSIGNMENTS_CSV = Path(os.environ.get("BTS_ASSIGNMENTS_CSV", DATA_DIR / "assignments.csv"))
+ASSIGN_BATCH_SIZE = 1_000
+
+##################  ATTENTION  ##################
+# Ministry "needs attention" ranking: scoring formula, default granularity (the
+# page lets users switch between place, city, region and place type) and size
+ATTENTION_SCORER = os.environ.get("BTS_ATTENTION_SCORER", "negative_rate_gap")
+ATTENTION_LEVEL = os.environ.get("BTS_ATTENTION_LEVEL", "city")
+ATTENTION_TARGET_RATING = 4.5
+ATTENTION_TOP_K = 10
+
+##################  BENCHMARK  ##################
+BENCHMARK_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+# One JSON line per (run, benchmark, size), appended by every benchmark run
+BENCHMARK_RESULTS = Path(os.environ.get("BTS_BENCHMARK_RESULTS", DATA_DIR / "benchmarks.jsonl"))
+BENCHMARK_REPEAT = 3
+# A benchmark is reported as a regression when it gets this much slower or bigger
+BENCHMARK_REGRESSION = 1.25
+
+##################  INSTRUMENTATION  ##################
+INSTRUMENT_ENABLED = os.environ.get("BTS_INSTRUMENT", "1") != "0"
+# Recent spans/reruns kept in memory for the admin page
+INSTRUMENT_BUFFER = 5_000
+# When set, every finished rerun is also appended to this JSON lines file
+INSTRUMENT_LOG = os.environ.get("BTS_INSTRUMENT_LOG")
+INSTRUMENT_EXPORT = DATA_DIR / "instrumentation.jsonl"
+# Per-rerun profiling: "" (off), "cprofile" or "tracemalloc"
+PROFILE_MODE = os.environ.get("BTS_PROFILE", "")
+# The admin page only shows anything when opened with ?admin=<token>
+ADMIN_TOKEN = os.environ.get("BTS_ADMIN_TOKEN")
+
+##################  COMPARISON  ##################
+# Per-group sentiment counts kept by the comparison engine (shared by every session)
+COMPARISON_CACHE_SIZE = 4_096
+COMPARISON_CONFIDENCE = 0.95
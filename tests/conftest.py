@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from project.ml_logic.data import build_review_store, load_reviews
+
+CITIES = {
+    "Riyadh": "Central", "Buraidah": "Central", "Jeddah": "West", "Mecca": "West",
+    "Taif": "West", "Khobar": "East", "Abha": "South",
+}
+PLACE_TYPES = {"hotel": "lodging", "restaurant": "food", "museum": "attraction", "cafe": "food"}
+
+
+@pytest.fixture(scope="session")
+def reviews() -> pd.DataFrame:
+    """Reviews with the columns of review_data.csv: one-decimal ratings (a few missing), facets, labels"""
+    rng = np.random.default_rng(0)
+    n = 5_000
+    cities = rng.choice(list(CITIES), n)
+    types = rng.choice(list(PLACE_TYPES), n)
+    rating = np.round(rng.uniform(1, 5, n), 1)
+    rating[rng.random(n) < 0.02] = np.nan
+    return pd.DataFrame({
+        "Region": [CITIES[city] for city in cities],
+        "City": cities,
+        "Place Type": types,
+        "Place Category": [PLACE_TYPES[kind] for kind in types],
+        "Place Name": [f"{city} {kind} {i}" for city, kind, i in zip(cities, types, rng.integers(0, 8, n))],
+        "Rating": rating,
+        "Review Text": rng.choice(["Great view.", "Dirty room, rude staff.", "Slow service."], n),
+        "Sentiment Label": rng.choice(["negative", "neutral", "positive"], n, p=[0.3, 0.2, 0.5]),
+    })
+
+
+@pytest.fixture(scope="session")
+def review_csv(reviews, tmp_path_factory):
+    path = tmp_path_factory.mktemp("csv") / "review_data.csv"
+    reviews.to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture(scope="session")
+def store_dir(review_csv, tmp_path_factory):
+    path = tmp_path_factory.mktemp("store")
+    build_review_store(review_csv, path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def store_reviews(store_dir) -> pd.DataFrame:
+    """`reviews` as the pages load them: from the review store"""
+    return load_reviews(store_dir=store_dir)
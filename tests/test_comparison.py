@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from project.ml_logic.comparison import SentimentComparison, wilson_interval
+from project.ml_logic.rollup import SENTIMENT_LABELS, RollupCube
+
+
+def test_wilson_interval_reference_values():
+    # Wilson score intervals at 95% (e.g. statsmodels' proportion_confint(method="wilson"))
+    low, high = wilson_interval(np.array([8, 0, 10, 50]), np.array([10, 10, 10, 100]), 0.95)
+    np.testing.assert_allclose(low, [0.490162, 0.0, 0.722467, 0.403832], atol=1e-6)
+    np.testing.assert_allclose(high, [0.943318, 0.277533, 1.0, 0.596168], atol=1e-6)
+
+
+def test_wilson_interval_contains_share_and_narrows():
+    successes, totals = np.array([3, 30, 300]), np.array([10, 100, 1000])
+    low, high = wilson_interval(successes, totals, 0.95)
+    assert ((low <= successes / totals) & (successes / totals <= high)).all()
+    assert (np.diff(high - low) < 0).all()
+    wide_low, wide_high = wilson_interval(successes, totals, 0.99)
+    assert ((wide_low < low) & (wide_high > high)).all()
+
+
+def test_wilson_interval_of_empty_group_is_nan():
+    low, high = wilson_interval(np.array([0]), np.array([0]), 0.95)
+    assert np.isnan(low).all() and np.isnan(high).all()
+
+
+def test_counts_match_pandas_and_cache(reviews, monkeypatch):
+    cube = RollupCube.from_reviews(reviews)
+    computed = []
+    view = cube.view
+    monkeypatch.setattr(cube, "view", lambda by, where: computed.append(where[by[0]]) or view(by, where))
+    comparison = SentimentComparison(cube)
+    where = {"Place Type": ["hotel", "cafe"]}
+    for values in (["Riyadh", "Jeddah"], ["Jeddah", "Abha", "Khobar"], ["Khobar", "Riyadh"]):
+        counts = comparison.counts("City", values, where)
+        subset = reviews[reviews["Place Type"].isin(where["Place Type"])]
+        expected = pd.crosstab(subset["City"], subset["Sentiment Label"]).reindex(values)[SENTIMENT_LABELS]
+        pdt.assert_frame_equal(counts, expected, check_names=False, check_dtype=False)
+    # Only the cities not shown before are computed; the last call is served from the cache
+    assert computed == [["Riyadh", "Jeddah"], ["Abha", "Khobar"]]
+
+    comparison.counts("City", ["Riyadh"], {"Place Type": ["hotel"]})
+    assert computed[-1] == ["Riyadh"]
+
+
+def test_compare_table(reviews):
+    comparison = SentimentComparison(RollupCube.from_reviews(reviews))
+    table = comparison.compare("Region", ["Central", "Nowhere"], normalize=True, confidence=0.95)
+    central = table[table["Region"] == "Central"]
+    assert central["Review Count"].sum() == (reviews["Region"] == "Central").sum()
+    np.testing.assert_allclose(central["Share (%)"].sum(), 100, atol=0.2)
+    assert (central["CI Low (%)"] <= central["Share (%)"]).all() and (central["Share (%)"] <= central["CI High (%)"]).all()
+    assert table["Value"].equals(table["Share (%)"])
+    assert (table.loc[table["Region"] == "Nowhere", "Review Count"] == 0).all()
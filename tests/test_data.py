@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from project.ml_logic.attention import AttentionIndex
+from project.ml_logic.data import ensure_review_store, store_version
+from project.ml_logic.rollup import RollupCube
+
+
+def test_store_keeps_ratings_exact(review_csv, store_reviews):
+    csv = pd.read_csv(review_csv)
+    assert store_reviews["Rating"].dtype == "float64"
+    np.testing.assert_array_equal(store_reviews["Rating"].to_numpy(), csv["Rating"].to_numpy())
+
+
+def test_store_is_not_rebuilt_when_up_to_date(review_csv, store_dir):
+    assert ensure_review_store(review_csv, store_dir) == store_version(store_dir)
+
+
+def test_cube_views_match_csv_groupby(review_csv, store_reviews):
+    """Average ratings rolled up from the store are the baseline's, CSV groupby means"""
+    csv = pd.read_csv(review_csv)
+    cube = RollupCube.from_reviews(store_reviews)
+    for by in (["Region"], ["Region", "City"], ["Region", "City", "Place Type", "Place Name"]):
+        expected = csv.groupby(by)["Rating"].mean().round(2).reset_index()
+        pdt.assert_frame_equal(cube.view(by)[by + ["Rating"]].round(2), expected, check_dtype=False)
+
+
+def test_attention_matches_csv_baseline(review_csv, store_reviews):
+    """Same cities and scores as the Ministry page computed them from the CSV"""
+    review = pd.read_csv(review_csv)
+    keys = ["Region", "City"]
+    total = review.groupby(keys).size().reset_index(name="Total Reviews")
+    negative = review[review["Sentiment Label"] == "negative"].groupby(keys).size().reset_index(name="Negative Reviews")
+    rating = review.groupby(keys)["Rating"].mean().reset_index()
+    expected = total.merge(negative, on=keys, how="left").merge(rating, on=keys)
+    expected["Negative Reviews"] = expected["Negative Reviews"].fillna(0)
+    expected["Negative Rate (%)"] = (expected["Negative Reviews"] / expected["Total Reviews"] * 100).round(1)
+    expected["Rating"] = expected["Rating"].round(2)
+    expected["Score"] = expected["Negative Rate (%)"] * (4.5 - expected["Rating"])
+    expected = expected.sort_values(["Score"] + keys, ascending=[False, True, True]).reset_index(drop=True)
+
+    top = AttentionIndex.from_cube(RollupCube.from_reviews(store_reviews), level="city").top(len(expected))
+    columns = keys + ["Total Reviews", "Negative Reviews", "Rating", "Negative Rate (%)", "Score"]
+    pdt.assert_frame_equal(top[columns], expected[columns], check_dtype=False)
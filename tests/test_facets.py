@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from project.ml_logic.facets import FacetIndex
+
+
+def _mask_filter(review: pd.DataFrame, selections: dict) -> tuple[pd.DataFrame, dict]:
+    """The sidebar's original chained boolean-mask filters, and the options each level offered"""
+    filtered, options = review, {}
+    for level in ["Region", "City", "Place Type"]:
+        options[level] = list(filtered[level].unique())
+        selected = selections.get(level)
+        filtered = filtered[filtered[level].isin(selected)] if selected else filtered
+    return filtered, options
+
+
+def _selections(review: pd.DataFrame, rng: np.random.Generator) -> dict:
+    selections = {}
+    for level in ["Region", "City", "Place Type"]:
+        values = review[level].unique()
+        size = int(rng.integers(0, 3))
+        selections[level] = list(rng.choice(values, size, replace=False)) if size else []
+    return selections
+
+
+@pytest.mark.parametrize("frame", ["reviews", "store_reviews"])
+def test_facet_index_matches_mask_filters(frame, request):
+    """Same rows and sidebar options as the filters the Data page used, on the CSV frame and the store's categoricals"""
+    reviews = request.getfixturevalue(frame)
+    index = FacetIndex(reviews)
+    rng = np.random.default_rng(1)
+    for _ in range(50):
+        selections = _selections(reviews, rng)
+        expected, options = _mask_filter(reviews, selections)
+        pdt.assert_frame_equal(index.select(reviews, selections), expected)
+        for level, expected_options in options.items():
+            assert index.options(level, selections) == expected_options
+
+
+def test_no_selection_is_every_row(reviews):
+    index = FacetIndex(reviews)
+    assert index.rows({}) is None
+    assert index.select(reviews, {"Region": [], "City": None}) is reviews
+
+
+def test_unknown_value_selects_nothing(reviews):
+    index = FacetIndex(reviews)
+    assert len(index.rows({"City": ["Atlantis"]})) == 0
+    assert index.options("City", {"Region": ["Atlantis"]}) == []
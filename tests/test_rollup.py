@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from project.ml_logic.rollup import SENTIMENT_LABELS, RollupCube
+
+VIEWS = [
+    ["Region"],
+    ["City"],
+    ["Place Type"],
+    ["Region", "City", "Place Type", "Place Name", "Place Category"],
+]
+WHERES = [
+    None,
+    {"Region": ["Central"]},
+    {"Region": ["West", "East"], "Place Type": ["hotel"]},
+    {"City": ["Taif"], "Place Type": []},
+]
+
+
+def _filtered(review: pd.DataFrame, where: dict | None) -> pd.DataFrame:
+    for key, values in (where or {}).items():
+        if values:
+            review = review[review[key].isin(values)]
+    return review
+
+
+def _groupby_view(review: pd.DataFrame, by: list[str], where: dict | None) -> pd.DataFrame:
+    """What the pages computed with groupbys over the filtered reviews"""
+    review = _filtered(review, where)
+    grouped = review.groupby(by)
+    expected = grouped["Rating"].mean().rename("Rating").to_frame()
+    expected["Total Reviews"] = grouped.size()
+    labels = pd.crosstab([review[key] for key in by], review["Sentiment Label"])
+    for label in SENTIMENT_LABELS:
+        expected[label] = labels[label] if label in labels else 0
+    return expected.reset_index()
+
+
+@pytest.mark.parametrize("by", VIEWS)
+@pytest.mark.parametrize("where", WHERES)
+def test_views_match_groupby(reviews, by, where):
+    cube = RollupCube.from_reviews(reviews)
+    pdt.assert_frame_equal(cube.view(by, where), _groupby_view(reviews, by, where), check_dtype=False)
+
+
+@pytest.mark.parametrize("where", WHERES)
+def test_sentiment_counts_match_value_counts(reviews, where):
+    cube = RollupCube.from_reviews(reviews)
+    expected = _filtered(reviews, where)["Sentiment Label"].value_counts()
+    pdt.assert_series_equal(cube.sentiment_counts(where), expected, check_names=False, check_index_type=False)
+
+
+def test_update_matches_rebuild(reviews):
+    cube = RollupCube.from_reviews(reviews.iloc[:1000])
+    for start in range(1000, len(reviews), 1500):
+        cube.update(reviews.iloc[start:start + 1500])
+    rebuilt = RollupCube.from_reviews(reviews)
+    for by in VIEWS:
+        pdt.assert_frame_equal(cube.view(by), rebuilt.view(by), check_dtype=False)
+
+
+def test_save_and_load(reviews, tmp_path):
+    cube = RollupCube.from_reviews(reviews)
+    cube.save(tmp_path / "cube.parquet")
+    loaded = RollupCube.load(tmp_path / "cube.parquet")
+    pdt.assert_frame_equal(loaded.view(VIEWS[-1]), cube.view(VIEWS[-1]))
+    assert np.isclose(loaded.totals()["Rating Sum"], reviews["Rating"].sum())
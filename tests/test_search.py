@@ -0,0 +1,100 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from project.ml_logic.data import build_review_store
+from project.ml_logic.search import MANIFEST_FILE, SearchIndex, parse_query, update_search_index
+
+WORDS = ["room", "clean", "check", "in", "staff", "rude", "parking", "view", "old"]
+STOPWORDS = ["not", "the", "very"]
+
+
+@pytest.fixture(scope="module")
+def search_store(reviews, tmp_path_factory):
+    """Store of `reviews` with short random texts (cleaned: without stop words), indexed in several segments"""
+    rng = np.random.default_rng(1)
+    reviews = reviews.head(2_000).copy()
+    words = [rng.choice(WORDS + STOPWORDS, rng.integers(1, 8)) for _ in range(len(reviews))]
+    reviews["Review Text"] = [" ".join(w).capitalize() + "." for w in words]
+    reviews["Cleaned Review"] = [" ".join(word for word in w if word not in STOPWORDS) for w in words]
+    csv = tmp_path_factory.mktemp("search_csv") / "review_data.csv"
+    reviews.to_csv(csv, index=False)
+    store_dir, index_dir = tmp_path_factory.mktemp("search_store"), tmp_path_factory.mktemp("search_index")
+    build_review_store(csv, store_dir)
+    update_search_index(store_dir, index_dir, segment_size=300)
+    return reviews.reset_index(drop=True), store_dir, index_dir
+
+
+def expected_rows(reviews: pd.DataFrame, query: str) -> set:
+    """Rows matching `query`, by scanning every text: terms in the cleaned text, phrases in the review"""
+    cleaned = " " + reviews["Cleaned Review"].fillna("") + " "
+    written = " " + reviews["Review Text"].str.lower().str.replace(".", "", regex=False) + " "
+    keep = pd.Series(True, index=reviews.index)
+    for group in parse_query(query):
+        in_group = pd.Series(False, index=reviews.index)
+        for clause in group:
+            if clause["phrase"]:
+                found = written.str.contains(" " + " ".join(clause["terms"]) + " ", regex=False)
+            else:
+                found = pd.concat([cleaned.str.contains(f" {term} ", regex=False) for term in clause["terms"]], axis=1)
+                found = found.all(axis=1)
+            if clause["negated"]:
+                keep &= ~found
+            else:
+                in_group |= found
+        if not all(clause["negated"] for clause in group):
+            keep &= in_group
+    return set(np.flatnonzero(keep.to_numpy()))
+
+
+@pytest.mark.parametrize("query", [
+    "room", "room clean", "parking OR view", "room -rude", "staff NOT rude",
+    '"check in"', '"check in" OR parking', 'room "check in"', 'room -"check in"',
+    '"room old" OR "clean view"', 'staff "rude staff" OR parking', '"in check"',
+    '"not clean"', 'room -"not clean"', '"the room is"', '"check in check in check"',
+])
+def test_matches_scan_of_texts(search_store, query):
+    reviews, _, index_dir = search_store
+    result = SearchIndex(index_dir).search(query, k=len(reviews))
+    assert set(result["row"]) == expected_rows(reviews, query)
+    assert result.attrs["matches"] == len(result)
+    assert result["score"].is_monotonic_decreasing
+
+
+def test_phrases_keep_stop_words(search_store):
+    reviews, _, index_dir = search_store
+    index = SearchIndex(index_dir)
+    not_clean = set(index.search('"not clean"', k=len(reviews))["row"])
+    assert not_clean and not_clean < set(index.search("clean", k=len(reviews))["row"])
+    # Reviews with both words but not the phrase are kept by a negated phrase
+    room = set(index.search("room", k=len(reviews))["row"])
+    kept = set(index.search('room -"check in"', k=len(reviews))["row"])
+    both_words = set(index.search("room check in", k=len(reviews))["row"])
+    assert kept < room and kept & both_words
+
+
+def test_rows_restrict_matches(search_store):
+    reviews, _, index_dir = search_store
+    rows = np.arange(0, len(reviews), 3)
+    result = SearchIndex(index_dir).search('"check in" OR view', rows=rows, k=len(reviews))
+    assert set(result["row"]) == expected_rows(reviews, '"check in" OR view') & set(rows)
+
+
+def test_negated_only_query_matches_nothing(search_store):
+    _, _, index_dir = search_store
+    assert SearchIndex(index_dir).search("-rude").attrs["matches"] == 0
+
+
+def test_older_index_format_is_rebuilt(search_store, tmp_path):
+    reviews, store_dir, _ = search_store
+    update_search_index(store_dir, tmp_path, segment_size=1_000)
+    manifest = json.loads((tmp_path / MANIFEST_FILE).read_text())
+    (tmp_path / MANIFEST_FILE).write_text(json.dumps({**manifest, "format": 1}))
+    with pytest.raises(ValueError):
+        SearchIndex(tmp_path)
+
+    update_search_index(store_dir, tmp_path, segment_size=1_000)
+    result = SearchIndex(tmp_path).search('"not clean"', k=len(reviews))
+    assert set(result["row"]) == expected_rows(reviews, '"not clean"')
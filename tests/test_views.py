@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from project.ml_logic.views import ReviewView, as_shared_frame
+
+
+@pytest.fixture(scope="module")
+def view(reviews):
+    return ReviewView(as_shared_frame(reviews))
+
+
+def test_to_frame_pages_through_the_selection(reviews, view):
+    selected = view.where({"City": ["Jeddah"], "Place Type": ["hotel"]})
+    expected = reviews[(reviews["City"] == "Jeddah") & (reviews["Place Type"] == "hotel")]
+    pages = [selected.to_frame(["Place Name", "Rating"], limit=50, start=start) for start in range(0, len(selected), 50)]
+    assert all(len(page) <= 50 for page in pages)
+    np.testing.assert_array_equal(np.concatenate([page.index for page in pages]), expected.index)
+    np.testing.assert_array_equal(np.concatenate([page["Rating"] for page in pages]), expected["Rating"])
+
+
+def test_to_frame_rejects_unknown_columns(view):
+    with pytest.raises(KeyError, match="Stars"):
+        view.to_frame(["Rating", "Stars"], limit=5)